@@ -23,75 +23,330 @@
 
 import logging
 
-from auto_merger.github_checker import GitHubStatusChecker
-from auto_merger.gitlab_checker import GitLabStatusChecker
+from typing import TYPE_CHECKING
+
 from auto_merger.config import Config
-from auto_merger.merger import AutoMerger
+from auto_merger.metrics import Metrics
+from auto_merger.named_tuples import Shard
+from auto_merger.report import open_report
+from auto_merger.sharding import apply_shard, combine_results
+from auto_merger.timing import Timings
+
+if TYPE_CHECKING:
+    from auto_merger.email import Mailer
 
 
 logger = logging.getLogger(__name__)
 
 
-def merge_request_checker(config: Config, send_email: list[str] | None, json_output: str = "") -> int:
+def report_run(
+    command: str,
+    timings: Timings,
+    metrics: Metrics,
+    success: bool,
+    json_output: str | None = "",
+    metrics_textfile: str | None = "",
+):
+    """
+    Prints summary of run phases, it is stored next to the json output when specified.
+    Metrics are written for the node exporter textfile collector when requested.
+    """
+    timings.print_summary()
+    if json_output:
+        timings.save(json_output)
+    metrics.set_run(command, success, timings.get_wall_time())
+    if metrics_textfile:
+        metrics.write_textfile(metrics_textfile)
+
+
+def get_outputs(json_output: str | None = "", output: str | None = "", output_format: str | None = "") -> list:
+    """
+    Function returns report outputs as (path, format), '--json-output' is always JSON
+    """
+    outputs = []
+    if json_output:
+        outputs.append((json_output, "json"))
+    if output:
+        outputs.append((output, output_format))
+    return outputs
+
+
+def merge_request_checker(
+    config: Config,
+    send_email: list[str] | None,
+    json_output: str = "",
+    jobs: int = 1,
+    metrics_textfile: str = "",
+    output: str = "",
+    output_format: str = "",
+    mailer: "Mailer | None" = None,
+    shard: Shard | None = None,
+) -> int:
     """
     Checks NVR from brew build against pulp
     """
     logger.debug(f"Configuration: {config.__str__()}")
     logger.debug(f"Json path: {json_output}")
-    gl_checker = GitLabStatusChecker(config=config, json_output_file=json_output)
-    if not gl_checker.check_gitlab_status():
-        return 1
-    ret_value = gl_checker.check_all_containers()
-    if not ret_value:
-        return ret_value
-    gl_checker.print_blocked_merge_requests()
-    gl_checker.print_approval_pull_request()
-    if json_output:
-        gl_checker.save_results()
-    if send_email:
-        if not gl_checker.send_results(send_email):
+    # Backends are imported by the subcommand that uses them, so GitHub runs never import python-gitlab
+    from auto_merger.email import Mailer
+    from auto_merger.gitlab_checker import GitLabStatusChecker
+
+    config = apply_shard(config, "gitlab", shard)
+    gl_checker = GitLabStatusChecker(config=config, json_output_file=json_output, jobs=jobs)
+    own_mailer = mailer is None
+    mailer = mailer or Mailer.from_config(config, timings=gl_checker.timings)
+    ret_value = False
+    try:
+        if not gl_checker.check_gitlab_status():
             return 1
-    return ret_value
+        # Blocked merge requests are streamed to the outputs while the projects are checked
+        with open_report(get_outputs(json_output, output, output_format), email=bool(send_email)) as report:
+            ret_value = gl_checker.check_all_containers(report)
+        if not ret_value:
+            return ret_value
+        if send_email:
+            if not gl_checker.send_results(send_email, report.get_email_body(), mailer=mailer):
+                return 1
+        return ret_value
+    finally:
+        if own_mailer:
+            mailer.close()
+        report_run(
+            "gitlab-checker", gl_checker.timings, gl_checker.metrics, bool(ret_value), json_output, metrics_textfile
+        )
 
 
-def pull_request_checker(config: Config, send_email: list[str] | None, json_output: str = "") -> int:
+def pull_request_checker(
+    config: Config,
+    send_email: list[str] | None,
+    json_output: str = "",
+    jobs: int = 1,
+    use_cache: bool = True,
+    metrics_textfile: str = "",
+    output: str = "",
+    output_format: str = "",
+    mailer: "Mailer | None" = None,
+    shard: Shard | None = None,
+) -> int:
     """
     Checks NVR from brew build against pulp
     """
     logger.debug(f"Configuration: {config.__str__()}")
     logger.debug(f"Json path: {json_output}")
-    gh_checker = GitHubStatusChecker(config=config, json_output_file=json_output)
+    from auto_merger.email import Mailer
+    from auto_merger.github_checker import GitHubStatusChecker
+
+    config = apply_shard(config, "github", shard)
+    gh_checker = GitHubStatusChecker(config=config, json_output_file=json_output, jobs=jobs, use_cache=use_cache)
+    own_mailer = mailer is None
+    mailer = mailer or Mailer.from_config(config, timings=gh_checker.timings)
+    ret_value = False
     try:
         if not gh_checker.check_github_status():
             return 1
 
-        ret_value = gh_checker.check_all_containers()
+        # Blocked pull requests are streamed to the outputs while the repositories are checked
+        with open_report(get_outputs(json_output, output, output_format), email=bool(send_email)) as report:
+            ret_value = gh_checker.check_all_containers(report)
         if not ret_value:
             return ret_value
-        gh_checker.print_blocked_pull_request()
-        gh_checker.print_approval_pull_request()
-        if json_output:
-            gh_checker.save_results()
         if send_email:
-            if not gh_checker.send_results(send_email):
+            if not gh_checker.send_results(send_email, report.get_email_body(), mailer=mailer):
                 return 1
     finally:
+        # Emails are delivered in the background while the checkouts are removed
+        if own_mailer:
+            mailer.flush()
         gh_checker.clean_temporary_dir()
+        if own_mailer:
+            mailer.close()
+        report_run(
+            "github-checker", gh_checker.timings, gh_checker.metrics, bool(ret_value), json_output, metrics_textfile
+        )
 
 
-def merger(config: Config, send_email: list[str] | None) -> int:
+def merger(
+    config: Config,
+    send_email: list[str] | None,
+    jobs: int = 1,
+    use_cache: bool = True,
+    metrics_textfile: str = "",
+    mailer: "Mailer | None" = None,
+    shard: Shard | None = None,
+) -> int:
     logger.debug(f"Configuration: {config.__str__()}")
-    auto_merger = AutoMerger(config=config)
-    ret_value = auto_merger.check_all_containers()
+    from auto_merger.email import Mailer
+    from auto_merger.merger import AutoMerger
+
+    config = apply_shard(config, "github", shard)
+    auto_merger = AutoMerger(config=config, jobs=jobs, use_cache=use_cache)
+    own_mailer = mailer is None
+    mailer = mailer or Mailer.from_config(config, timings=auto_merger.timings)
+    ret_value = False
     try:
+        ret_value = auto_merger.check_all_containers()
         if not ret_value:
             return ret_value
-        is_there_pr_to_merge = auto_merger.print_pull_request_to_merge()
-        if not is_there_pr_to_merge:
-            return 0
+        is_there_pr_to_merge = any(auto_merger.pr_to_merge.values())
+        if is_there_pr_to_merge:
+            auto_merger.merge_pull_requests()
+        else:
+            logger.info("There is nothing to send or merge.")
+        with open_report(email=bool(send_email)) as report:
+            auto_merger.write_report(report)
+        if send_email and is_there_pr_to_merge:
+            if not auto_merger.send_results(send_email, report.get_email_body(), mailer=mailer):
+                return 1
+    finally:
+        if own_mailer:
+            mailer.flush()
+        auto_merger.clean_temporary_dir()
+        if own_mailer:
+            mailer.close()
+        report_run(
+            "merger", auto_merger.timings, auto_merger.metrics, bool(ret_value), metrics_textfile=metrics_textfile
+        )
+
+
+def run(
+    config: Config,
+    send_email: list[str] | None,
+    json_output: str = "",
+    jobs: int = 1,
+    use_cache: bool = True,
+    metrics_textfile: str = "",
+    output: str = "",
+    output_format: str = "",
+    shard: Shard | None = None,
+) -> int:
+    """
+    Fetches pull requests once and feeds them to the checker and merger stages, followed by GitLab merge requests
+    when configured. The results are reported together and sent by one email. GitLab results are printed
+    and sent by email only, they are not written to 'json_output' and 'output'.
+    """
+    logger.debug(f"Configuration: {config.__str__()}")
+    from auto_merger.email import Mailer
+    from auto_merger.github_checker import GitHubStatusChecker
+    from auto_merger.merger import AutoMerger
+
+    config = apply_shard(apply_shard(config, "github", shard), "gitlab", shard)
+    gh_checker = GitHubStatusChecker(config=config, json_output_file=json_output, jobs=jobs, use_cache=use_cache)
+    auto_merger = AutoMerger(
+        config=config,
+        jobs=jobs,
+        use_cache=use_cache,
+        timings=gh_checker.timings,
+        metrics=gh_checker.metrics,
+        snapshot=gh_checker.snapshot,
+    )
+    mailer = Mailer.from_config(config, timings=gh_checker.timings)
+    success = False
+    try:
+        if not gh_checker.check_github_status() or not gh_checker.check_all_containers():
+            return 1
+        if not auto_merger.check_all_containers():
+            return 1
         auto_merger.merge_pull_requests()
+        with gh_checker.timings.span("report"):
+            with open_report(get_outputs(json_output, output, output_format), email=bool(send_email)) as report:
+                report.start(gh_checker.get_report_title())
+                gh_checker.write_sections(report)
+                auto_merger.write_sections(report)
+                report.finish()
         if send_email:
-            if not auto_merger.send_results(send_email):
-                return 1
+            gh_checker.send_results(send_email, report.get_email_body(), mailer=mailer)
+        success = True
+        if config.gitlab and config.gitlab.get("repos"):
+            success = run_gitlab_stage(config, send_email, jobs, gh_checker.timings, gh_checker.metrics, mailer)
     finally:
+        mailer.flush()
+        gh_checker.clean_temporary_dir()
         auto_merger.clean_temporary_dir()
+        if not mailer.close():
+            success = False
+        report_run("run", gh_checker.timings, gh_checker.metrics, success, json_output, metrics_textfile)
+    return 0 if success else 1
+
+
+def run_gitlab_stage(
+    config: Config, send_email: list[str] | None, jobs: int, timings: Timings, metrics: Metrics, mailer: "Mailer"
+) -> bool:
+    """
+    GitLab stage of 'run', its report is printed to the console and added to the email of the run.
+    The report is not streamed to the output files, they hold GitHub results only, as 'combine' expects.
+    """
+    from auto_merger.gitlab_checker import GitLabStatusChecker
+
+    gl_checker = GitLabStatusChecker(config=config, json_output_file=None, jobs=jobs, timings=timings, metrics=metrics)
+    if not gl_checker.check_gitlab_status():
+        return False
+    with open_report(email=bool(send_email)) as report:
+        if not gl_checker.check_all_containers(report):
+            return False
+    if send_email:
+        gl_checker.send_results(send_email, report.get_email_body(), mailer=mailer)
+    return True
+
+
+def combine(
+    config: Config,
+    paths: list[str],
+    gitlab: bool = False,
+    send_email: list[str] | None = None,
+    json_output: str = "",
+    output: str = "",
+    output_format: str = "",
+    mailer: "Mailer | None" = None,
+) -> int:
+    """
+    Combines JSON outputs of checker shards into one report and one email
+    """
+    from auto_merger.email import Mailer
+
+    if gitlab:
+        from auto_merger.gitlab_checker import GitLabStatusChecker
+
+        checker = GitLabStatusChecker(config=config)
+    else:
+        from auto_merger.github_checker import GitHubStatusChecker
+
+        checker = GitHubStatusChecker(config=config)
+    changes = combine_results(paths, checker.blocked, checker.mergeable)
+    if changes is None:
+        return 1
+    if not gitlab:
+        checker.changes = changes
+    with open_report(get_outputs(json_output, output, output_format), email=bool(send_email)) as report:
+        checker.write_report(report)
+    if send_email:
+        own_mailer = mailer is None
+        mailer = mailer or Mailer.from_config(config, timings=checker.timings)
+        checker.send_results(send_email, report.get_email_body(), mailer=mailer)
+        if own_mailer and not mailer.close():
+            return 1
+    return 0
+
+
+def serve(config: Config, host: str, port: int, reconcile_interval: int, jobs: int = 1) -> int:
+    """
+    Runs the webhook server until it is interrupted
+    """
+    logger.debug(f"Configuration: {config.__str__()}")
+    from auto_merger.server import WebhookServer
+
+    server = WebhookServer(config=config, host=host, port=port, reconcile_interval=reconcile_interval, jobs=jobs)
+    if server.github_checker and not server.github_checker.is_authenticated():
+        server.stop()
+        return 1
+    if server.gitlab_checker and not server.gitlab_checker.check_gitlab_status():
+        server.stop()
+        return 1
+    server.start()
+    logger.info(f"Listening for webhooks on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Stopping the webhook server")
+    finally:
+        server.stop()
+    return 0
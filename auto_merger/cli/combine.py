@@ -0,0 +1,74 @@
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import click
+import sys
+
+from auto_merger.config import pass_config
+from auto_merger import api
+from auto_merger.report import REPORT_FORMATS
+
+
+@click.command("combine")
+@click.argument("results", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--gitlab",
+    is_flag=True,
+    default=False,
+    help="Combine results of gitlab-checker shards instead of github-checker shards.",
+)
+@click.option(
+    "--send-email",
+    multiple=True,
+    help="Specify email addresses to which the mail will be sent.",
+)
+@click.option(
+    "--json-output",
+    multiple=False,
+    help="Save the combined results in json format.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Stream the report to this file, '-' for the standard output. The file is replaced once complete.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(REPORT_FORMATS),
+    help="Format of --output. Guessed from the file suffix by default (.jsonl, .html, .md), JSON otherwise.",
+)
+@pass_config
+def combine(config, results, gitlab, send_email, json_output, output, output_format):
+    """
+    Combines --json-output files of checker shards into one report.
+    """
+    ret_value = api.combine(
+        config=config,
+        paths=list(results),
+        gitlab=gitlab,
+        send_email=send_email,
+        json_output=json_output,
+        output=output,
+        output_format=output_format,
+    )
+    sys.exit(ret_value)
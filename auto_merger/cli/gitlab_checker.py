@@ -27,6 +27,8 @@ import sys
 
 from auto_merger.config import pass_config
 from auto_merger import api
+from auto_merger.sharding import SHARD
+from auto_merger.report import REPORT_FORMATS
 
 logger = logging.getLogger("auto-merger")
 
@@ -42,7 +44,44 @@ logger = logging.getLogger("auto-merger")
     multiple=False,
     help="Save auto-merge outputs in json format. Default is current working directory.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of repositories checked in parallel.",
+)
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(dir_okay=False),
+    help="Write Prometheus metrics of the run to this file for the node exporter textfile collector.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Stream the report to this file, '-' for the standard output. The file is replaced once complete.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(REPORT_FORMATS),
+    help="Format of --output. Guessed from the file suffix by default (.jsonl, .html, .md), JSON otherwise.",
+)
+@click.option(
+    "--shard",
+    type=SHARD,
+    help="Check only the K-th of N disjoint subsets of the configured repositories, e.g. 2/4.",
+)
 @pass_config
-def gitlab_checker(config, send_email, json_output):
-    ret_value = api.merge_request_checker(config=config, send_email=send_email, json_output=json_output)
+def gitlab_checker(config, send_email, json_output, jobs, metrics_textfile, output, output_format, shard):
+    ret_value = api.merge_request_checker(
+        config=config,
+        send_email=send_email,
+        json_output=json_output,
+        jobs=jobs,
+        metrics_textfile=metrics_textfile,
+        output=output,
+        output_format=output_format,
+        shard=shard,
+    )
     sys.exit(ret_value)
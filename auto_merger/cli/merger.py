@@ -26,6 +26,7 @@ import sys
 
 from auto_merger.config import pass_config
 from auto_merger import api
+from auto_merger.sharding import SHARD
 
 
 @click.command("merger")
@@ -34,7 +35,38 @@ from auto_merger import api
     multiple=True,
     help="Specify email addresses to which the mail will be sent.",
 )
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of repositories checked and merged in parallel.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Do not use the cache of pull requests from previous runs.",
+)
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(dir_okay=False),
+    help="Write Prometheus metrics of the run to this file for the node exporter textfile collector.",
+)
+@click.option(
+    "--shard",
+    type=SHARD,
+    help="Check only the K-th of N disjoint subsets of the configured repositories, e.g. 2/4.",
+)
 @pass_config
-def merger(config, send_email):
-    ret_value = api.merger(config=config, send_email=send_email)
+def merger(config, send_email, jobs, no_cache, metrics_textfile, shard):
+    ret_value = api.merger(
+        config=config,
+        send_email=send_email,
+        jobs=jobs,
+        use_cache=not no_cache,
+        metrics_textfile=metrics_textfile,
+        shard=shard,
+    )
     sys.exit(ret_value)
@@ -0,0 +1,93 @@
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import click
+import sys
+
+from auto_merger.config import pass_config
+from auto_merger import api
+from auto_merger.sharding import SHARD
+from auto_merger.report import REPORT_FORMATS
+
+
+@click.command("run")
+@click.option(
+    "--send-email",
+    multiple=True,
+    help="Specify email addresses to which the mail will be sent.",
+)
+@click.option(
+    "--json-output",
+    multiple=False,
+    help="Save auto-merge outputs in json format. Default is current working directory.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of repositories checked and merged in parallel.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    default=False,
+    help="Do not use the cache of pull requests from previous runs.",
+)
+@click.option(
+    "--metrics-textfile",
+    type=click.Path(dir_okay=False),
+    help="Write Prometheus metrics of the run to this file for the node exporter textfile collector.",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, allow_dash=True),
+    help="Stream the report to this file, '-' for the standard output. The file is replaced once complete.",
+)
+@click.option(
+    "--output-format",
+    type=click.Choice(REPORT_FORMATS),
+    help="Format of --output. Guessed from the file suffix by default (.jsonl, .html, .md), JSON otherwise.",
+)
+@click.option(
+    "--shard",
+    type=SHARD,
+    help="Check only the K-th of N disjoint subsets of the configured repositories, e.g. 2/4.",
+)
+@pass_config
+def run(config, send_email, json_output, jobs, no_cache, metrics_textfile, output, output_format, shard):
+    """
+    Checks and merges pull requests fetched once, followed by GitLab merge requests when configured.
+    """
+    ret_value = api.run(
+        config=config,
+        send_email=send_email,
+        json_output=json_output,
+        jobs=jobs,
+        use_cache=not no_cache,
+        metrics_textfile=metrics_textfile,
+        output=output,
+        output_format=output_format,
+        shard=shard,
+    )
+    sys.exit(ret_value)
@@ -0,0 +1,52 @@
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import click
+import sys
+
+from auto_merger.config import pass_config
+from auto_merger import api
+
+
+@click.command("serve")
+@click.option("--host", default="127.0.0.1", show_default=True, help="Address the webhook server listens on.")
+@click.option("--port", type=int, default=8080, show_default=True, help="Port the webhook server listens on.")
+@click.option(
+    "--reconcile-interval",
+    type=int,
+    default=3600,
+    show_default=True,
+    help="Seconds between full checks of all repositories.",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Number of repositories checked in parallel.",
+)
+@pass_config
+def serve(config, host, port, reconcile_interval, jobs):
+    ret_value = api.serve(config=config, host=host, port=port, reconcile_interval=reconcile_interval, jobs=jobs)
+    sys.exit(ret_value)
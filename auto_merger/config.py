@@ -32,6 +32,12 @@ from auto_merger.exceptions import AutoMergerConfigException
 
 logger = logging.getLogger(__name__)
 
+# 'gh' runs gh commands for each repository, 'graphql' fetches all repositories by batched GraphQL queries,
+# 'api' sends the batched queries and merges by the in-process HTTP client
+GITHUB_BACKENDS = ("gh", "graphql", "api")
+# 'python-gitlab' checks projects by the worker pool, 'async' overlaps all GitLab requests in one event loop
+GITLAB_BACKENDS = ("python-gitlab", "async")
+
 
 class Config:
     def __init__(self):
@@ -39,6 +45,7 @@ class Config:
         self.github: dict = {}
         self.gitlab: dict = {}
         self.enable_gitlab: bool = False
+        self.email: dict = {}
 
     @classmethod
     def get_default_config(cls) -> "Config":
@@ -59,6 +66,7 @@ class Config:
         config.debug = raw_dict.get("debug", True)
         config.github = raw_dict.get("github", None)
         config.gitlab = raw_dict.get("gitlab", None)
+        config.email = raw_dict.get("email", None) or {}
         if config.github:
             if "approvals" not in config.github:
                 config.github["approvals"] = 2
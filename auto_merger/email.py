@@ -20,47 +20,202 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import html
+import queue
 import smtplib
 import logging
+import threading
 
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
+from auto_merger.timing import Timings
+
 logger = logging.getLogger(__name__)
 
+SEND_FROM = "phracek@redhat.com"
+
 
 class EmailSender:
-    def __init__(self, recipient_email=None):
+    def __init__(self, recipient_email=None, timings: Timings | None = None, send_from: str = SEND_FROM):
+        self.timings = timings or Timings()
         if recipient_email is None:
             recipient_email = []
         self.recipient_email = recipient_email
         self.mime_msg = MIMEMultipart()
-        self.send_from = ""
+        self.send_from = send_from
         self.send_to = [""]
 
     def create_email_msg(self, subject_msg: str):
         if not self.recipient_email:
             logger.error("No recipients specified. Use --send-email")
             return None
-        self.send_from = "phracek@redhat.com"
-        self.send_to = self.recipient_email
-        if self.recipient_email is not None:
-            self.send_to.extend(self.recipient_email)
+        self.send_to = list(self.recipient_email)
         self.mime_msg["From"] = self.send_from
         self.mime_msg["To"] = ", ".join(self.send_to)
         self.mime_msg["Subject"] = subject_msg
 
-    def send_email(self, subject_msg, body=None):
+    def get_message(self, subject_msg: str, body: str) -> MIMEMultipart:
+        msg = "<html><head><style>table, th, td {border: 1px solid black;}</style></head>" f"<body>{body}</body></html>"
+        self.create_email_msg(subject_msg)
+        self.mime_msg.attach(MIMEText(msg, "html"))
+        return self.mime_msg
+
+    def send_email(self, subject_msg, body=None, mailer: "Mailer | None" = None):
+        """
+        Adds the email to the mailer. Without mailer the email is sent right away.
+        """
         if body is None:
             body = []
-        whole_body = "".join(body)
-        msg = (
-            "<html><head><style>table, th, td {border: 1px solid black;}</style></head>"
-            f"<body>{whole_body}</body></html>"
+        if mailer is None:
+            with Mailer(send_from=self.send_from, timings=self.timings) as own_mailer:
+                own_mailer.add(self.recipient_email, subject_msg, "".join(body))
+            return
+        mailer.add(self.recipient_email, subject_msg, "".join(body))
+
+
+class Mailer:
+    """
+    Delivers emails by a background thread over one SMTP connection,
+    which is reused for all messages of the run or of the server lifetime.
+    Emails added for the same recipients are sent as one digest by 'flush'.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 25,
+        timeout: float = 30.0,
+        send_from: str = SEND_FROM,
+        timings: Timings | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.send_from = send_from
+        self.timings = timings or Timings()
+        self.pending: dict[tuple, list[tuple[str, str]]] = {}
+        self.queue: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+        self.smtp: smtplib.SMTP | None = None
+        self.sent = 0
+        self.failed = 0
+
+    @classmethod
+    def from_config(cls, config, timings: Timings | None = None) -> "Mailer":
+        email = config.email or {}
+        return cls(
+            host=email.get("smtp_host", "127.0.0.1"),
+            port=email.get("smtp_port", 25),
+            timeout=email.get("smtp_timeout", 30.0),
+            send_from=email.get("from", SEND_FROM),
+            timings=timings,
         )
-        self.create_email_msg(subject_msg)
-        self.mime_msg.attach(MIMEText(msg, "html"))
-        smtp = smtplib.SMTP("127.0.0.1")
-        smtp.sendmail(self.send_from, self.send_to, self.mime_msg.as_string())
-        smtp.close()
-        logger.info("Sending email finished")
+
+    def __enter__(self) -> "Mailer":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add(self, recipients: list[str], subject: str, body: str) -> bool:
+        """
+        Adds email to the digest of its recipients, it is sent by the next 'flush'
+        """
+        key = tuple(sorted(set(recipients)))
+        if not key:
+            logger.error("No recipients specified. Use --send-email")
+            return False
+        with self.lock:
+            self.pending.setdefault(key, []).append((subject, body))
+        return True
+
+    def get_digest(self, recipients: tuple, parts: list[tuple[str, str]]) -> MIMEMultipart:
+        if len(parts) == 1:
+            subject, body = parts[0]
+        else:
+            subject = f"auto-merger digest: {', '.join(part_subject for part_subject, _ in parts)}"
+            body = "".join(f"<h2>{html.escape(part_subject)}</h2>{part_body}" for part_subject, part_body in parts)
+        return EmailSender(recipient_email=list(recipients), send_from=self.send_from).get_message(subject, body)
+
+    def flush(self) -> int:
+        """
+        Queues one digest per recipients for the background delivery
+        :return: number of queued emails
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        for recipients, parts in pending.items():
+            self.queue.put((recipients, self.get_digest(recipients, parts)))
+        if pending:
+            self.start()
+        return len(pending)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name="mailer", daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.disconnect()
+                return
+            self.deliver(*item)
+
+    def connect(self) -> smtplib.SMTP:
+        if self.smtp is None:
+            self.smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        return self.smtp
+
+    def disconnect(self):
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+        self.smtp = None
+
+    def deliver(self, recipients: tuple, message: MIMEMultipart) -> bool:
+        for retry in (True, False):
+            try:
+                with self.timings.span("smtp"):
+                    self.connect().sendmail(self.send_from, list(recipients), message.as_string())
+            except smtplib.SMTPServerDisconnected as sd:
+                # SMTP servers close idle connections, the reused one is opened again once
+                self.smtp = None
+                if retry:
+                    continue
+                error: Exception = sd
+            except (smtplib.SMTPException, OSError) as ex:
+                self.disconnect()
+                error = ex
+            else:
+                logger.info(f"Sending email to {', '.join(recipients)} finished")
+                self.sent += 1
+                return True
+            logger.error(f"Sending email to {', '.join(recipients)} failed. {error}")
+            self.failed += 1
+            return False
+        return False
+
+    def close(self, timeout: float | None = None) -> bool:
+        """
+        Flushes pending emails and waits until they are delivered
+        :param timeout: how many seconds to wait at most, 'timeout' of the mailer by default
+        :return: True in case all emails were delivered
+        """
+        self.flush()
+        thread = self.thread
+        if thread is None:
+            return self.failed == 0
+        self.queue.put(None)
+        thread.join(self.timeout if timeout is None else timeout)
+        if thread.is_alive():
+            logger.error("Sending emails did not finish in time.")
+            return False
+        return self.failed == 0
@@ -31,3 +31,7 @@ class AutoMergerNetworkException(Exception):
 
 class AutoMergerConfigException(Exception):
     pass
+
+
+class AutoMergerReportIncomplete(Exception):
+    pass
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import os
+import re
+import shutil
+import threading
+
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from auto_merger import utils
+from auto_merger.http_cache import DEFAULT_CACHE_DIR
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIRROR_DIR = DEFAULT_CACHE_DIR / "mirrors"
+# Stamp file in each mirror, its modification time is used as the last access time
+LAST_USED = "auto-merger-last-used"
+
+
+def get_directory_size(path: Path) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+class GitMirrorCache:
+    """
+    Persistent bare mirrors of repositories. The first run makes a blobless clone,
+    later runs only fetch new commits. Checkouts are git worktrees of the mirror,
+    so they share its objects. Mirrors not used for the longest time are removed above 'max_size'.
+    """
+
+    def __init__(self, directory: Path | str = DEFAULT_MIRROR_DIR, max_size: int = 2 * 2**30):
+        self.directory = Path(directory).expanduser()
+        self.max_size = max_size
+        self.locks: dict = {}
+        self.lock = threading.Lock()
+
+    def get_mirror_path(self, url: str) -> Path:
+        name = re.sub(r"^[a-z+]+://", "", url.rstrip("/"))
+        name = re.sub(r"\.git$", "", name)
+        return self.directory / (re.sub(r"[^A-Za-z0-9._-]+", "_", name) + ".git")
+
+    def get_lock(self, path: Path) -> threading.Lock:
+        with self.lock:
+            return self.locks.setdefault(path, threading.Lock())
+
+    @staticmethod
+    def git(*args) -> str:
+        return utils.run_command(["git", *[str(arg) for arg in args]], shell=False)
+
+    def update(self, url: str) -> Path:
+        """
+        Function clones the repository into the cache or fetches new commits of an existing mirror
+        :param url: URL of the repository
+        :return: path to the bare mirror
+        Raises subprocess.CalledProcessError if git fails
+        """
+        path = self.get_mirror_path(url)
+        with self.get_lock(path):
+            if (path / "HEAD").exists():
+                logger.debug(f"Fetching {url} into {path}")
+                self.git("-C", path, "fetch", "--prune", "origin", "+refs/heads/*:refs/heads/*")
+                self.git("-C", path, "worktree", "prune")
+            else:
+                logger.debug(f"Cloning {url} into {path}")
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Clone next to the mirror first, so an interrupted clone is never used as a mirror
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                try:
+                    self.git("clone", "--bare", "--filter=blob:none", url, tmp_path)
+                except CalledProcessError:
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                    raise
+                tmp_path.replace(path)
+            (path / LAST_USED).touch()
+        return path
+
+    def add_worktree(self, url: str, worktree: Path | str, ref: str = "HEAD") -> Path:
+        """
+        Function creates checkout of the repository from its mirror
+        :param url: URL of the repository
+        :param worktree: directory of the checkout, it must not exist
+        :param ref: branch or commit to check out
+        :return: path to the checkout
+        """
+        path = self.update(url)
+        worktree = Path(worktree)
+        worktree.parent.mkdir(parents=True, exist_ok=True)
+        with self.get_lock(path):
+            self.git("-C", path, "worktree", "add", "--detach", worktree, ref)
+        return worktree
+
+    def remove_worktree(self, url: str, worktree: Path | str):
+        path = self.get_mirror_path(url)
+        with self.get_lock(path):
+            shutil.rmtree(worktree, ignore_errors=True)
+            if (path / "HEAD").exists():
+                self.git("-C", path, "worktree", "prune")
+
+    def evict(self, keep: list[str] | tuple = ()):
+        """
+        Removes mirrors that were not used for the longest time until the cache fits into 'max_size'
+        :param keep: URLs of repositories that are never removed, like the ones used by this run
+        """
+        if not self.directory.is_dir():
+            return
+        kept = {self.get_mirror_path(url) for url in keep}
+        mirrors = []
+        for path in self.directory.glob("*.git"):
+            stamp = path / LAST_USED
+            last_used = stamp.stat().st_mtime if stamp.exists() else 0
+            mirrors.append((last_used, get_directory_size(path), path))
+        total_size = sum(size for _, size, _ in mirrors)
+        for _, size, path in sorted(mirrors):
+            if total_size <= self.max_size:
+                break
+            if path in kept:
+                continue
+            logger.debug(f"Evicting mirror {path}")
+            with self.get_lock(path):
+                shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
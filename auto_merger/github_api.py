@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import hashlib
+import logging
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from auto_merger import utils
+from auto_merger.github_graphql import GitHubGraphQL, PULL_REQUEST_FIELDS
+from auto_merger.http_cache import HttpCache
+from auto_merger.metrics import Metrics
+from auto_merger.named_tuples import CacheEntry
+from auto_merger.rate_limit import RateLimitScheduler, ScheduledSession, get_scheduler
+
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = "https://api.github.com"
+# Validators of the pull request listing cover its first page only
+PULLS_PER_PAGE = 100
+
+
+class GitHubClient:
+    """
+    In-process GitHub client. All requests share one keep-alive session,
+    so the TLS connection is reused instead of spawning 'gh' for every call.
+    """
+
+    def __init__(
+        self,
+        token: str | None = None,
+        api_url: str = GITHUB_API_URL,
+        pool_size: int = 10,
+        cache: HttpCache | None = None,
+        metrics: Metrics | None = None,
+        scheduler: RateLimitScheduler | None = None,
+    ):
+        self.token = token if token is not None else os.getenv("GH_TOKEN", "")
+        self.api_url = api_url.rstrip("/")
+        self.cache = cache
+        self.timeout = 30
+        # Requests wait for free rate limit and are retried when the limit is exceeded
+        self.session = ScheduledSession(scheduler or get_scheduler(), token=self.token)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update(
+            {
+                "Accept": "application/vnd.github+json",
+                "Authorization": f"Bearer {self.token.strip()}",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+        )
+        if metrics:
+            self.session.hooks["response"].append(metrics.observe_rate_limit("github", "X-RateLimit-Remaining"))
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        logger.debug(f"GitHub API request: {method} {url}")
+        response = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def get_json(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs).json()
+
+    def graphql(self, query: str) -> dict:
+        """
+        Executes GraphQL query
+        :param query: GraphQL query
+        :return: dictionary with the whole GraphQL response, including 'errors'
+        """
+        return self.request("POST", "/graphql", json={"query": query}).json()
+
+    def is_authenticated(self) -> bool:
+        if not self.token:
+            logger.critical("Environment variable GH_TOKEN is not specified.")
+            return False
+        try:
+            user = self.get_json("/user")
+        except requests.RequestException as re:
+            logger.error(f"Authentication to GitHub failed. {re}")
+            return False
+        logger.debug(f"Authenticated to GitHub as {user.get('login')}")
+        return True
+
+    def get_repository_name(self, namespace: str, repo: str) -> str:
+        return self.get_json(f"/repos/{namespace}/{repo}")["name"]
+
+    def merge_pull_request(self, namespace: str, repo: str, number: int, merge_method: str = "rebase") -> dict:
+        return self.request(
+            "PUT", f"/repos/{namespace}/{repo}/pulls/{number}/merge", json={"merge_method": merge_method}
+        ).json()
+
+    def conditional_get(self, path: str, entry: CacheEntry | None = None, **kwargs) -> requests.Response:
+        """
+        Sends GET request with validators of the cache entry.
+        Response 304 Not Modified does not count against the rate limit.
+        """
+        headers = {}
+        if entry and entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry and entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        response = self.session.get(f"{self.api_url}{path}", headers=headers, timeout=self.timeout, **kwargs)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
+    def get_cache_key(self, namespace: str, repo: str) -> str:
+        fields_hash = hashlib.sha256(PULL_REQUEST_FIELDS.encode()).hexdigest()[:12]
+        return f"{self.api_url}/repos/{namespace}/{repo}/pulls:{fields_hash}"
+
+    def get_open_pull_requests(self, namespace: str, repos: list[str], jobs: int = 1) -> dict:
+        """
+        Function returns opened pull requests of all repositories.
+        When the cache is enabled, the opened pull request listing of each repository is requested
+        conditionally first and only the changed repositories are fetched by GraphQL.
+        Repositories with more opened pull requests than one listing page holds are never cached.
+        :param namespace: GitHub organization
+        :param repos: list of repository names
+        :param jobs: int, how many conditional requests are sent at once
+        :return: dictionary with repository name and list of its pull requests, None for missing repositories
+        """
+        graphql = GitHubGraphQL(namespace=namespace, executor=self.graphql)
+        if not self.cache:
+            return graphql.get_pull_requests(repos)
+
+        def validate(repo: str) -> tuple[CacheEntry | None, tuple]:
+            key = self.get_cache_key(namespace, repo)
+            entry = self.cache.get(key)
+            try:
+                response = self.conditional_get(
+                    f"/repos/{namespace}/{repo}/pulls", entry, params={"state": "open", "per_page": PULLS_PER_PAGE}
+                )
+            except requests.HTTPError as he:
+                logger.debug(f"Conditional request for {namespace}/{repo} failed. {he}")
+                return None, (None, None)
+            if "next" in response.links:
+                # Changes on the other pages are not seen by the validators, the repository is not cached
+                return None, (None, None)
+            if response.status_code == 304 and entry:
+                self.cache.touch(key)
+                return entry, (entry.etag, entry.last_modified)
+            return None, (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+        results: dict = {}
+        validators: dict = {}
+        for repo, (entry, validator) in zip(repos, utils.run_parallel(validate, repos, jobs=jobs)):
+            if entry:
+                results[repo] = entry.data
+            else:
+                validators[repo] = validator
+        logger.info(f"{len(results)} of {len(repos)} repositories did not change since the last run.")
+        if validators:
+            for repo, pull_requests in graphql.get_pull_requests(list(validators)).items():
+                results[repo] = pull_requests
+                etag, last_modified = validators[repo]
+                # A full first page may hide changes on the next one
+                cacheable = pull_requests is not None and len(pull_requests) < PULLS_PER_PAGE
+                if cacheable and (etag or last_modified):
+                    self.cache.set(self.get_cache_key(namespace, repo), etag, last_modified, pull_requests)
+        self.cache.evict()
+        return {repo: results[repo] for repo in repos}
+
+    def close(self):
+        self.session.close()
@@ -23,46 +23,55 @@
 # SOFTWARE.
 
 
-import json
 import subprocess
 import os
-import shutil
 import logging
 
-
-from subprocess import CalledProcessError
-
-from typing import Any
-from pathlib import Path
+import requests
 
 from auto_merger import utils
-from auto_merger.email import EmailSender
+from auto_merger.email import EmailSender, Mailer
 from auto_merger.config import Config
-from auto_merger.pull_request_handler import PullRequestHandler
-from auto_merger.utils import cwd
+from auto_merger.github_fetcher import GitHubFetcher
+from auto_merger.metrics import Metrics
+from auto_merger.named_tuples import PolicyResult, Section
+from auto_merger.policy import POLICY_VERSION, Policy
+from auto_merger.report import Report
+from auto_merger.results import ResultStore, get_record, record_to_dict
+from auto_merger.timing import Timings
+from auto_merger.state_store import (
+    VERDICT_BLOCKED,
+    VERDICT_DROPPED,
+    VERDICT_MERGEABLE,
+    get_fingerprint,
+)
 
 
 logger = logging.getLogger(__name__)
 
 
-class GitHubStatusChecker:
-    container_name: str = ""
-    container_dir: Path
-    current_dir = os.getcwd()
+class GitHubStatusChecker(GitHubFetcher):
+    state_scope = "github-checker"
 
-    def __init__(self, config: Config, json_output_file: str = ""):
-        self.config = config
+    def __init__(
+        self,
+        config: Config,
+        json_output_file: str = "",
+        jobs: int = 1,
+        use_cache: bool = True,
+        timings: Timings | None = None,
+        metrics: Metrics | None = None,
+    ):
+        super().__init__(config, jobs=jobs, use_cache=use_cache, timings=timings, metrics=metrics)
         self.approval_labels = self.config.github["approval_labels"]
         self.blocking_labels = self.config.github["blocker_labels"]
         self.approvals = self.config.github["approvals"]
-        self.namespace = self.config.github["namespace"]
-        self.blocked_pr: dict = {}
-        self.pr_to_merge: dict = {}
-        self.blocked_body: list = []
-        self.approval_body: list = []
-        self.repo_data: list = []
-        self.temp_dir = utils.temporary_dir()
+        self.policy = Policy.from_config(self.config.github)
+        self.blocked = ResultStore()
+        self.mergeable = ResultStore()
         self.json_output_file = json_output_file
+        # Pull requests fetched by this run, reused by the merger stage of 'auto-merger run'
+        self.snapshot: dict = {}
 
     def check_github_status(self) -> bool:
         if "repos" not in self.config.github:
@@ -72,35 +81,14 @@ class GitHubStatusChecker:
                 return False
         return True
 
-    def is_correct_repo(self) -> bool:
-        cmd = ["gh repo view --json name"]
-        repo_name = GitHubStatusChecker.get_gh_json_output(cmd=cmd)
-        logger.debug(repo_name)
-        if repo_name["name"] == self.container_name:
-            return True
-        return False
-
-    @staticmethod
-    def get_gh_json_output(cmd):
-        gh_repo_list = utils.run_command(cmd=cmd, return_output=True)
-        return json.loads(gh_repo_list)
-
-    def get_gh_pr_list(self):
-        cmd = ["gh pr list -s open --json number,title,labels,reviews,isDraft"]
-        repo_data_output = GitHubStatusChecker.get_gh_json_output(cmd=cmd)
-        for pr in repo_data_output:
-            if PullRequestHandler.is_draft(pull_request=pr):
-                continue
-            if PullRequestHandler.is_changes_requested(pull_request=pr):
-                continue
-            self.repo_data.append(pr)
-
     def is_authenticated(self) -> bool:
         """
         Function check if user is authenticated
         :return: True if user is authenticated
                  False user is not authenticated
         """
+        if self.backend == "api":
+            return self.github_client.is_authenticated()
         token = os.getenv("GH_TOKEN")
         if token is None:
             logger.critical("Environment variable GH_TOKEN is not specified.")
@@ -114,181 +102,241 @@ class GitHubStatusChecker:
             return False
         return True
 
-    def add_blocked_pull_request(self, pull_request=None) -> Any:
+    @property
+    def blocked_pr(self) -> dict:
         """
-        Function adds pull request to self.blocked_pr dictionary with
-        specific fields like 'number' and 'pr_dict': {'title': , 'labels': }
-        :param pull_request: Dictionary with pull request structure
-        :return:
+        Blocked pull requests of every repository as dictionaries, the same as in the JSON output
         """
-        if pull_request is None:
-            pull_request = {}
-        present = False
-        for stored_pr in self.blocked_pr[self.container_name]:
-            if int(stored_pr["number"]) == int(pull_request["number"]):
-                present = True
-        if present:
-            return
-        self.blocked_pr[self.container_name].append(
-            {
-                "number": pull_request["number"],
-                "title": pull_request["title"],
-                "labels": pull_request["labels"],
-            }
-        )
-        logger.debug(f"PR {pull_request['number']} added to blocked")
-        return
-
-    def check_blocked_labels(self):
-        for pr in self.repo_data:
-            logger.debug(f"Checking PR {pr['number']}")
-            if "labels" not in pr:
-                continue
-            for label in pr["labels"]:
-                if label["name"] not in self.blocking_labels:
-                    continue
-                logger.info(f"Add PR'{pr['number']}' of '{self.container_name}' to blocked PRs.")
-                self.add_blocked_pull_request(pull_request=pr)
-
-    def check_pr_to_merge(self) -> bool:
-        if len(self.repo_data) == 0:
-            return False
-        pr_to_merge: bool = False
-        for pr in self.repo_data:
-            logger.debug(f"PR status: {pr}")
-            if not PullRequestHandler.check_labels_to_merge(pull_request=pr, blocking_labels=self.blocking_labels):
-                continue
-            if "reviews" not in pr:
-                continue
-            approval_count = PullRequestHandler.check_pr_approvals(reviews_to_check=pr["reviews"])
-            if approval_count < self.approvals:
-                logger.debug(f"Not enough approvals: {approval_count}. Should be at least {self.approvals}")
-                continue
-            self.pr_to_merge[self.container_name] = {
-                "number": pr["number"],
-                "approvals": approval_count,
-                "title": pr["title"],
-            }
-            pr_to_merge = True
-        return pr_to_merge
-
-    def clone_repo(self):
-        self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
-        try:
-            utils.run_command(
-                f"gh repo clone https://github.com/{self.namespace}/{self.container_name} {self.container_dir}"
-            )
-        except CalledProcessError as cpe:
-            logger.error(cpe.stderr)
-            return False
-        return True
+        return self.blocked.to_dict()
 
-    def merge_pull_requests(self):
-        for pr in self.pr_to_merge:
-            logger.debug(f"PR to merge {pr} in repo {self.container_name}.")
+    def split_pull_requests(self, container_name: str, repo_data: list) -> tuple[list, list]:
+        """
+        Function evaluates pull requests by the policy in one pass
+        :param container_name: repository name in the namespace
+        :param repo_data: list of pull request dictionaries
+        :return: tuple with blocked pull requests and pull requests to merge
+        """
+        blocked_prs: list = []
+        pull_requests: list = []
+        for pr, result in zip(repo_data, self.policy.evaluate_all(repo_data)):
+            record = self.get_result_record(container_name, pr, result)
+            if result.verdict == VERDICT_BLOCKED:
+                blocked_prs.append(record)
+            elif result.verdict == VERDICT_MERGEABLE:
+                pull_requests.append(record)
+        return blocked_prs, pull_requests
 
-    def clean_temporary_dir(self):
-        os.chdir(self.current_dir)
-        if Path(self.temp_dir).exists():
-            shutil.rmtree(self.temp_dir)
+    @staticmethod
+    def get_result_record(container_name: str, pr: dict, result: PolicyResult) -> dict | None:
+        if result.verdict == VERDICT_BLOCKED:
+            logger.info(f"Add PR'{pr['number']}' of '{container_name}' to blocked PRs.")
+            return {"number": pr["number"], "title": pr["title"], "labels": pr["labels"]}
+        if result.verdict == VERDICT_MERGEABLE:
+            return {"number": pr["number"], "approvals": result.approvals, "title": pr["title"]}
+        return None
+
+    def check_container(self, container_name: str) -> tuple[list, list] | None:
+        """
+        Function checks one repository. It does not modify the checker state except of the snapshot
+        of fetched pull requests, so several repositories can be checked in parallel.
+        :param container_name: repository name in the namespace
+        :return: tuple with blocked pull requests and pull requests to merge
+                 None in case the repository could not be checked
+        """
+        logger.info(f"Let's check repository in {self.namespace}/{container_name}")
+        repo_data = self.fetch_pull_requests(container_name)
+        if repo_data is None:
+            return None
+        self.snapshot[container_name] = repo_data
+        with self.timings.span("evaluate", container_name):
+            return self.evaluate_pull_requests(container_name, repo_data)
+
+    def evaluate_pull_requests(self, container_name: str, repo_data: list) -> tuple[list, list]:
+        if self.state_store is None:
+            return self.split_pull_requests(container_name, repo_data)
+        blocked_prs: list = []
+        pull_requests: list = []
+        for pr in repo_data:
+            state = self.state_store.get_verdict(container_name, pr)
+            if state is None:
+                verdict, result = self.evaluate_pull_request(container_name, pr)
+                self.state_store.record(container_name, pr, verdict, result)
+            else:
+                verdict, result = state.verdict, state.result
+            if verdict == VERDICT_BLOCKED:
+                blocked_prs.append(result)
+            elif verdict == VERDICT_MERGEABLE:
+                pull_requests.append(result)
+        return blocked_prs, pull_requests
+
+    def evaluate_pull_request(self, container_name: str, pull_request: dict) -> tuple[str, dict | None]:
+        """
+        Function computes verdict of one pull request
+        :return: tuple with verdict and the pull request record stored in results
+        """
+        result = self.policy.evaluate(pull_request)
+        return result.verdict, self.get_result_record(container_name, pull_request, result)
 
-    def clean_container_dir(self):
-        os.chdir(self.current_dir)
-        if Path(self.container_dir).exists():
-            shutil.rmtree(self.container_dir)
+    def get_pull_request(self, container_name: str, number: int) -> dict | None:
+        """
+        Function returns one pull request of the repository, including its 'state'
+        :param container_name: repository name in the namespace
+        :param number: pull request number
+        :return: pull request dictionary or None in case it could not be fetched
+        """
+        try:
+            if self.backend != "gh":
+                return self.get_graphql().get_pull_request(container_name, number)
+            cmd = [
+                f"gh pr view {int(number)} --repo {self.get_repo_slug(container_name)} "
+                "--json number,title,labels,reviews,reviewDecision,isDraft,createdAt,updatedAt,state"
+            ]
+            return self.get_gh_json_output(cmd=cmd)
+        except (subprocess.CalledProcessError, requests.RequestException, ValueError) as ex:
+            logger.error(f"Fetching pull request {self.get_repo_slug(container_name)}#{number} failed. {ex}")
+            return None
+
+    def check_pull_request(self, container_name: str, number: int) -> str | None:
+        """
+        Function re-evaluates one pull request and updates results of its repository
+        :param container_name: repository name in the namespace
+        :param number: pull request number
+        :return: verdict of the pull request
+                 None in case the pull request could not be fetched
+        """
+        with self.timings.span("pr view", container_name):
+            pull_request = self.get_pull_request(container_name, number)
+        if pull_request is None:
+            return None
+        for results in (self.blocked, self.mergeable):
+            results.add_repo(container_name)
+            results.remove(container_name, number)
+        if pull_request.get("state", "OPEN") != "OPEN" or Policy.is_skipped(pull_request):
+            verdict = VERDICT_DROPPED
+        else:
+            verdict, result = self.evaluate_pull_request(container_name, pull_request)
+            if verdict == VERDICT_BLOCKED:
+                self.blocked.upsert(get_record(container_name, result))
+            elif verdict == VERDICT_MERGEABLE:
+                self.mergeable.upsert(get_record(container_name, result))
+        logger.info(f"Pull request {self.get_repo_slug(container_name)}#{number} is {verdict}.")
+        self.update_metrics(container_name)
+        return verdict
+
+    def set_container_results(self, container_name: str, blocked_prs: list[dict], pull_requests: list[dict]):
+        """
+        Function replaces results of one repository by freshly evaluated pull requests
+        """
+        self.blocked.replace_repo(container_name, [get_record(container_name, pr) for pr in blocked_prs])
+        self.mergeable.replace_repo(container_name, [get_record(container_name, pr) for pr in pull_requests])
+        self.update_metrics(container_name)
+
+    def update_metrics(self, container_name: str):
+        self.metrics.set_repo_counts(
+            "github",
+            container_name,
+            len(self.blocked.get_records(container_name)),
+            len(self.mergeable.get_records(container_name)),
+        )
 
-    def check_all_containers(self) -> bool:
-        if not self.is_authenticated():
+    def check_all_containers(self, report: Report | None = None) -> bool:
+        """
+        Function checks all repositories and streams blocked pull requests of each of them to the report
+        as soon as it is checked, mergeable pull requests and changes since the last run follow at the end
+        :param report: Report rendering the console summary, output files and email, None for no report
+        :return: True when the repositories were checked
+        """
+        with self.timings.span("authenticate"):
+            if not self.is_authenticated():
+                return False
+        repos = self.config.github["repos"]
+        if not self.prefetch_pull_requests(repos):
             return False
-        for container in self.config.github["repos"]:
-            logger.info(f"Let's check repository in {self.namespace}/{container}")
-            self.container_name = container
-            self.repo_data = []
-            if not self.clone_repo():
-                continue
-            with cwd(self.container_dir):
-                if not self.is_correct_repo():
-                    logger.error(f"This is not correct repo {self.container_name}.")
-                    self.clean_container_dir()
-                    continue
-                if self.container_name not in self.blocked_pr:
-                    self.blocked_pr[self.container_name] = []
-                if self.container_name not in self.pr_to_merge:
-                    self.pr_to_merge[self.container_name] = []
-                try:
-                    self.get_gh_pr_list()
-                    self.check_blocked_labels()
-                    self.check_pr_to_merge()
-                except subprocess.CalledProcessError:
-                    logger.error(f"Something went wrong {self.container_name}.")
+        self.open_state_store(get_fingerprint(POLICY_VERSION, self.namespace, self.blocking_labels, self.approvals))
+        report = report or Report([])
+        report.start(self.get_report_title())
+        with report.section(self.get_blocked_section()) as add_row:
+            # Results are merged in the configuration order, regardless of which worker finished first
+            for container, result in zip(repos, utils.iter_parallel(self.check_container, repos, jobs=self.jobs)):
+                if result is None:
                     continue
+                self.set_container_results(container, *result)
+                self.add_blocked_rows(add_row, container)
+        self.close_state_store(list(self.blocked.repos))
+        self.evict_mirrors(repos)
+        self.write_mergeable(report)
+        self.write_changes(report)
+        report.finish()
         return True
 
     def get_blocked_labels(self, pr_dict) -> list[str]:
-        return [lbl["name"] for lbl in pr_dict if lbl["name"] in self.blocking_labels]
+        return self.policy.get_blocked_labels(lbl["name"] for lbl in pr_dict)
 
-    def print_blocked_pull_request(self) -> bool:
-        logger.warning("SUMMARY OF BLOCKED PULL REQUESTS")
-        if not self.pr_to_merge:
-            return False
-        logger.debug(self.blocked_pr)
-        is_there_something = [cont for cont in self.blocked_pr.keys() if self.blocked_pr[cont]]
-        if not is_there_something:
-            logger.warning("There is nothing what is blocked.")
-            return False
-        string_to_print = f"Pull requests that are blocked by labels [{', '.join(self.blocking_labels)}]"
-
-        logger.info(f"SUMMARY\n{string_to_print}\n")
-        self.blocked_body.append(f"{string_to_print}</b><br><br>")
-
-        for container, pull_requests in self.blocked_pr.items():
-            if not pull_requests:
-                continue
-            logger.warning(f"\n{container}\n")
-            self.blocked_body.append(f"<b>{container}<b>:")
-            self.blocked_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Missing labels</th></tr>")
-            for pr in pull_requests:
-                logger.debug(f"Print PR {pr}.")
-                blocked_labels = self.get_blocked_labels(pr["labels"])
-                logger.warning(
-                    f"https://github.com/{self.namespace}/{container}/pull/{pr['number']} {' '.join(blocked_labels)}"
-                )
-                self.blocked_body.append(
-                    f"<tr><td>https://github.com/{self.namespace}/{container}/pull/{pr['number']}</td>"
-                    f"<td>{pr['title']}</td><td><p style='color:red;'>"
-                    f"{' '.join(blocked_labels)}</p></td></tr>"
-                )
-            self.blocked_body.append("</table><br><br>")
-        return True
+    def get_approval_status(self, approvals: int) -> str:
+        if approvals >= self.approvals:
+            return "CAN BE MERGED"
+        return f"Missing {self.approvals - approvals} APPROVAL"
 
-    def print_approval_pull_request(self):
-        # Do not print anything in case we do not have PR.
-        if not [x for x in self.pr_to_merge if self.pr_to_merge[x]]:
-            return
-        logger.warning("SUMMARY\n\nPull requests that can be merged approvals")
-        self.approval_body.append(f"Pull requests that can be merged or missing {self.approvals} approvals")
-        for container, pr in self.pr_to_merge.items():
-            if not pr:
-                continue
-            self.approval_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
-            if int(pr["approvals"]) >= self.approvals:
-                result_pr = "CAN BE MERGED"
-            else:
-                result_pr = f"Missing {self.approvals-int(pr['approvals'])} APPROVAL"
-            logger.warning(f"https://github.com/{self.namespace}/{container}/pull/{pr['number']} - {result_pr}")
-            self.approval_body.append(
-                f"<tr><td>https://github.com/{self.namespace}/{container}/pull/{pr['number']}</td>"
-                f"<td>{pr['pr_dict']['title']}</td><td><p style='color:red;'>{result_pr}</p></td></tr>"
-            )
-            self.approval_body.append("</table><br>")
+    def get_report_title(self) -> str:
+        return f"Pull request statuses for organization https://github.com/{self.namespace}"
 
-    def save_results(self):
-        return utils.save_json_file(json_file_path=self.json_output_file, json_dict=self.blocked_pr)
+    def write_report(self, report: Report):
+        """
+        Function streams blocked and mergeable pull requests and changes since the last run to the report
+        :param report: Report rendering the console summary, output files and email
+        """
+        report.start(self.get_report_title())
+        self.write_sections(report)
+        report.finish()
+
+    def get_blocked_section(self) -> Section:
+        return Section(
+            "blocked",
+            f"Pull requests that are blocked by labels [{', '.join(self.blocking_labels)}]",
+            ("Pull request URL", "Title", "Missing labels"),
+            True,
+        )
 
-    def send_results(self, recipients):
+    def add_blocked_rows(self, add_row, container_name: str):
+        for pr in self.blocked.get_records(container_name):
+            blocked_labels = " ".join(self.get_blocked_labels(pr.labels or []))
+            add_row(
+                container_name,
+                (self.get_pull_request_url(container_name, pr.number), pr.title, blocked_labels),
+                record_to_dict(pr),
+            )
+
+    def write_sections(self, report: Report):
+        with report.section(self.get_blocked_section()) as add_row:
+            for container in self.blocked.repos:
+                self.add_blocked_rows(add_row, container)
+        self.write_mergeable(report)
+        self.write_changes(report)
+
+    def write_mergeable(self, report: Report):
+        mergeable_section = Section(
+            "mergeable",
+            f"Pull requests that can be merged or missing {self.approvals} approvals",
+            ("Pull request URL", "Title", "Approval status"),
+            False,
+        )
+        with report.section(mergeable_section) as add_row:
+            for container, pull_requests in self.mergeable.items():
+                for pr in pull_requests:
+                    add_row(
+                        container,
+                        (
+                            self.get_pull_request_url(container, pr.number),
+                            pr.title,
+                            self.get_approval_status(pr.approvals),
+                        ),
+                        dict(record_to_dict(pr), repo=container),
+                    )
+
+    def send_results(self, recipients, body: str = "", mailer: Mailer | None = None):
         logger.debug(f"Recipients are: {recipients}")
         if not recipients:
             return
-        sender_class = EmailSender(recipient_email=list(recipients))
-        subject_msg = f"Pull request statuses for organization https://github.com/{self.namespace}"
-        sender_class.send_email(subject_msg, self.blocked_body + self.approval_body)
+        sender_class = EmailSender(recipient_email=list(recipients), timings=self.timings)
+        subject_msg = self.get_report_title()
+        sender_class.send_email(subject_msg, [body], mailer=mailer)
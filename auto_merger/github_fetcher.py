@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+
+import requests
+
+from pathlib import Path
+from subprocess import CalledProcessError
+
+from auto_merger import utils
+from auto_merger.config import Config
+from auto_merger.github_api import GitHubClient, GITHUB_API_URL
+from auto_merger.git_mirror import GitMirrorCache
+from auto_merger.github_graphql import GitHubGraphQL
+from auto_merger.http_cache import HttpCache, DEFAULT_CACHE_DIR
+from auto_merger.metrics import Metrics
+from auto_merger.named_tuples import Section
+from auto_merger.pull_request_handler import PullRequestHandler
+from auto_merger.rate_limit import get_gh_key, get_scheduler
+from auto_merger.report import Report
+from auto_merger.state_store import StateStore
+from auto_merger.timing import Timings
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubFetcher:
+    """
+    Fetching pull requests by every backend, checkouts and the state store shared by the GitHub checker
+    and the merger. Commands differ only by the state store scope and the fingerprint of their policy.
+    """
+
+    current_dir = os.getcwd()
+    state_scope: str = ""
+
+    def __init__(
+        self,
+        config: Config,
+        jobs: int = 1,
+        use_cache: bool = True,
+        timings: Timings | None = None,
+        metrics: Metrics | None = None,
+    ):
+        self.config = config
+        self.namespace = self.config.github["namespace"]
+        self.temp_dir = utils.temporary_dir()
+        self.clone_repos = self.config.github.get("clone_repos", False)
+        self.jobs = jobs
+        self.backend = self.config.github.get("backend", "gh")
+        self.prefetched_data: dict = {}
+        self._github_client = None
+        self._mirror_cache = None
+        self.use_cache = use_cache
+        self.state_store: StateStore | None = None
+        self.changes: list = []
+        self.metrics = metrics or Metrics()
+        self.timings = timings or Timings(metrics=self.metrics)
+
+    @property
+    def github_client(self) -> GitHubClient:
+        if not self._github_client:
+            cache = None
+            if self.use_cache:
+                cache = HttpCache(
+                    directory=self.config.github.get("cache_dir", DEFAULT_CACHE_DIR),
+                    max_age=self.config.github.get("cache_max_age", 86400),
+                )
+            self._github_client = GitHubClient(
+                api_url=self.config.github.get("api_url", GITHUB_API_URL),
+                pool_size=max(self.jobs, 10),
+                cache=cache,
+                metrics=self.metrics,
+            )
+        return self._github_client
+
+    def get_repo_slug(self, container_name: str) -> str:
+        return f"{self.namespace}/{container_name}"
+
+    def get_pull_request_url(self, container_name: str, number: int) -> str:
+        return f"https://github.com/{self.namespace}/{container_name}/pull/{number}"
+
+    def is_correct_repo(self, container_name: str) -> bool:
+        if self.backend == "api":
+            return self.github_client.get_repository_name(self.namespace, container_name) == container_name
+        cmd = [f"gh repo view {self.get_repo_slug(container_name)} --json name"]
+        repo_name = self.get_gh_json_output(cmd=cmd)
+        logger.debug(repo_name)
+        if repo_name["name"] == container_name:
+            return True
+        return False
+
+    @staticmethod
+    def get_gh_json_output(cmd):
+        gh_repo_list = get_scheduler().run_command(get_gh_key(), cmd=cmd)
+        return json.loads(gh_repo_list)
+
+    def get_pull_requests(self, container_name: str) -> list:
+        """
+        Function returns opened pull requests of the repository,
+        that are neither drafts nor have changes requested
+        :param container_name: repository name in the namespace
+        :return: list of pull request dictionaries
+        """
+        cmd = [
+            f"gh pr list --repo {self.get_repo_slug(container_name)} -s open "
+            "--json number,title,labels,reviews,reviewDecision,isDraft,createdAt,updatedAt"
+        ]
+        repo_data_output = self.get_gh_json_output(cmd=cmd)
+        return PullRequestHandler.get_pull_requests_to_check(repo_data_output)
+
+    def get_graphql(self) -> GitHubGraphQL:
+        if self.backend == "api":
+            return GitHubGraphQL(namespace=self.namespace, executor=self.github_client.graphql)
+        return GitHubGraphQL(namespace=self.namespace)
+
+    def prefetch_pull_requests(self, repos: list[str]) -> bool:
+        """
+        Function fetches pull requests of all repositories by one batched query
+        instead of several gh calls per repository
+        :param repos: list of repository names
+        :return: False in case the pull requests could not be fetched
+        """
+        if self.backend == "gh":
+            return True
+        try:
+            with self.timings.span("prefetch"):
+                if self.backend == "api":
+                    self.prefetched_data = self.github_client.get_open_pull_requests(
+                        self.namespace, repos, jobs=self.jobs
+                    )
+                else:
+                    self.prefetched_data = self.get_graphql().get_pull_requests(repos)
+        except requests.RequestException as re:
+            logger.error(f"Fetching pull requests failed. {re}")
+            return False
+        return True
+
+    def fetch_pull_requests(self, container_name: str) -> list | None:
+        """
+        Function returns pull requests of one repository that should be checked
+        :param container_name: repository name in the namespace
+        :return: list of pull request dictionaries
+                 None in case the repository could not be fetched
+        """
+        if self.backend != "gh":
+            pull_requests = self.prefetched_data.get(container_name)
+            if pull_requests is None:
+                return None
+            return PullRequestHandler.get_pull_requests_to_check(pull_requests)
+        # All gh calls use '--repo', a checkout is only made when requested by config
+        if self.clone_repos:
+            with self.timings.span("clone", container_name):
+                if not self.clone_repo(container_name):
+                    return None
+        try:
+            with self.timings.span("repo view", container_name):
+                is_correct_repo = self.is_correct_repo(container_name)
+            if not is_correct_repo:
+                logger.error(f"This is not correct repo {container_name}.")
+                if self.clone_repos:
+                    self.clean_container_dir(container_name)
+                return None
+            with self.timings.span("pr list", container_name):
+                repo_data = self.get_pull_requests(container_name)
+        except (subprocess.CalledProcessError, requests.RequestException):
+            logger.error(f"Something went wrong {container_name}.")
+            return None
+        return repo_data
+
+    def get_container_dir(self, container_name: str) -> Path:
+        return Path(self.temp_dir) / container_name
+
+    @property
+    def mirror_cache(self) -> GitMirrorCache:
+        if not self._mirror_cache:
+            cache_dir = Path(self.config.github.get("cache_dir", DEFAULT_CACHE_DIR)).expanduser()
+            self._mirror_cache = GitMirrorCache(
+                directory=cache_dir / "mirrors", max_size=self.config.github.get("mirror_max_size", 2048) * 2**20
+            )
+        return self._mirror_cache
+
+    def get_repo_url(self, container_name: str) -> str:
+        return f"https://github.com/{self.get_repo_slug(container_name)}.git"
+
+    def clone_repo(self, container_name: str):
+        """
+        Function checks out the repository as a worktree of its persistent mirror,
+        so only new commits are transferred after the first run
+        """
+        container_dir = self.get_container_dir(container_name)
+        try:
+            self.mirror_cache.add_worktree(self.get_repo_url(container_name), container_dir)
+        except CalledProcessError as cpe:
+            logger.error(cpe.output)
+            return False
+        return True
+
+    def evict_mirrors(self, repos: list[str]):
+        """
+        Function removes mirrors of repositories that are not configured anymore
+        """
+        if self.clone_repos:
+            self.mirror_cache.evict(keep=[self.get_repo_url(container) for container in repos])
+
+    def clean_temporary_dir(self):
+        os.chdir(self.current_dir)
+        if Path(self.temp_dir).exists():
+            shutil.rmtree(self.temp_dir)
+
+    def clean_container_dir(self, container_name: str):
+        container_dir = self.get_container_dir(container_name)
+        if container_dir.exists():
+            self.mirror_cache.remove_worktree(self.get_repo_url(container_name), container_dir)
+
+    def open_state_store(self, fingerprint: str):
+        """
+        Function opens the state store of the command when 'state_file' is configured
+        :param fingerprint: fingerprint of the command policy, stored verdicts are dropped once it changes
+        """
+        if "state_file" not in self.config.github:
+            return
+        self.state_store = StateStore(
+            path=self.config.github["state_file"], scope=self.state_scope, fingerprint=fingerprint
+        )
+
+    def close_state_store(self, checked_repos: list[str] | None):
+        """
+        Function collects changes since the last run and closes the state store
+        :param checked_repos: repositories whose pull requests not seen by this run are dropped from the store,
+                              None to keep all of them
+        """
+        if not self.state_store:
+            return
+        with self.timings.span("state store"):
+            if checked_repos is not None:
+                self.state_store.close_missing(checked_repos)
+            self.changes = self.state_store.get_changes()
+            self.state_store.close()
+
+    def write_changes(self, report: Report):
+        """
+        Function streams pull requests changed since the last run to the report
+        :param report: Report rendering the console summary, output files and email
+        """
+        changes_section = Section(
+            "changes_since_last_run",
+            "Pull requests changed since the last run",
+            ("Pull request URL", "Title", "Previous status", "Status"),
+            False,
+        )
+        with report.section(changes_section) as add_row:
+            for change in self.changes:
+                add_row(
+                    change["repo"],
+                    (
+                        self.get_pull_request_url(change["repo"], change["number"]),
+                        change["title"],
+                        change["previous"] or "new",
+                        change["verdict"],
+                    ),
+                    change,
+                )
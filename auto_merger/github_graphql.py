@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import subprocess
+
+from typing import Callable
+
+from auto_merger.rate_limit import get_gh_key, get_scheduler
+
+
+logger = logging.getLogger(__name__)
+
+PULL_REQUEST_FIELDS = """
+        number
+        title
+        isDraft
+        createdAt
+        updatedAt
+        labels(first: 100) { nodes { name } }
+        reviewDecision
+        latestOpinionatedReviews(first: 100) { nodes { state author { login } } }
+"""
+# GitHub search returns at most 1000 results of one query
+SEARCH_LIMIT = 1000
+
+
+def gh_graphql(query: str) -> dict:
+    """
+    Executes GraphQL query by 'gh api graphql'.
+    The query is passed on stdin, so its size is not limited by the command line length.
+    :param query: GraphQL query
+    :return: dictionary with the whole GraphQL response, including 'errors'
+    """
+    try:
+        output = get_scheduler().run_command(
+            get_gh_key(), cmd="gh api graphql --input -", input=json.dumps({"query": query})
+        )
+    except subprocess.CalledProcessError as cpe:
+        # gh fails when some repository is not found, but still prints the partial response
+        output = cpe.output
+    for line in output.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)
+    logger.error(f"GraphQL query did not return any data: {output}")
+    return {}
+
+
+class GitHubGraphQL:
+    """
+    Fetches opened pull requests of many repositories by a few aliased GraphQL queries.
+    The pull requests have the same structure as
+    'gh pr list --json number,title,labels,reviews,reviewDecision,isDraft,createdAt,updatedAt',
+    only the latest approval or change request of every reviewer is fetched as 'reviews'
+    """
+
+    def __init__(self, namespace: str, executor: Callable[[str], dict] = gh_graphql, batch_size: int = 20):
+        self.namespace = namespace
+        self.executor = executor
+        self.batch_size = batch_size
+        self.page_size = 50
+
+    def build_query(self, repos: dict) -> str:
+        """
+        Builds one GraphQL query for several repositories
+        :param repos: dictionary with repository name and cursor of the next page or None
+        :return: GraphQL query. Repository is accessible by alias 'r<index>'
+        """
+        parts = []
+        for index, (repo, cursor) in enumerate(repos.items()):
+            after = f', after: "{cursor}"' if cursor else ""
+            parts.append(
+                f'  r{index}: repository(owner: "{self.namespace}", name: "{repo}") {{\n'
+                "    name\n"
+                f"    pullRequests(states: OPEN, first: {self.page_size}{after}) {{\n"
+                "      pageInfo { hasNextPage endCursor }\n"
+                f"      nodes {{{PULL_REQUEST_FIELDS}      }}\n"
+                "    }\n"
+                "  }"
+            )
+        return "query {\n" + "\n".join(parts) + "\n}"
+
+    def build_search_query(self, search: str, cursor: str | None = None) -> str:
+        after = f', after: "{cursor}"' if cursor else ""
+        return (
+            "query {\n"
+            f"  search(query: {json.dumps(search)}, type: ISSUE, first: {self.page_size}{after}) {{\n"
+            "    issueCount\n"
+            "    pageInfo { hasNextPage endCursor }\n"
+            "    nodes {\n"
+            "      ... on PullRequest {\n"
+            f"        repository {{ name owner {{ login }} }}{PULL_REQUEST_FIELDS}"
+            "      }\n"
+            "    }\n"
+            "  }\n"
+            "}"
+        )
+
+    def build_pull_request_query(self, repo: str, number: int) -> str:
+        return (
+            "query {\n"
+            f'  repository(owner: "{self.namespace}", name: "{repo}") {{\n'
+            f"    pullRequest(number: {int(number)}) {{\n"
+            f"        state{PULL_REQUEST_FIELDS}"
+            "    }\n"
+            "  }\n"
+            "}"
+        )
+
+    @staticmethod
+    def convert_pull_request(node: dict) -> dict:
+        return {
+            "number": node["number"],
+            "title": node["title"],
+            "isDraft": node["isDraft"],
+            "createdAt": node["createdAt"],
+            "updatedAt": node.get("updatedAt"),
+            "labels": [{"name": label["name"]} for label in node["labels"]["nodes"]],
+            "reviewDecision": node.get("reviewDecision"),
+            "reviews": [
+                {"state": review["state"], "author": review["author"]}
+                for review in node["latestOpinionatedReviews"]["nodes"]
+            ],
+        }
+
+    def get_pull_requests(self, repos: list[str]) -> dict:
+        """
+        Function returns opened pull requests of all repositories
+        :param repos: list of repository names in the namespace
+        :return: dictionary with repository name and list of its pull requests
+                 None is used for repositories that do not exist or are renamed
+        """
+        results: dict = {repo: [] for repo in repos}
+        pending: dict = {repo: None for repo in repos}
+        while pending:
+            next_pending: dict = {}
+            batches = list(pending.items())
+            for start in range(0, len(batches), self.batch_size):
+                end = start + self.batch_size
+                batch = dict(batches[start:end])
+                response = self.executor(self.build_query(batch))
+                data = response.get("data") or {}
+                for error in response.get("errors", []):
+                    logger.debug(f"GraphQL error: {error}")
+                for index, repo in enumerate(batch):
+                    repository = data.get(f"r{index}")
+                    if repository is None:
+                        logger.error(f"Repository {self.namespace}/{repo} was not found.")
+                        results[repo] = None
+                        continue
+                    if repository["name"] != repo:
+                        logger.error(f"This is not correct repo {repo}.")
+                        results[repo] = None
+                        continue
+                    pull_requests = repository["pullRequests"]
+                    results[repo].extend(self.convert_pull_request(node) for node in pull_requests["nodes"])
+                    if pull_requests["pageInfo"]["hasNextPage"]:
+                        next_pending[repo] = pull_requests["pageInfo"]["endCursor"]
+            pending = next_pending
+        return results
+
+    def search_pull_requests(self, labels: list[str]) -> dict | None:
+        """
+        Function finds opened pull requests of the namespace carrying any of the labels by one paginated search
+        :param labels: label names, the pull request has at least one of them
+        :return: dictionary with repository name and list of its pull requests,
+                 None in case the search failed or has more results than GitHub search returns
+        """
+        quoted = ",".join(json.dumps(label) for label in labels)
+        search = f"org:{self.namespace} is:pr is:open -is:draft label:{quoted}"
+        logger.debug(f"Searching pull requests: {search}")
+        results: dict = {}
+        cursor = None
+        while True:
+            response = self.executor(self.build_search_query(search, cursor))
+            for error in response.get("errors", []):
+                logger.debug(f"GraphQL error: {error}")
+            data = (response.get("data") or {}).get("search")
+            if data is None:
+                logger.error(f"Searching pull requests of {self.namespace} failed.")
+                return None
+            if data["issueCount"] > SEARCH_LIMIT:
+                logger.warning(f"Search found {data['issueCount']} pull requests, more than {SEARCH_LIMIT}.")
+                return None
+            for node in data["nodes"]:
+                # Issues do not match the 'is:pr' qualifier, other node types are empty
+                if not node or node["repository"]["owner"]["login"].lower() != self.namespace.lower():
+                    continue
+                results.setdefault(node["repository"]["name"], []).append(self.convert_pull_request(node))
+            if not data["pageInfo"]["hasNextPage"]:
+                return results
+            cursor = data["pageInfo"]["endCursor"]
+
+    def get_pull_request(self, repo: str, number: int) -> dict | None:
+        """
+        Function returns one pull request of the repository, including its 'state'
+        :param repo: repository name in the namespace
+        :param number: pull request number
+        :return: pull request dictionary or None in case it was not found
+        """
+        response = self.executor(self.build_pull_request_query(repo, number))
+        for error in response.get("errors", []):
+            logger.debug(f"GraphQL error: {error}")
+        repository = (response.get("data") or {}).get("repository")
+        if not repository or not repository.get("pullRequest"):
+            logger.error(f"Pull request {self.namespace}/{repo}#{number} was not found.")
+            return None
+        node = repository["pullRequest"]
+        pull_request = self.convert_pull_request(node)
+        pull_request["state"] = node["state"]
+        return pull_request
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import asyncio
+import functools
+import logging
+
+import requests
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from auto_merger.gitlab_handler import GitLabHandler, is_not_found
+from auto_merger.named_tuples import MergeRequestRecord
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncGitLabChecker:
+    """
+    Resolves projects and lists their opened merge requests for all projects at once.
+    Blocking requests of the handler's pooled session run in a pool of 'concurrency' threads
+    driven by one event loop, at most 'concurrency' of them are in flight.
+    """
+
+    def __init__(self, handler: GitLabHandler, concurrency: int = 4, per_page: int = 100):
+        self.handler = handler
+        self.concurrency = max(concurrency, 1)
+        self.per_page = per_page
+        self.semaphore: asyncio.Semaphore
+        self.executor: ThreadPoolExecutor
+
+    async def run_limited(self, function, *args, **kwargs):
+        async with self.semaphore:
+            # The default executor of the loop has at most 32 threads, which would cap higher concurrency
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor, functools.partial(function, *args, **kwargs)
+            )
+
+    async def get_page(self, project_id, page: int) -> requests.Response:
+        url = f"{self.handler.config.gitlab['url']}/api/v4/projects/{project_id}/merge_requests"
+        params = {"state": "opened", "per_page": self.per_page, "page": page}
+        response = await self.run_limited(self.handler.session.get, url, params=params, timeout=30)
+        response.raise_for_status()
+        return response
+
+    async def get_merge_requests(self, project_id) -> list[MergeRequestRecord]:
+        """
+        Function lists opened merge requests of the project. Once the first page tells
+        the number of pages, the remaining pages are requested concurrently.
+        """
+        response = await self.get_page(project_id, 1)
+        responses = [response]
+        total_pages = int(response.headers.get("X-Total-Pages") or 0)
+        if total_pages > 1:
+            responses.extend(
+                await asyncio.gather(*(self.get_page(project_id, page) for page in range(2, total_pages + 1)))
+            )
+        else:
+            # GitLab omits the total for very large listings, pages are followed one by one then
+            while response.headers.get("X-Next-Page"):
+                response = await self.get_page(project_id, int(response.headers["X-Next-Page"]))
+                responses.append(response)
+        return [
+            MergeRequestRecord(mr["iid"], mr["title"], mr["labels"], mr["web_url"])
+            for response in responses
+            for mr in response.json()
+            if mr["state"] == "opened"
+        ]
+
+    async def check_project(self, reponame: str) -> list[MergeRequestRecord] | None:
+        logger.info(f"Let's check repository in {reponame}")
+        try:
+            project_id = await self.run_limited(self.handler.get_project_id, reponame)
+            with self.handler.timings.span("merge requests", reponame):
+                try:
+                    merge_requests = await self.get_merge_requests(project_id)
+                except requests.HTTPError as he:
+                    if not is_not_found(he):
+                        raise
+                    logger.info(f"Project id of {reponame} is stale, resolving it again")
+                    await self.run_limited(self.handler.forget_project_id, reponame)
+                    project_id = await self.run_limited(self.handler.get_project_id, reponame)
+                    merge_requests = await self.get_merge_requests(project_id)
+        except requests.RequestException as re:
+            logger.error(f"Something went wrong {reponame}. {re}")
+            return None
+        if not merge_requests:
+            logger.info(f"No merge requests opened for project {reponame}")
+        return merge_requests
+
+    async def gather_projects(self, reponames: list[str], on_result: Callable | None = None) -> list:
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="gitlab") as self.executor:
+            tasks = [asyncio.ensure_future(self.check_project(reponame)) for reponame in reponames]
+            results = []
+            for reponame, task in zip(reponames, tasks):
+                results.append(await task)
+                if on_result:
+                    on_result(reponame, results[-1])
+            return results
+
+    def check_projects(self, reponames: list[str], on_result: Callable | None = None) -> list:
+        """
+        Function checks all projects concurrently
+        :param reponames: list of project paths including namespace
+        :param on_result: called with the project path and its merge requests in the order of 'reponames',
+                          as soon as the project and all projects before it are checked
+        :return: list of opened merge requests in the order of 'reponames', None for failed projects
+        """
+        return asyncio.run(self.gather_projects(reponames, on_result))
@@ -29,13 +29,19 @@ import logging
 from typing import Any
 from pathlib import Path
 
+import gitlab
 import requests
 
+from auto_merger.gitlab_async import AsyncGitLabChecker
 from auto_merger.gitlab_handler import GitLabHandler
-from auto_merger.email import EmailSender
+from auto_merger.email import EmailSender, Mailer
 from auto_merger.config import Config
-from auto_merger.named_tuples import ProjectMR
-from auto_merger.pull_request_handler import PullRequestHandler
+from auto_merger.named_tuples import MergeRequestRecord, Section
+from auto_merger.policy import Policy
+from auto_merger.report import Report
+from auto_merger.results import ResultStore, get_record, record_to_dict
+from auto_merger.metrics import Metrics
+from auto_merger.timing import Timings
 from auto_merger import utils
 
 
@@ -43,33 +49,44 @@ logger = logging.getLogger(__name__)
 
 
 class GitLabStatusChecker:
-    container_name: str = ""
     container_dir: Path
     current_dir = os.getcwd()
 
-    def __init__(self, config: Config, json_output_file: str = ""):
+    def __init__(
+        self,
+        config: Config,
+        json_output_file: str = "",
+        jobs: int = 1,
+        timings: Timings | None = None,
+        metrics: Metrics | None = None,
+    ):
         self.config = config
         self.approval_labels = self.config.gitlab["approval_labels"]
         self.blocking_labels = self.config.gitlab["blocker_labels"]
         self.approvals = self.config.gitlab["approvals"]
+        self.policy = Policy.from_config(self.config.gitlab)
         if "namespace" in self.config.gitlab:
             self.namespace = self.config.gitlab["namespace"]
         else:
             self.namespace = None
-        self.blocked_mr: dict = {}
-        self.pr_to_merge: dict = {}
-        self.blocked_body: list = []
-        self.approval_body: list = []
-        self.merge_requests: list = []
+        self.blocked = ResultStore()
+        self.mergeable = ResultStore()
+        self.merge_requests: dict = {}
         self.temp_dir: Path
         self._gitlab_handler = None
         self.project_id: str = ""
         self.json_output_file = json_output_file
+        self.jobs = jobs
+        self.metrics = metrics or Metrics()
+        self.timings = timings or Timings(metrics=self.metrics)
+        self.backend = self.config.gitlab.get("backend", "python-gitlab")
 
     @property
     def gitlab_handler(self):
         if not self._gitlab_handler:
-            self._gitlab_handler = GitLabHandler(config=self.config)
+            self._gitlab_handler = GitLabHandler(
+                config=self.config, pool_size=max(self.jobs, 10), timings=self.timings, metrics=self.metrics
+            )
         return self._gitlab_handler
 
     def check_gitlab_status(self) -> bool:
@@ -83,160 +100,186 @@ class GitLabStatusChecker:
                 return False
         return True
 
-    def add_blocked_pull_request(self, merge_request=None) -> Any:
+    @property
+    def blocked_mr(self) -> dict:
+        """
+        Blocked merge requests of every project as dictionaries, the same as in the JSON output
+        """
+        return self.blocked.to_dict()
+
+    def add_blocked_pull_request(self, merge_request: MergeRequestRecord, container_name: str) -> Any:
         """
-        Function adds pull request to self.blocked_pr dictionary with
-        specific fields like 'number' and 'pr_dict': {'title': , 'labels': }
-        :param pull_request: Dictionary with pull request structure
+        Function adds merge request to blocked merge requests of the project
+        :param merge_request: MergeRequestRecord
+        :param container_name: project path including namespace
         :return:
         """
-        if merge_request is None:
-            merge_request = {}
-        present = False
-        for stored_pr in self.blocked_mr[self.container_name]:
-            if int(stored_pr["number"]) == int(merge_request.iid):
-                present = True
-        if present:
+        if (container_name, merge_request.iid) in self.blocked:
             return
-        self.blocked_mr[self.container_name].append(
-            {
-                "number": merge_request.iid,
-                "title": merge_request.title,
-                "labels": merge_request.labels,
-                "target_url": merge_request.target_project_id,
-            }
+        self.blocked.upsert(
+            get_record(
+                container_name,
+                {
+                    "number": merge_request.iid,
+                    "title": merge_request.title,
+                    "labels": merge_request.labels,
+                    "target_url": merge_request.web_url,
+                },
+            )
         )
         logger.debug(f"PR {merge_request.iid} added to blocked")
         return
 
-    def check_blocked_labels(self):
-        for mr in self.merge_requests:
-            logger.info(f"- Checking PR {mr.iid} for {self.container_name}")
+    def get_blocked_merge_requests(
+        self, container_name: str, merge_requests: list[MergeRequestRecord]
+    ) -> list[MergeRequestRecord]:
+        blocked_mrs = []
+        for mr in merge_requests:
+            logger.info(f"- Checking PR {mr.iid} for {container_name}")
             logger.debug(f"Labels: {mr.labels}")
             if not mr.labels:
-                self.add_blocked_pull_request(merge_request=mr)
+                blocked_mrs.append(mr)
                 continue
-            logger.debug(self.blocking_labels)
-            for label in mr.labels:
-                if label not in self.blocking_labels:
-                    continue
+            if self.policy.get_blocked_labels(mr.labels):
                 logger.info(f"Add PR {mr.iid} to blocked PRs.")
-                self.add_blocked_pull_request(merge_request=mr)
+                blocked_mrs.append(mr)
+        return blocked_mrs
 
-    def check_pr_to_merge(self) -> bool:
-        if len(self.repo_data) == 0:
-            return False
-        pr_to_merge: bool = False
-        for pr in self.repo_data:
-            logger.debug(f"PR status: {pr}")
-            if not PullRequestHandler.check_labels_to_merge(pull_request=pr, blocking_labels=self.blocking_labels):
-                continue
-            if "reviews" not in pr:
-                continue
-            approval_count = PullRequestHandler.check_pr_approvals(reviews_to_check=pr["reviews"])
-            if approval_count < self.approvals:
-                logger.debug(f"Not enough approvals: {approval_count}. Should be at least {self.approvals}")
-                continue
-            self.pr_to_merge[self.container_name] = {
-                "number": pr["number"],
-                "approvals": approval_count,
-                "title": pr["title"],
-            }
-            pr_to_merge = True
-        return pr_to_merge
-
-    def merge_pull_requests(self):
-        for pr in self.pr_to_merge:
-            logger.debug(f"PR to merge {pr} in repo {self.container_name}.")
-
-    def check_all_containers(self) -> bool:
+    def check_container(self, container_name: str) -> list[MergeRequestRecord] | None:
+        """
+        Function returns opened merge requests of one project. It does not modify
+        the checker state, so several projects can be checked in parallel.
+        :param container_name: project path including namespace
+        :return: list of opened merge requests
+                 None in case the project could not be checked
+        """
+        logger.info(f"Let's check repository in {container_name}")
+        try:
+            with self.timings.span("merge requests", container_name):
+                merge_requests = self.gitlab_handler.get_merge_requests(container_name)
+        except (requests.HTTPError, gitlab.exceptions.GitlabError):
+            logger.error(f"Something went wrong {container_name}.")
+            return None
+        logger.debug(f"List of MR for {container_name}")
+        if not merge_requests:
+            logger.info(f"No merge requests opened for project {container_name}")
+        logger.debug(merge_requests)
+        return merge_requests
+
+    def check_all_containers(self, report: Report | None = None) -> bool:
+        """
+        Function checks all projects and streams blocked merge requests of each of them to the report
+        as soon as it is checked, mergeable merge requests follow at the end
+        :param report: Report rendering the console summary, output files and email, None for no report
+        :return: True when the projects were checked
+        """
         if "repos" not in self.config.gitlab:
             return False
-        for container in self.config.gitlab["repos"]:
-            self.container_name = container if not self.namespace else f"{self.namespace}/{container}"
-            logger.info(f"Let's check repository in {self.container_name}")
-            if self.container_name not in self.blocked_mr:
-                self.blocked_mr[self.container_name] = []
-            if self.container_name not in self.pr_to_merge:
-                self.pr_to_merge[self.container_name] = []
-            try:
-                self.project_id = self.gitlab_handler.get_project_id_from_url(
-                    url=self.config.gitlab["url"], reponame=self.container_name
-                )
-                self.merge_requests: list[ProjectMR] = self.gitlab_handler.get_project_merge_requests(self.project_id)
-                logger.debug(f"List of MR for {self.container_name}")
-                if not self.merge_requests:
-                    logger.info(f"No merge requests opened for project {self.container_name}")
-                    continue
-                logger.debug(self.merge_requests)
-                self.check_blocked_labels()
-                # self.check_pr_to_merge()
-            except requests.HTTPError:
-                logger.error(f"Something went wrong {self.container_name}.")
-                continue
+        containers = [
+            container if not self.namespace else f"{self.namespace}/{container}"
+            for container in self.config.gitlab["repos"]
+        ]
+        # The handler is shared by all workers, create it and resolve project ids before they start
+        self.gitlab_handler.resolve_project_ids(containers)
+        report = report or Report([])
+        report.start(self.get_report_title())
+        with report.section(self.get_blocked_section()) as add_row:
+
+            def add_container(container_name: str, merge_requests: list[MergeRequestRecord] | None):
+                self.blocked.add_repo(container_name)
+                self.mergeable.add_repo(container_name)
+                if merge_requests is None:
+                    return
+                self.update_container(container_name, merge_requests)
+                self.add_blocked_rows(add_row, container_name)
+
+            # Results are merged in the configuration order, regardless of which worker finished first
+            if self.backend == "async":
+                AsyncGitLabChecker(self.gitlab_handler, concurrency=self.jobs).check_projects(containers, add_container)
+            else:
+                results = utils.iter_parallel(self.check_container, containers, jobs=self.jobs)
+                for container, merge_requests in zip(containers, results):
+                    add_container(container, merge_requests)
+        self.write_mergeable(report)
+        report.finish()
         return True
 
+    def update_container(self, container_name: str, merge_requests: list[MergeRequestRecord]):
+        """
+        Function replaces results of one project by freshly fetched merge requests
+        :param container_name: project path including namespace
+        :param merge_requests: list of opened merge requests
+        """
+        self.merge_requests[container_name] = merge_requests
+        self.blocked.replace_repo(container_name, [])
+        self.mergeable.add_repo(container_name)
+        with self.timings.span("evaluate", container_name):
+            for mr in self.get_blocked_merge_requests(container_name, merge_requests):
+                self.add_blocked_pull_request(merge_request=mr, container_name=container_name)
+        self.metrics.blocked.set(len(self.blocked.get_records(container_name)), service="gitlab", repo=container_name)
+
     def get_blocked_labels(self, pr_dict) -> str:
         return " ".join(pr_dict)
 
-    def print_blocked_merge_requests(self) -> bool:
-        logger.debug(f"Blocked PR to print {self.blocked_mr}")
-        if not self.blocked_mr:
-            return False
-        logger.warning(
-            f"SUMMARY\n\nGitLab merge requests that are blocked by labels [{', '.join(self.blocking_labels)}]"
-        )
-        self.blocked_body.append(
-            f"GitLab merge requests that are blocked by labels <b>[{', '.join(self.blocking_labels)}]</b><br><br>"
-        )
+    def get_merge_request_url(self, container_name: str, number: int) -> str:
+        return f"{self.config.gitlab['url']}/{container_name}/-/merge_requests/{number}"
 
-        for container, merge_requests in self.blocked_mr.items():
-            if not merge_requests:
-                continue
-            logger.info(f"\n{container}\n------\n")
-            self.blocked_body.append(f"<b>{container}<b>:")
-            self.blocked_body.append("<table><tr><th>Merge request URL</th><th>Title</th><th>Missing labels</th></tr>")
-            for mr in merge_requests:
-                blocked_labels = self.get_blocked_labels(mr["labels"])
-                if blocked_labels == "":
-                    blocked_labels = "No labels to unblock this merge request."
-                logger.info(f"{self.config.gitlab['url']}/{container}/-/merge_requests/{mr['number']} '{mr['title']}'")
-                self.blocked_body.append(
-                    f"<tr><td>{self.config.gitlab['url']}/{container}/-/merge_requests/{mr['number']}</td>"
-                    f"<td>{mr['title']}</td><td><p style='color:red;'>"
-                    f"'{blocked_labels}'</p></td></tr>"
-                )
-        self.blocked_body.append("</table><br><br>")
-        return True
+    def get_report_title(self) -> str:
+        return f"Merge request statuses for {self.config.gitlab['url']}"
 
-    def print_approval_pull_request(self):
-        # Do not print anything in case we do not have PR.
-        if not [x for x in self.pr_to_merge if self.pr_to_merge[x]]:
-            return
-        logger.info("SUMMARY\n\nGitLab merge requests that can be merged approvals")
-        self.approval_body.append(f"GitLab merge requests that can be merged or missing {self.approvals} approvals")
-        self.approval_body.append("<table><tr><th>Merge request URL</th><th>Title</th><th>Approval status</th></tr>")
-        for container, pr in self.pr_to_merge.items():
-            if not pr:
-                continue
-            if int(pr["approvals"]) >= self.approvals:
-                result_pr = "CAN BE MERGED"
-            else:
-                result_pr = f"Missing {self.approvals-int(pr['approvals'])} APPROVAL"
-            logger.info(f"https://github.com/{self.namespace}/{container}/pull/{pr['number']} - {result_pr}")
-            self.approval_body.append(
-                f"<tr><td>https://github.com/{self.namespace}/{container}/pull/{pr['number']}</td>"
-                f"<td>{pr['pr_dict']['title']}</td><td><p style='color:red;'>{result_pr}</p></td></tr>"
+    def write_report(self, report: Report):
+        """
+        Function streams blocked and mergeable merge requests to the report
+        :param report: Report rendering the console summary, output files and email
+        """
+        report.start(self.get_report_title())
+        with report.section(self.get_blocked_section()) as add_row:
+            for container in self.blocked.repos:
+                self.add_blocked_rows(add_row, container)
+        self.write_mergeable(report)
+        report.finish()
+
+    def get_blocked_section(self) -> Section:
+        return Section(
+            "blocked",
+            f"GitLab merge requests that are blocked by labels [{', '.join(self.blocking_labels)}]",
+            ("Merge request URL", "Title", "Missing labels"),
+            True,
+        )
+
+    def add_blocked_rows(self, add_row, container_name: str):
+        for mr in self.blocked.get_records(container_name):
+            blocked_labels = self.get_blocked_labels(mr.labels or []) or "No labels to unblock this merge request."
+            add_row(
+                container_name,
+                (self.get_merge_request_url(container_name, mr.number), mr.title, blocked_labels),
+                record_to_dict(mr),
             )
-        self.approval_body.append("</table><br>")
 
-    def save_results(self):
-        return utils.save_json_file(json_file_path=self.json_output_file, json_dict=self.blocked_mr)
+    def write_mergeable(self, report: Report):
+        mergeable_section = Section(
+            "mergeable",
+            f"GitLab merge requests that can be merged or missing {self.approvals} approvals",
+            ("Merge request URL", "Title", "Approval status"),
+            False,
+        )
+        with report.section(mergeable_section) as add_row:
+            for container, merge_requests in self.mergeable.items():
+                for mr in merge_requests:
+                    if mr.approvals >= self.approvals:
+                        status = "CAN BE MERGED"
+                    else:
+                        status = f"Missing {self.approvals - mr.approvals} APPROVAL"
+                    add_row(
+                        container,
+                        (self.get_merge_request_url(container, mr.number), mr.title, status),
+                        dict(record_to_dict(mr), repo=container),
+                    )
 
-    def send_results(self, recipients):
+    def send_results(self, recipients, body: str = "", mailer: Mailer | None = None):
         logger.debug(f"Recipients are: {recipients}")
         if not recipients:
             return
-        sender_class = EmailSender(recipient_email=list(recipients))
+        sender_class = EmailSender(recipient_email=list(recipients), timings=self.timings)
         subject_msg = f"Pull request statuses for organization https://github.com/{self.namespace}"
-        sender_class.send_email(subject_msg, self.blocked_body + self.approval_body)
+        sender_class.send_email(subject_msg, [body], mailer=mailer)
@@ -23,24 +23,50 @@
 # SOFTWARE.
 
 
+import json
 import logging
 import requests
 import gitlab
 import os
+import threading
 
+from pathlib import Path
+from typing import Iterator
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 
 from auto_merger.config import Config
-from auto_merger.named_tuples import CurrentUser, ProjectMR
+from auto_merger.http_cache import DEFAULT_CACHE_DIR
+from auto_merger.metrics import Metrics
+from auto_merger.named_tuples import CurrentUser, MergeRequestRecord
+from auto_merger.rate_limit import ScheduledSession, get_scheduler
+from auto_merger.timing import Timings
 
 logger = logging.getLogger(__name__)
 
 requests.packages.urllib3.disable_warnings()
 
 
+def is_not_found(error: Exception) -> bool:
+    """
+    Function tells whether a request failed because the project does not exist
+    :param error: exception raised by requests or by python-gitlab
+    :return: True for HTTP status 404
+    """
+    if isinstance(error, gitlab.exceptions.GitlabError):
+        return error.response_code == 404
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 404
+
+
 class GitLabHandler:
-    def __init__(self, config: Config):
+    def __init__(
+        self, config: Config, pool_size: int = 10, timings: Timings | None = None, metrics: Metrics | None = None
+    ):
         self.config = config
+        self.pool_size = pool_size
+        self.metrics = metrics
+        self.timings = timings or Timings(metrics=metrics)
         if "namespace" in self.config.gitlab:
             self.namespace = self.config.gitlab["namespace"]
         else:
@@ -49,6 +75,11 @@ class GitLabHandler:
         self.project_id: int = 0
         self.current_user: CurrentUser
         self.token = ""
+        self._session = None
+        self._project_ids: dict | None = None
+        cache_dir = Path(self.config.gitlab.get("cache_dir", DEFAULT_CACHE_DIR)).expanduser()
+        self.project_ids_path = cache_dir / "gitlab-projects.json"
+        self.lock = threading.Lock()
 
     @property
     def gitlab_api(self):
@@ -57,9 +88,48 @@ class GitLabHandler:
                 self.config.gitlab["url"],
                 private_token=self.token.strip(),
                 ssl_verify=False,
+                session=self.session,
             )
         return self._gitlab_api
 
+    @property
+    def session(self) -> requests.Session:
+        if not self._session:
+            self._session = ScheduledSession(get_scheduler(), token=self.token)
+            self._session.mount("https://", HTTPAdapter(pool_maxsize=self.pool_size))
+            self._session.mount("http://", HTTPAdapter(pool_maxsize=self.pool_size))
+            self._session.headers.update({"Content-Type": "application/json", "PRIVATE-TOKEN": self.token.strip()})
+            self._session.verify = False
+            if self.metrics:
+                self._session.hooks["response"].append(self.metrics.observe_rate_limit("gitlab", "RateLimit-Remaining"))
+        return self._session
+
+    @property
+    def project_ids(self) -> dict:
+        """
+        Persistent cache of project ids by project URL. Ids that are not found anymore
+        are removed by 'forget_project_id'.
+        """
+        if self._project_ids is None:
+            try:
+                self._project_ids = json.loads(self.project_ids_path.read_text())
+            except (OSError, ValueError):
+                self._project_ids = {}
+        return self._project_ids
+
+    def save_project_ids(self):
+        with self.lock:
+            try:
+                self.project_ids_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.project_ids_path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_text(json.dumps(self.project_ids, indent=2, sort_keys=True))
+                tmp_path.replace(self.project_ids_path)
+            except OSError as oe:
+                logger.warning(f"Saving cache of project ids failed. {oe}")
+
+    def get_project_key(self, reponame: str) -> str:
+        return f"{self.config.gitlab['url']}/{reponame}"
+
     def check_authentication(self):
         self.token = os.getenv("GITLAB_TOKEN", None)
         if not self.token:
@@ -67,7 +137,8 @@ class GitLabHandler:
             return False
         try:
             assert self.gitlab_api
-            self.gitlab_api.auth()
+            with self.timings.span("authenticate"):
+                self.gitlab_api.auth()
             current_user = self.gitlab_api.user
             self.current_user = CurrentUser(current_user.id, current_user.username)
             return self.current_user
@@ -75,35 +146,44 @@ class GitLabHandler:
             logger.error(f"Authentication failed with reason {gae}.")
             return None
 
-    def get_project_merge_requests(self, project_id) -> list[ProjectMR]:
-        self.project = self.gitlab_api.projects.get(project_id)
-        project_mr = self.project.mergerequests.list(state="opened")
-        return [
-            ProjectMR(
-                x.iid,
-                x.title,
-                x.description,
-                x.target_branch,
-                x.author["username"],
-                x.web_url,
-                x.draft,
-                x.state,
-                x.reviewers,
-                x.approvals_before_merge,
-                x.labels,
-                x.merge_status,
-                x.detailed_merge_status,
-            )
-            for x in project_mr
-            if x.state == "opened"
-        ]
+    def get_project_merge_requests(self, project_id, per_page: int = 100) -> Iterator[MergeRequestRecord]:
+        """
+        Generator of opened merge requests of the project. Pages are requested
+        while iterating, so no merge request is missed and only compact records are kept.
+        :param project_id: GitLab project id
+        :param per_page: how many merge requests are requested at once
+        :return: iterator of MergeRequestRecord
+        """
+        # Lazy object does not request the project, only its merge requests are listed
+        project = self.gitlab_api.projects.get(project_id, lazy=True)
+        for mr in project.mergerequests.list(state="opened", iterator=True, per_page=per_page):
+            if mr.state != "opened":
+                continue
+            yield MergeRequestRecord(mr.iid, mr.title, mr.labels, mr.web_url)
+
+    def get_merge_requests(self, reponame: str) -> list[MergeRequestRecord]:
+        """
+        Function lists opened merge requests of the project. When the cached project id
+        is not found anymore, e.g. the project was moved or recreated, it is resolved once again.
+        :param reponame: project path including namespace
+        :return: list of opened merge requests
+        """
+        project_id = self.get_project_id(reponame)
+        try:
+            return list(self.get_project_merge_requests(project_id))
+        except (HTTPError, gitlab.exceptions.GitlabError) as error:
+            if not is_not_found(error):
+                raise
+        logger.info(f"Project id of {reponame} is stale, resolving it again")
+        self.forget_project_id(reponame)
+        return list(self.get_project_merge_requests(self.get_project_id(reponame)))
 
     def get_project_id_from_url(self, url: str, reponame: str) -> str:
         url = f"{url}/api/v4/projects"
-        headers = {"Content-Type": "application/json", "PRIVATE-TOKEN": self.token}
         url = f"{url}/{reponame.replace('/', '%2F')}"
         logger.debug(f"Get project_id from {url}")
-        ret = requests.get(url=f"{url}", headers=headers, verify=False)
+        with self.timings.span("project id", reponame):
+            ret = self.session.get(url=f"{url}")
         ret.raise_for_status()
         if ret.status_code != 200:
             logger.error(f"Getting project_id failed for reason {ret.reason} {ret.json()} ")
@@ -111,3 +191,70 @@ class GitLabHandler:
         project_id = ret.json()["id"]
         logger.debug(f"Project id returned from {url} is {project_id}")
         return project_id
+
+    def get_group_project_ids(self, group: str) -> dict:
+        """
+        Function lists all projects of the group at once
+        :param group: group path, like 'redhat/rhel/containers'
+        :return: dictionary with project path including namespace and its project id
+        """
+        url = f"{self.config.gitlab['url']}/api/v4/groups/{group.replace('/', '%2F')}/projects"
+        project_ids: dict = {}
+        page = "1"
+        while page:
+            logger.debug(f"Get projects of group {group}, page {page}")
+            ret = self.session.get(url=url, params={"per_page": 100, "simple": "true", "page": page})
+            ret.raise_for_status()
+            for project in ret.json():
+                project_ids[project["path_with_namespace"]] = project["id"]
+            page = ret.headers.get("X-Next-Page", "")
+        return project_ids
+
+    def resolve_project_ids(self, reponames: list[str]) -> dict:
+        """
+        Function resolves ids of all projects. Ids that are not cached yet are looked up
+        by listing each group once instead of requesting every project.
+        :param reponames: list of project paths including namespace
+        :return: dictionary with project path and its project id or None when it was not found
+        """
+        missing = [reponame for reponame in reponames if self.get_project_key(reponame) not in self.project_ids]
+        for group in sorted({reponame.rpartition("/")[0] for reponame in missing if "/" in reponame}):
+            try:
+                with self.timings.span("group projects"):
+                    group_project_ids = self.get_group_project_ids(group)
+            except requests.RequestException as re:
+                # User namespaces are not groups, their projects are resolved one by one
+                logger.debug(f"Listing projects of group {group} failed. {re}")
+                continue
+            with self.lock:
+                for reponame in missing:
+                    if reponame in group_project_ids:
+                        self.project_ids[self.get_project_key(reponame)] = group_project_ids[reponame]
+        if missing:
+            self.save_project_ids()
+        return {reponame: self.project_ids.get(self.get_project_key(reponame)) for reponame in reponames}
+
+    def get_project_id(self, reponame: str):
+        """
+        Function returns project id from the cache or requests it
+        :param reponame: project path including namespace
+        :return: project id
+        """
+        key = self.get_project_key(reponame)
+        if key in self.project_ids:
+            return self.project_ids[key]
+        project_id = self.get_project_id_from_url(url=self.config.gitlab["url"], reponame=reponame)
+        if project_id is not None:
+            with self.lock:
+                self.project_ids[key] = project_id
+            self.save_project_ids()
+        return project_id
+
+    def forget_project_id(self, reponame: str):
+        """
+        Function removes project id from the cache, so it is requested next time
+        :param reponame: project path including namespace
+        """
+        with self.lock:
+            self.project_ids.pop(self.get_project_key(reponame), None)
+        self.save_project_ids()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import hashlib
+import logging
+import os
+import time
+
+from pathlib import Path
+
+from auto_merger.named_tuples import CacheEntry
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "auto-merger"
+
+
+class HttpCache:
+    """
+    On-disk cache of validators (ETag, Last-Modified) together with already parsed data.
+    Every entry is one JSON file, its modification time is used as the last access time.
+    """
+
+    def __init__(self, directory: Path | str = DEFAULT_CACHE_DIR, max_age: int = 86400, max_size: int = 50 * 2**20):
+        self.directory = Path(directory).expanduser()
+        self.max_age = max_age
+        self.max_size = max_size
+
+    def get_path(self, key: str) -> Path:
+        return self.directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str) -> CacheEntry | None:
+        path = self.get_path(key)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if time.time() - entry.stored_at > self.max_age:
+            logger.debug(f"Cache entry for {key} expired")
+            return None
+        return entry
+
+    def touch(self, key: str):
+        try:
+            os.utime(self.get_path(key))
+        except OSError:
+            pass
+
+    def set(self, key: str, etag: str | None, last_modified: str | None, data) -> CacheEntry:
+        entry = CacheEntry(etag=etag, last_modified=last_modified, stored_at=time.time(), data=data)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.get_path(key)
+        # Write to a temporary file first, so concurrent runs never read a partial entry
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry._asdict()))
+        tmp_path.replace(path)
+        return entry
+
+    def evict(self):
+        """
+        Removes expired entries and the least recently used ones above 'max_size'
+        """
+        if not self.directory.is_dir():
+            return
+        now = time.time()
+        entries = []
+        for path in self.directory.glob("*.json"):
+            stat = path.stat()
+            if now - stat.st_mtime > self.max_age:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            logger.debug(f"Evicting cache entry {path}")
+            path.unlink(missing_ok=True)
+            total_size -= size
@@ -23,66 +23,57 @@
 # SOFTWARE.
 
 
-import json
 import logging
 import subprocess
 import os
-import shutil
+import time
 
-from subprocess import CalledProcessError
-from pathlib import Path
+import requests
 
 from auto_merger import utils
 from auto_merger.config import Config
-from auto_merger.utils import cwd
-from auto_merger.email import EmailSender
+from auto_merger.email import EmailSender, Mailer
+from auto_merger.github_fetcher import GitHubFetcher
+from auto_merger.named_tuples import MergeResult, Section
+from auto_merger.policy import POLICY_VERSION, Policy
+from auto_merger.rate_limit import PRIORITY_MERGE, get_gh_key, get_scheduler
 from auto_merger.pull_request_handler import PullRequestHandler
+from auto_merger.metrics import Metrics
+from auto_merger.report import Report
+from auto_merger.timing import Timings
+from auto_merger.state_store import VERDICT_MERGEABLE, VERDICT_WAITING, get_fingerprint
 
 
 logger = logging.getLogger(__name__)
 
 
-class AutoMerger:
-    container_name: str = ""
-    container_dir: Path
-    current_dir = os.getcwd()
+class AutoMerger(GitHubFetcher):
+    state_scope = "merger"
 
-    def __init__(self, config: Config):
-        self.config = config
+    def __init__(
+        self,
+        config: Config,
+        jobs: int = 1,
+        use_cache: bool = True,
+        timings: Timings | None = None,
+        metrics: Metrics | None = None,
+        snapshot: dict | None = None,
+    ):
+        super().__init__(config, jobs=jobs, use_cache=use_cache, timings=timings, metrics=metrics)
         self.approval_labels = self.config.github["approval_labels"]
         self.blocking_labels = self.config.github["blocker_labels"]
         self.approvals = self.config.github["approvals"]
-        self.namespace = self.config.github["namespace"]
         self.pr_lifetime = self.config.github["pr_lifetime"]
+        self.policy = Policy.from_config(self.config.github, merging=True)
         self.pr_to_merge: dict = {}
-        self.approval_body: list = []
-        self.repo_data: list = []
-        self.temp_dir = utils.temporary_dir()
-
-    def is_correct_repo(self) -> bool:
-        cmd = ["gh repo view --json name"]
-        repo_name = AutoMerger.get_gh_json_output(cmd=cmd)
-        logger.debug(repo_name)
-        if repo_name["name"] == self.container_name:
-            return True
-        return False
-
-    @staticmethod
-    def get_gh_json_output(cmd):
-        gh_repo_list = utils.run_command(cmd=cmd, return_output=True)
-        return json.loads(gh_repo_list)
-
-    def get_gh_pr_list(self):
-        cmd = ["gh pr list -s open --json number,title,labels,reviews,isDraft,createdAt"]
-        repo_data_output = AutoMerger.get_gh_json_output(cmd=cmd)
-        for pr in repo_data_output:
-            if PullRequestHandler.is_draft(pull_request=pr):
-                continue
-            if PullRequestHandler.is_changes_requested(pull_request=pr):
-                continue
-            self.repo_data.append(pr)
+        self.discovery = self.config.github.get("discovery", "list")
+        # Pull requests already fetched by the checker stage of 'auto-merger run', nothing is fetched again
+        self.snapshot = snapshot
+        self.merge_results: list[MergeResult] = []
 
     def is_authenticated(self) -> bool:
+        if self.backend == "api":
+            return self.github_client.is_authenticated()
         token = os.getenv("GH_TOKEN")
         if token == "":
             logger.error("Environment variable GH_TOKEN is not specified.")
@@ -96,150 +87,227 @@ class AutoMerger:
             return False
         return True
 
-    def check_labels_to_merge(self, pr) -> bool:
-        if "labels" not in pr:
-            return False
-        logger.debug(f"check_labels_to_merge for {self.container_name}: {pr['labels']} and {self.approval_labels}")
-        for label in pr["labels"]:
-            if label["name"] in self.approval_labels:
-                logger.debug(f"Add '{pr['number']}' to approved PRs.")
-                return True
-        return False
-
-    def check_pr_to_merge(self) -> bool:
-        if len(self.repo_data) == 0:
-            return False
-        for pr in self.repo_data:
-            if not self.check_labels_to_merge(pr):
+    def get_pull_requests_to_merge(self, container_name: str, repo_data: list) -> list[dict]:
+        pull_requests = []
+        for pr, result in zip(repo_data, self.policy.evaluate_all(repo_data)):
+            if result.verdict != VERDICT_MERGEABLE:
                 logger.debug(
-                    f"check_pr_to_merge for {self.container_name}: " f"pull request {pr['number']} did not met labels."
+                    f"get_pull_requests_to_merge for {container_name}: pull request {pr['number']} "
+                    f"can not be merged, {', '.join(result.reasons)}."
                 )
                 continue
-            if "reviews" not in pr:
-                logger.debug(
-                    f"check_pr_to_merge for {self.container_name}:"
-                    f" pull request {pr['number']} does not have reviews yet."
-                )
-                continue
-            approval_count = PullRequestHandler.check_pr_approvals(reviews_to_check=pr["reviews"])
-            if approval_count < self.approvals:
-                logger.debug(f"Not enough approvals: {approval_count}. Should be at least {self.approvals}")
-                continue
-            logger.debug(f"Approval count is {approval_count}")
-            if not PullRequestHandler.check_pr_lifetime(pull_request=pr):
-                logger.debug(f"Pr is not valid for more  then {self.config.github['pr_lifetime']}")
-                continue
-            self.pr_to_merge[self.container_name].append(
+            logger.debug(f"Approval count is {result.approvals}")
+            pull_requests.append(
                 {
                     "number": pr["number"],
-                    "approvals": approval_count,
+                    "approvals": result.approvals,
                     "title": pr["title"],
                 }
             )
-        logger.debug(self.pr_to_merge)
-        return True
+        return pull_requests
 
-    def clone_repo(self):
-        self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
-        try:
-            utils.run_command(
-                f"gh repo clone https://github.com/{self.namespace}/{self.container_name} {self.container_dir}"
-            )
-        except CalledProcessError as cpe:
-            logger.error(cpe.stderr)
-            return False
-        return True
+    def merge_pull_requests(self) -> list[MergeResult]:
+        """
+        Function merges pull requests of different repositories in parallel.
+        Pull requests of one repository are merged one by one, because rebases of the same branch conflict.
+        Repositories without any pull request to merge are skipped.
+        :return: list of merge results in the configuration order
+        """
+        containers = [container for container in self.config.github["repos"] if self.pr_to_merge.get(container)]
+        logger.info(f"Merging pull requests of {len(containers)} repositories.")
+        self.merge_results = [
+            result
+            for results in utils.run_parallel(self.merge_container, containers, jobs=self.jobs)
+            for result in results
+        ]
+        return self.merge_results
 
-    def merge_pull_requests(self):
-        for container in self.config.github["repos"]:
-            self.container_name = container
-            self.container_dir = Path(self.temp_dir) / f"{self.container_name}"
-            with cwd(self.container_dir) as _:
-                self.merge_pr()
-        os.chdir(self.current_dir)
-
-    def clean_temporary_dir(self):
-        os.chdir(self.current_dir)
-        if Path(self.temp_dir).exists():
-            shutil.rmtree(self.temp_dir)
-
-    def clean_container_dir(self):
-        os.chdir(self.current_dir)
-        if Path(self.container_dir).exists():
-            shutil.rmtree(self.container_dir)
-
-    def merge_pr(self):
-        for pr in self.pr_to_merge[self.container_name]:
-            if int(pr["approvals"]) < self.approvals:
-                logger.debug(
-                    f"Automerger does not have enough approvals '{pr['approvals']}' against '{self.approvals}' "
-                )
-                continue
+    def merge_container(self, container_name: str) -> list[MergeResult]:
+        with self.timings.span("merge", container_name):
+            return [self.merge_pull_request(container_name, pr) for pr in self.pr_to_merge[container_name]]
+
+    def merge_pull_request(self, container_name: str, pr: dict) -> MergeResult:
+        """
+        Function merges one pull request
+        :param container_name: repository name in the namespace
+        :param pr: pull request from self.pr_to_merge
+        :return: MergeResult with outcome 'merged', 'failed' or 'skipped' and duration in seconds
+        """
+        start = time.monotonic()
 
-            logger.info(f"Let's try to merge {pr['number']}....")
+        def get_result(outcome: str) -> MergeResult:
+            self.metrics.merges.inc(repo=container_name, outcome=outcome)
+            return MergeResult(container_name, pr["number"], pr["title"], outcome, time.monotonic() - start)
+
+        if int(pr["approvals"]) < self.approvals:
+            logger.debug(f"Automerger does not have enough approvals '{pr['approvals']}' against '{self.approvals}' ")
+            return get_result("skipped")
+
+        logger.info(f"Let's try to merge {self.get_repo_slug(container_name)}#{pr['number']}....")
+        if self.backend == "api":
             try:
-                output = utils.run_command(f"gh pr merge --rebase --auto {pr['number']}", return_output=True)
-                logger.debug(f"The output from merging command '{output}'")
-                logger.info(f"Pull request {pr['number']} was merged.")
+                output = self.github_client.merge_pull_request(self.namespace, container_name, pr["number"])
+            except requests.HTTPError as he:
+                logger.error(f"Merging pr {pr} failed with reason {he.response.text}")
+                return get_result("failed")
+            logger.debug(f"The output from merging request '{output}'")
+        else:
+            try:
+                output = get_scheduler().run_command(
+                    get_gh_key(),
+                    f"gh pr merge --repo {self.get_repo_slug(container_name)} --rebase --auto {pr['number']}",
+                    priority=PRIORITY_MERGE,
+                )
             except subprocess.CalledProcessError as cpe:
                 logger.error(f"Merging pr {pr} failed with reason {cpe.output}")
-                continue
+                return get_result("failed")
+            logger.debug(f"The output from merging command '{output}'")
+        logger.info(f"Pull request {self.get_repo_slug(container_name)}#{pr['number']} was merged.")
+        return get_result("merged")
+
+    def fetch_pull_requests(self, container_name: str) -> list | None:
+        if self.snapshot is not None:
+            return self.snapshot.get(container_name)
+        return super().fetch_pull_requests(container_name)
+
+    def check_container(self, container_name: str) -> list | None:
+        """
+        Function checks one repository. It does not modify the merger state,
+        so several repositories can be checked in parallel.
+        :param container_name: repository name in the namespace
+        :return: list of pull requests to merge
+                 None in case the repository could not be checked
+        """
+        repo_data = self.fetch_pull_requests(container_name)
+        if repo_data is None:
+            return None
+        with self.timings.span("evaluate", container_name):
+            return self.evaluate_pull_requests(container_name, repo_data)
+
+    def evaluate_pull_requests(self, container_name: str, repo_data: list) -> list:
+        if self.state_store is None:
+            return self.get_pull_requests_to_merge(container_name, repo_data)
+        pull_requests: list = []
+        for pr in repo_data:
+            state = self.state_store.get_verdict(container_name, pr)
+            # Waiting pull request can become old enough without being updated
+            if state is None or (state.verdict == VERDICT_WAITING and self.pr_lifetime):
+                to_merge = self.get_pull_requests_to_merge(container_name, [pr])
+                verdict = VERDICT_MERGEABLE if to_merge else VERDICT_WAITING
+                self.state_store.record(container_name, pr, verdict, to_merge[0] if to_merge else None)
+                pull_requests.extend(to_merge)
+            elif state.verdict == VERDICT_MERGEABLE:
+                pull_requests.append(state.result)
+        return pull_requests
 
     def check_all_containers(self) -> bool:
-        if not self.is_authenticated():
+        repos = self.config.github["repos"]
+        searched = False
+        if self.snapshot is None:
+            with self.timings.span("authenticate"):
+                if not self.is_authenticated():
+                    return False
+        if self.snapshot is None and self.discovery == "search":
+            with self.timings.span("discover"):
+                candidates = self.discover_pull_requests(repos)
+            if candidates is not None:
+                # Only repositories with candidates are evaluated, the search results are the snapshot
+                self.snapshot = candidates
+                repos = [repo for repo in repos if repo in candidates]
+                searched = True
+        if self.snapshot is None and not self.prefetch_pull_requests(repos):
             return False
-        for container in self.config.github["repos"]:
-            self.container_name = container
-            self.repo_data = []
-            if not self.clone_repo():
+        self.open_state_store(
+            get_fingerprint(POLICY_VERSION, self.namespace, self.approval_labels, self.approvals, self.pr_lifetime)
+        )
+        # Results are merged in the configuration order, regardless of which worker finished first
+        for container, pull_requests in zip(repos, utils.run_parallel(self.check_container, repos, jobs=self.jobs)):
+            if pull_requests is None:
                 continue
-            with cwd(self.container_dir) as _:
-                if not self.is_correct_repo():
-                    logger.error(f"This is not correct repo {self.container_name}.")
-                    self.clean_container_dir()
-                    continue
-                if self.container_name not in self.pr_to_merge:
-                    self.pr_to_merge[self.container_name] = []
-                try:
-                    self.get_gh_pr_list()
-                    self.check_pr_to_merge()
-                except subprocess.CalledProcessError:
-                    logger.error(f"Something went wrong {self.container_name}.")
-                    continue
-        os.chdir(self.current_dir)
+            self.pr_to_merge.setdefault(container, []).extend(pull_requests)
+            self.metrics.mergeable.set(len(self.pr_to_merge[container]), service="github", repo=container)
+        # Search results omit pull requests that only lost their label, they are not dropped then
+        self.close_state_store(None if searched else list(self.pr_to_merge))
+        self.evict_mirrors(repos)
         logger.debug(f"List of all PRs to merge: '{self.pr_to_merge}'")
         return True
 
-    def print_pull_request_to_merge(self) -> bool:
-        logger.info("SUMMARY")
-        if not self.pr_to_merge:
-            return False
-        is_there_something = [cont for cont in self.pr_to_merge.keys() if self.pr_to_merge[cont]]
-        if not is_there_something:
-            logger.info("There is nothing to send or merge.")
-            return False
-        self.approval_body.append("Pull requests are merged.")
-        self.approval_body.append("<table><tr><th>Pull request URL</th><th>Title</th><th>Approval status</th></tr>")
-        for cont, pr_list in self.pr_to_merge.items():
-            logger.debug(f"Print info about {cont} and {pr_list}.")
-            for pr in pr_list:
-                if not pr:
-                    continue
-                logger.info(f"https://github.com/{self.namespace}/{cont}/pull/{pr['number']} -> CAN BE MERGED")
-                self.approval_body.append(
-                    f"<tr><td> https://github.com/{self.namespace}/{cont}/pull/{pr['number']} </td>"
-                    f"<td> {pr['title']} </td><td><p style='color:red;'> CAN BE MERGED </p></td></tr>"
+    def discover_pull_requests(self, repos: list[str]) -> dict | None:
+        """
+        Function finds candidates to merge by one organization-wide search for pull requests
+        with any of approval labels, instead of listing pull requests of every repository
+        :param repos: configured repositories, pull requests of other repositories are ignored
+        :return: dictionary with repository name and its pull requests to check,
+                 None in case the search can not be used and all repositories have to be listed
+        """
+        labels = self.policy.approval.get_names()
+        if not labels:
+            logger.info("Approval labels are patterns or empty, all repositories are listed.")
+            return None
+        try:
+            found = self.get_graphql().search_pull_requests(labels)
+        except (requests.RequestException, subprocess.CalledProcessError) as ex:
+            logger.error(f"Searching pull requests failed. {ex}")
+            return None
+        if found is None:
+            return None
+        candidates = {
+            repo: PullRequestHandler.get_pull_requests_to_check(pull_requests)
+            for repo, pull_requests in found.items()
+            if repo in repos
+        }
+        logger.info(f"{len(candidates)} of {len(repos)} repositories have candidates to merge.")
+        return candidates
+
+    def get_report_title(self) -> str:
+        return "Merge request update"
+
+    def write_report(self, report: Report):
+        """
+        Function streams pull requests to merge, changes since the last run and merge results to the report
+        :param report: Report rendering the console summary, output files and email
+        """
+        report.start(self.get_report_title())
+        to_merge_section = Section(
+            "to_merge", "Pull requests to merge", ("Pull request URL", "Title", "Approval status"), False
+        )
+        with report.section(to_merge_section) as add_row:
+            for container, pull_requests in self.pr_to_merge.items():
+                for pr in pull_requests:
+                    add_row(
+                        container,
+                        (self.get_pull_request_url(container, pr["number"]), pr["title"], "CAN BE MERGED"),
+                        {"repo": container, "number": pr["number"], "title": pr["title"]},
+                    )
+        self.write_changes(report)
+        self.write_sections(report)
+        report.finish()
+
+    def write_sections(self, report: Report):
+        """
+        Function streams merge results to the report
+        :param report: Report rendering the console summary, output files and email
+        """
+        merge_section = Section(
+            "merge_results", "Merge results", ("Pull request URL", "Title", "Result", "Time"), False
+        )
+        with report.section(merge_section) as add_row:
+            for result in self.merge_results:
+                add_row(
+                    result.repo,
+                    (
+                        self.get_pull_request_url(result.repo, result.number),
+                        result.title,
+                        result.outcome.upper(),
+                        f"{result.duration:.2f}s",
+                    ),
+                    result._asdict(),
                 )
-        self.approval_body.append("</table><br>")
-        return True
 
-    def send_results(self, recipients):
+    def send_results(self, recipients, body: str = "", mailer: Mailer | None = None) -> bool:
         logger.debug(f"Recipients are: {recipients}")
         if not recipients:
             return False
-        sender_class = EmailSender(recipient_email=list(recipients))
-        subject_msg = "Merge request update"
-        if self.approval_body:
-            sender_class.send_email(subject_msg, self.approval_body)
-        else:
-            logger.info("Nothing to send.")
+        sender_class = EmailSender(recipient_email=list(recipients), timings=self.timings)
+        sender_class.send_email(self.get_report_title(), [body], mailer=mailer)
+        return True
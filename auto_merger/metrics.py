@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+import os
+import threading
+import time
+
+from pathlib import Path
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Metric family in the Prometheus text format. Values are kept per label values.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict = {}
+        self.lock = threading.Lock()
+
+    def get_key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def get(self, **labels) -> float:
+        return self.values.get(self.get_key(labels), 0)
+
+    def get_samples(self) -> list[tuple[str, dict, float]]:
+        with self.lock:
+            return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in sorted(self.values.items())]
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(
+            f"{name}{format_labels(labels)} {format_value(value)}" for name, labels, value in self.get_samples()
+        )
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def remove(self, **labels):
+        with self.lock:
+            self.values.pop(self.get_key(labels), None)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self.get_key(labels)
+        with self.lock:
+            # [count per bucket..., sum, count]
+            stats = self.values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    stats[index] += 1
+                    break
+            stats[-2] += value
+            stats[-1] += 1
+
+    def get(self, **labels) -> float:
+        stats = self.values.get(self.get_key(labels))
+        return stats[-1] if stats else 0
+
+    def get_samples(self) -> list[tuple[str, dict, float]]:
+        samples = []
+        with self.lock:
+            for key, stats in sorted(self.values.items()):
+                labels = dict(zip(self.labelnames, key))
+                cumulative = 0
+                for bound, count in zip(self.buckets, stats):
+                    cumulative += count
+                    samples.append((f"{self.name}_bucket", dict(labels, le=format_value(bound)), cumulative))
+                samples.append((f"{self.name}_sum", labels, stats[-2]))
+                samples.append((f"{self.name}_count", labels, stats[-1]))
+        return samples
+
+
+class Metrics:
+    """
+    Metrics of checker and merger runs. They are updated while running, rendering is the only cost of exporting.
+    """
+
+    def __init__(self):
+        self.run_duration = Gauge("auto_merger_run_duration_seconds", "Duration of the last run.", ("command",))
+        self.run_success = Gauge("auto_merger_last_run_success", "1 when the last run succeeded.", ("command",))
+        self.run_timestamp = Gauge(
+            "auto_merger_last_run_timestamp_seconds", "Unix time the last run finished.", ("command",)
+        )
+        self.phase_duration = Histogram(
+            "auto_merger_phase_duration_seconds", "Duration of run phases, like 'pr list'.", ("phase",)
+        )
+        self.phase_errors = Counter(
+            "auto_merger_phase_errors_total", "Phases that failed with an exception, like API errors.", ("phase",)
+        )
+        self.rate_limit_remaining = Gauge(
+            "auto_merger_rate_limit_remaining", "Remaining API requests reported by the server.", ("service",)
+        )
+        self.blocked = Gauge(
+            "auto_merger_blocked_pull_requests", "Pull requests blocked by labels.", ("service", "repo")
+        )
+        self.mergeable = Gauge(
+            "auto_merger_mergeable_pull_requests", "Pull requests ready to be merged.", ("service", "repo")
+        )
+        self.merges = Counter("auto_merger_merges_total", "Merge attempts by outcome.", ("repo", "outcome"))
+
+    def get_metrics(self) -> list[Metric]:
+        return [metric for metric in vars(self).values() if isinstance(metric, Metric)]
+
+    def set_run(self, command: str, success: bool, duration: float):
+        self.run_duration.set(duration, command=command)
+        self.run_success.set(int(success), command=command)
+        self.run_timestamp.set(time.time(), command=command)
+
+    def set_repo_counts(self, service: str, repo: str, blocked: int, mergeable: int):
+        self.blocked.set(blocked, service=service, repo=repo)
+        self.mergeable.set(mergeable, service=service, repo=repo)
+
+    def observe_rate_limit(self, service: str, header: str):
+        """
+        Returns response hook of requests.Session storing the rate limit header
+        """
+
+        def hook(response, *args, **kwargs):
+            if response.headers.get(header, "").isdigit():
+                self.rate_limit_remaining.set(int(response.headers[header]), service=service)
+
+        return hook
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.get_metrics():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: Path | str) -> Path:
+        """
+        Function writes metrics for the node exporter textfile collector.
+        The file is replaced atomically, so the collector never reads a partial file.
+        """
+        path = Path(path).expanduser()
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(self.render())
+        tmp_path.replace(path)
+        logger.debug(f"Metrics written to {path}")
+        return path
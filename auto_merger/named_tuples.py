@@ -41,3 +41,18 @@ ProjectMR = namedtuple(
         "detailed_merge_status",
     ],
 )
+# Fields of a merge request the checker uses, without the whole python-gitlab object
+MergeRequestRecord = namedtuple("MergeRequestRecord", ["iid", "title", "labels", "web_url"])
+CacheEntry = namedtuple("CacheEntry", ["etag", "last_modified", "stored_at", "data"])
+PullRequestState = namedtuple(
+    "PullRequestState", ["repo", "number", "title", "updated_at", "fingerprint", "verdict", "result"]
+)
+MergeResult = namedtuple("MergeResult", ["repo", "number", "title", "outcome", "duration"])
+PolicyResult = namedtuple("PolicyResult", ["number", "verdict", "reasons", "approvals", "blocked_labels"])
+PullRequestRecord = namedtuple(
+    "PullRequestRecord",
+    ["repo", "number", "title", "labels", "approvals", "target_url"],
+    defaults=[None, None, None],
+)
+Section = namedtuple("Section", ["name", "title", "columns", "group_by_repo"])
+Shard = namedtuple("Shard", ["index", "count"])
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import fnmatch
+import logging
+import re
+
+from datetime import datetime, timedelta
+
+from auto_merger import utils
+from auto_merger.named_tuples import PolicyResult
+from auto_merger.state_store import VERDICT_BLOCKED, VERDICT_MERGEABLE, VERDICT_WAITING
+
+
+logger = logging.getLogger(__name__)
+
+CHANGES_REQUESTED_LABEL = "pr/changes-requested"
+GLOB_CHARACTERS = frozenset("*?[")
+# Review states that change the opinion of a reviewer, comments keep the previous one
+OPINIONATED_STATES = frozenset(("APPROVED", "CHANGES_REQUESTED", "DISMISSED"))
+# Stored verdicts computed by a different version of the policy are evaluated again
+POLICY_VERSION = 2
+
+
+class LabelMatcher:
+    """
+    Set of label names compiled once from configuration.
+    Plain names are looked up in a frozenset, names with glob characters ('pr/missing-*')
+    and regular expressions enclosed in slashes ('/^ci-.*-failed$/') are joined into one regular expression.
+    Results are memoized, because the same labels repeat across pull requests.
+    """
+
+    def __init__(self, patterns: list[str] | tuple = ()):
+        names: set = set()
+        expressions: list = []
+        for pattern in patterns:
+            pattern = str(pattern)
+            if len(pattern) > 2 and pattern.startswith("/") and pattern.endswith("/"):
+                expressions.append(pattern[1:-1])
+            elif GLOB_CHARACTERS.intersection(pattern):
+                expressions.append(fnmatch.translate(pattern))
+            else:
+                names.add(pattern)
+        self.names = frozenset(names)
+        self.expression = re.compile("|".join(f"(?:{expr})" for expr in expressions)) if expressions else None
+        self.matches: dict = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.expression)
+
+    def match(self, label: str) -> bool:
+        if label in self.names:
+            return True
+        if self.expression is None:
+            return False
+        if label not in self.matches:
+            self.matches[label] = self.expression.search(label) is not None
+        return self.matches[label]
+
+    def get_matching(self, labels) -> list[str]:
+        return [label for label in labels if self.match(label)]
+
+    def match_any(self, labels) -> bool:
+        return any(self.match(label) for label in labels)
+
+    def get_names(self) -> list[str] | None:
+        """
+        Function returns the plain label names, None in case some label is a pattern
+        that can not be used in a search query
+        """
+        if self.expression is not None:
+            return None
+        return sorted(self.names)
+
+
+class Policy:
+    """
+    Merge policy compiled once from the 'github' or 'gitlab' configuration section
+    and shared by the checkers and the merger.
+    """
+
+    def __init__(
+        self,
+        blocker_labels: list[str] | tuple = (),
+        approval_labels: list[str] | tuple = (),
+        approvals: int = 2,
+        lifetime: int = 0,
+    ):
+        self.blockers = LabelMatcher(blocker_labels)
+        self.approval = LabelMatcher(approval_labels)
+        self.approvals = int(approvals)
+        self.lifetime = int(lifetime or 0)
+
+    @classmethod
+    def from_config(cls, section: dict, merging: bool = False) -> "Policy":
+        """
+        Function compiles policy from the configuration section
+        :param section: 'github' or 'gitlab' configuration section
+        :param merging: True for the merger, which requires approval labels and pull request lifetime
+                        instead of the absence of blocker labels
+        :return: Policy
+        """
+        if merging:
+            return cls(
+                approval_labels=section.get("approval_labels", []),
+                approvals=section.get("approvals", 2),
+                lifetime=section.get("pr_lifetime", 0),
+            )
+        return cls(blocker_labels=section.get("blocker_labels", []), approvals=section.get("approvals", 2))
+
+    @staticmethod
+    def get_label_names(pull_request: dict) -> list[str]:
+        return [label["name"] for label in pull_request.get("labels") or []]
+
+    def get_blocked_labels(self, labels) -> list[str]:
+        return self.blockers.get_matching(labels)
+
+    @staticmethod
+    def get_latest_reviews(reviews: list | None) -> dict[str, str]:
+        """
+        Function indexes the latest opinionated review state of every reviewer.
+        Reviews are in chronological order, so a repeated approval of the same reviewer is counted once
+        and approval followed by requested changes is not counted at all.
+        :param reviews: full review history or the latest reviews per reviewer
+        :return: dictionary with reviewer login and the state of the latest review
+        """
+        latest: dict[str, str] = {}
+        for index, review in enumerate(reviews or []):
+            if review["state"] not in OPINIONATED_STATES:
+                continue
+            # Reviews of deleted accounts have no author, each of them is a different reviewer
+            author = (review.get("author") or {}).get("login") or f"#{index}"
+            latest[author] = review["state"]
+        return latest
+
+    @staticmethod
+    def count_approvals(reviews: list | None) -> int:
+        return sum(1 for state in Policy.get_latest_reviews(reviews).values() if state == "APPROVED")
+
+    def is_old_enough(self, pull_request: dict, now: datetime | None = None) -> bool:
+        if self.lifetime == 0:
+            return True
+        if "createdAt" not in pull_request:
+            return False
+        created = datetime.strptime(pull_request["createdAt"], "%Y-%m-%dT%H:%M:%SZ")
+        return created + timedelta(days=self.lifetime) < (now or utils.get_realtime())
+
+    @staticmethod
+    def is_skipped(pull_request: dict) -> bool:
+        """
+        Drafts and pull requests with changes requested are not checked at all
+        """
+        if pull_request.get("isDraft"):
+            return True
+        return CHANGES_REQUESTED_LABEL in Policy.get_label_names(pull_request)
+
+    def evaluate(self, pull_request: dict, now: datetime | None = None) -> PolicyResult:
+        """
+        Function computes verdict of one pull request
+        :param pull_request: pull request dictionary with 'number', 'labels', 'reviews' and optional 'reviewDecision'
+        :param now: time the lifetime is compared with, current time by default
+        :return: PolicyResult with the verdict and reasons why the pull request can not be merged yet
+        """
+        number = pull_request["number"]
+        if "labels" not in pull_request:
+            return PolicyResult(number, VERDICT_WAITING, ("no labels",), 0, ())
+        labels = self.get_label_names(pull_request)
+        blocked_labels = tuple(self.get_blocked_labels(labels))
+        if blocked_labels:
+            return PolicyResult(number, VERDICT_BLOCKED, (f"blocked by {' '.join(blocked_labels)}",), 0, blocked_labels)
+        reasons = []
+        if self.approval and not self.approval.match_any(labels):
+            reasons.append("missing approval label")
+        if "reviews" not in pull_request:
+            reasons.append("no reviews")
+        if pull_request.get("reviewDecision") == "CHANGES_REQUESTED":
+            reasons.append("changes requested")
+        approval_count = self.count_approvals(pull_request.get("reviews"))
+        if approval_count < self.approvals:
+            reasons.append(f"{approval_count} of {self.approvals} approvals")
+        if not self.is_old_enough(pull_request, now=now):
+            reasons.append(f"opened for less than {self.lifetime} days")
+        verdict = VERDICT_WAITING if reasons else VERDICT_MERGEABLE
+        return PolicyResult(number, verdict, tuple(reasons), approval_count, ())
+
+    def evaluate_all(self, pull_requests: list[dict]) -> list[PolicyResult]:
+        """
+        Function evaluates a batch of pull requests in one pass, with one reading of the current time
+        :param pull_requests: list of pull request dictionaries
+        :return: list of PolicyResult in the same order
+        """
+        now = utils.get_realtime() if self.lifetime else None
+        results = [self.evaluate(pull_request, now=now) for pull_request in pull_requests]
+        for result in results:
+            if result.reasons:
+                logger.debug(f"Pull request {result.number} is {result.verdict}: {', '.join(result.reasons)}")
+        return results
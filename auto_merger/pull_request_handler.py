@@ -23,28 +23,12 @@
 # SOFTWARE.
 import logging
 
-from datetime import datetime, timedelta
-
-from auto_merger import utils
+from auto_merger.policy import Policy
 
 logger = logging.getLogger(__name__)
 
 
 class PullRequestHandler:
-    @staticmethod
-    def check_pr_lifetime(pull_request: dict = None, pr_lifetime: int = 0) -> bool:
-        if pull_request is None:
-            return False
-        if pr_lifetime == 0:
-            return True
-        if "createdAt" not in pull_request:
-            return False
-        pr_life = pull_request["createdAt"]
-        date_created = datetime.strptime(pr_life, "%Y-%m-%dT%H:%M:%SZ") + timedelta(days=1)
-        if date_created < utils.get_realtime():
-            return True
-        return False
-
     @staticmethod
     def is_draft(pull_request: dict):
         if "isDraft" in pull_request:
@@ -53,37 +37,14 @@ class PullRequestHandler:
         return False
 
     @staticmethod
-    def check_pr_approvals(reviews_to_check: list) -> int:
-        if not reviews_to_check:
-            return 0
-        approval_cnt = 0
-        for review in reviews_to_check:
-            if review["state"] == "APPROVED":
-                approval_cnt += 1
-        return approval_cnt
-
-    @staticmethod
-    def is_changes_requested(pull_request: dict):
-        if "labels" not in pull_request:
-            return False
-        for labels in pull_request["labels"]:
-            if "pr/changes-requested" == labels["name"]:
-                return True
-        return False
-
-    @staticmethod
-    def check_labels_to_merge(pull_request: dict, blocking_labels: list) -> bool:
+    def get_pull_requests_to_check(pull_requests: list) -> list:
         """
-        Function checks labels for each pull request
-        'label' is compared against configuration file 'github': 'blocking_labels'
-        :param pr: pull request dictionary with labels
-        :return: False is labels are not present or 'label' is int 'blocking_labels'
-                 True pull request is approved. No blocking issue
+        Function filters out pull requests that are drafts or have changes requested
+        :param pull_requests: list of pull request dictionaries
+        :return: list of pull requests that should be checked
         """
-        if "labels" not in pull_request:
-            return False
-        for label in pull_request["labels"]:
-            if label["name"] in blocking_labels:
-                return False
-        logger.debug(f"Add '{pull_request['number']}' to approved PRs.")
-        return True
+        return [pr for pr in pull_requests if not Policy.is_skipped(pr)]
+
+    @staticmethod
+    def check_pr_approvals(reviews_to_check: list) -> int:
+        return Policy.count_approvals(reviews_to_check)
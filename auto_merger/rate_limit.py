@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+
+from contextlib import contextmanager
+from subprocess import CalledProcessError
+from urllib.parse import urlparse
+
+import requests
+
+from auto_merger import utils
+
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_READ = "read"
+PRIORITY_MERGE = "merge"
+
+# Remaining (GitHub, GitLab) and reset time headers
+REMAINING_HEADERS = ("X-RateLimit-Remaining", "RateLimit-Remaining")
+RESET_HEADERS = ("X-RateLimit-Reset", "RateLimit-Reset")
+# GitHub counts GraphQL, search and other REST requests by separate budgets and names the one a response used
+RESOURCE_HEADER = "X-RateLimit-Resource"
+
+
+def get_resource(url: str) -> str:
+    """
+    Function guesses the rate limit resource of the request before the response tells it
+    """
+    path = urlparse(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+def get_key(url: str, token: str = "", resource: str = "core") -> tuple[str, str, str]:
+    """
+    Rate limits are counted per host, token and resource, the token itself is never kept
+    """
+    return urlparse(url).netloc or url, hashlib.sha256(token.encode()).hexdigest()[:12], resource
+
+
+def get_gh_key() -> tuple[str, str, str]:
+    """
+    'gh' and the in-process client share the rate limit of GH_TOKEN on api.github.com.
+    The 'gh' commands used here query the GraphQL API.
+    """
+    return get_key("https://api.github.com", os.getenv("GH_TOKEN", ""), "graphql")
+
+
+class Budget:
+    """
+    Known rate limit state and running requests of one host and token
+    """
+
+    def __init__(self, concurrency: int):
+        self.remaining: int | None = None
+        self.reset_at = 0.0
+        self.limit = float(concurrency)
+        self.in_flight = 0
+        self.waiting_merges = 0
+
+
+class RateLimitScheduler:
+    """
+    Scheduler shared by all clients of one run. It tracks the remaining rate limit per host and token,
+    keeps 'reserve' requests for merges, waits for the reset instead of failing once the limit is spent
+    and halves the number of concurrent requests after every rate limited response (AIMD).
+    Merges waiting for a slot go ahead of read-only requests.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        reserve: int = 50,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 900.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.reserve = reserve
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budgets: dict = {}
+        self.condition = threading.Condition()
+
+    def get_budget(self, key: tuple) -> Budget:
+        if key not in self.budgets:
+            self.budgets[key] = Budget(self.max_concurrency)
+        return self.budgets[key]
+
+    def get_wait_time(self, budget: Budget, priority: str) -> float:
+        """
+        Function returns how long the request has to wait for the rate limit reset, 0 when it does not have to
+        """
+        if budget.remaining is None:
+            return 0
+        wait_time = budget.reset_at - time.time()
+        if wait_time <= 0:
+            # The limit was reset, the next response tells the new state
+            budget.remaining = None
+            return 0
+        if budget.remaining > (0 if priority == PRIORITY_MERGE else self.reserve):
+            return 0
+        return min(wait_time, self.max_delay)
+
+    def can_start(self, budget: Budget, priority: str) -> bool:
+        if budget.in_flight >= max(1, int(budget.limit)):
+            return False
+        return priority == PRIORITY_MERGE or budget.waiting_merges == 0
+
+    @contextmanager
+    def slot(self, key: tuple, priority: str = PRIORITY_READ):
+        """
+        Waits until the request can be sent without exceeding the rate limit and concurrency
+        """
+        with self.condition:
+            budget = self.get_budget(key)
+            if priority == PRIORITY_MERGE:
+                budget.waiting_merges += 1
+            try:
+                while True:
+                    wait_time = self.get_wait_time(budget, priority)
+                    if not wait_time and self.can_start(budget, priority):
+                        break
+                    if wait_time:
+                        logger.info(f"Rate limit of {key[0]} is spent, waiting {wait_time:.1f} seconds.")
+                    self.condition.wait(timeout=wait_time or None)
+            finally:
+                if priority == PRIORITY_MERGE:
+                    budget.waiting_merges -= 1
+            budget.in_flight += 1
+        try:
+            yield budget
+        finally:
+            with self.condition:
+                budget.in_flight -= 1
+                self.condition.notify_all()
+
+    def update(self, key: tuple, headers) -> None:
+        """
+        Stores the remaining rate limit and its reset time reported by the server
+        to the budget of the resource named by the response
+        """
+        if headers.get(RESOURCE_HEADER):
+            key = key[:2] + (headers[RESOURCE_HEADER],)
+        with self.condition:
+            budget = self.get_budget(key)
+            for remaining_header, reset_header in zip(REMAINING_HEADERS, RESET_HEADERS):
+                remaining = headers.get(remaining_header, "")
+                if remaining.isdigit():
+                    budget.remaining = int(remaining)
+                    reset = headers.get(reset_header, "")
+                    budget.reset_at = float(reset) if reset.isdigit() else time.time() + 60
+
+    def increase_concurrency(self, key: tuple):
+        """
+        Every successful request adds 1/limit, so the limit grows by one per round of requests
+        """
+        with self.condition:
+            budget = self.get_budget(key)
+            budget.limit = min(self.max_concurrency, budget.limit + 1 / budget.limit)
+            self.condition.notify_all()
+
+    def get_backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter, so the waiting clients do not retry at the same moment
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def throttle(self, key: tuple, attempt: int, retry_after: str = "") -> float:
+        """
+        Function halves the allowed concurrency and blocks all requests of the key until the delay passes
+        :return: delay in seconds
+        """
+        if retry_after.isdigit():
+            delay = min(self.max_delay, float(retry_after)) + random.uniform(0, self.base_delay)
+        else:
+            delay = self.get_backoff(attempt)
+        with self.condition:
+            budget = self.get_budget(key)
+            budget.limit = max(1.0, budget.limit / 2)
+            budget.remaining = 0
+            # The primary rate limit may be reset later than the backoff
+            budget.reset_at = max(budget.reset_at, time.time() + delay)
+            delay = budget.reset_at - time.time()
+            self.condition.notify_all()
+        logger.warning(f"Rate limit of {key[0]} exceeded, retrying in {delay:.1f} seconds (attempt {attempt + 1}).")
+        return delay
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        if "Retry-After" in response.headers or any(response.headers.get(h) == "0" for h in REMAINING_HEADERS):
+            return True
+        return "rate limit" in response.text.lower()
+
+    def send(self, key: tuple, send_request, priority: str = PRIORITY_READ) -> requests.Response:
+        """
+        Function sends a request within the rate limit and retries it when the server reports the limit
+        :param key: host, token and resource, see get_key
+        :param send_request: callable without arguments returning requests.Response
+        :param priority: PRIORITY_MERGE for merges, PRIORITY_READ for everything else
+        :return: the last response
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.slot(key, priority):
+                response = send_request()
+                self.update(key, response.headers)
+            if not self.is_rate_limited(response):
+                self.increase_concurrency(key)
+                break
+            if attempt == self.max_retries:
+                break
+            # The next slot of every request of the key waits until the delay passes
+            self.throttle(key, attempt, response.headers.get("Retry-After", ""))
+        return response
+
+    def run_command(self, key: tuple, cmd, priority: str = PRIORITY_READ, **kwargs) -> str:
+        """
+        Function runs 'gh' command within the rate limit and retries it
+        when it failed because of the primary or secondary rate limit
+        Raises subprocess.CalledProcessError if it fails for another reason or too many times
+        """
+        attempt = 0
+        while True:
+            try:
+                with self.slot(key, priority):
+                    output = utils.run_command(cmd=cmd, return_output=True, **kwargs)
+                self.increase_concurrency(key)
+                return output
+            except CalledProcessError as cpe:
+                if attempt == self.max_retries or "rate limit" not in str(cpe.output).lower():
+                    raise
+                self.throttle(key, attempt)
+            attempt += 1
+
+
+class ScheduledSession(requests.Session):
+    """
+    requests.Session sending every request through the rate limit scheduler.
+    Requests to merge endpoints have priority over read-only ones.
+    """
+
+    def __init__(self, scheduler: RateLimitScheduler, token: str = ""):
+        super().__init__()
+        self.scheduler = scheduler
+        self.token = token
+
+    def request(self, method, url, *args, **kwargs):
+        priority = PRIORITY_MERGE if method.upper() in ("PUT", "POST") and "/merge" in url else PRIORITY_READ
+        return self.scheduler.send(
+            get_key(url, self.token, get_resource(url)),
+            lambda: super(ScheduledSession, self).request(method, url, *args, **kwargs),
+            priority,
+        )
+
+
+_scheduler: RateLimitScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """
+    Function returns the scheduler shared by all clients of the process
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RateLimitScheduler()
+        return _scheduler
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import html
+import io
+import json
+import logging
+import os
+import sys
+
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Iterator, TextIO
+
+from auto_merger.exceptions import AutoMergerReportIncomplete
+from auto_merger.named_tuples import Section
+
+
+logger = logging.getLogger(__name__)
+
+REPORT_FORMATS = ("json", "jsonl", "html", "markdown")
+FORMAT_SUFFIXES = {".jsonl": "jsonl", ".html": "html", ".htm": "html", ".md": "markdown"}
+
+
+def get_format(path: str, output_format: str | None = None) -> str:
+    """
+    Function returns the requested format or guesses it from the file suffix, JSON by default
+    """
+    return output_format or FORMAT_SUFFIXES.get(Path(path).suffix.lower(), "json")
+
+
+class Renderer:
+    """
+    Renders report rows to a stream as soon as they are added, nothing is kept in memory.
+    A section is started by its first row, so empty sections are not rendered at all.
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        self.stream = stream
+
+    def start(self, title: str):
+        pass
+
+    def start_section(self, section: Section):
+        pass
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        pass
+
+    def end_section(self, section: Section):
+        pass
+
+    def finish(self):
+        pass
+
+
+class LogRenderer(Renderer):
+    """
+    Console summary
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        super().__init__(stream)
+        self.repo = ""
+
+    def start_section(self, section: Section):
+        logger.warning(f"SUMMARY\n\n{section.title}")
+        self.repo = ""
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        if section.group_by_repo and repo != self.repo:
+            logger.warning(f"\n{repo}\n")
+            self.repo = repo
+        logger.warning(" ".join(str(value) for value in values))
+
+
+class JsonRenderer(Renderer):
+    """
+    Compact JSON object with one key per section. Rows of sections grouped by repository are stored
+    in an object keyed by the repository name, rows of other sections in a list.
+    """
+
+    def __init__(self, stream: TextIO | None = None):
+        super().__init__(stream)
+        self.keys = 0
+        self.repos = 0
+        self.items = 0
+        self.repo: str | None = None
+
+    def open_key(self, key: str, opening: str):
+        self.stream.write(("," if self.keys else "") + json.dumps(key) + ":" + opening)
+        self.keys += 1
+        self.items = 0
+
+    def start(self, title: str):
+        self.stream.write("{")
+
+    def start_section(self, section: Section):
+        self.repo = None
+        self.repos = 0
+        self.open_key(section.name, "{" if section.group_by_repo else "[")
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        if section.group_by_repo and repo != self.repo:
+            if self.repo is not None:
+                self.stream.write("]")
+            self.stream.write(("," if self.repos else "") + json.dumps(repo) + ":[")
+            self.repos += 1
+            self.items = 0
+            self.repo = repo
+        self.stream.write(("," if self.items else "") + json.dumps(record, separators=(",", ":"), default=str))
+        self.items += 1
+
+    def end_section(self, section: Section):
+        self.stream.write("]}" if section.group_by_repo else "]")
+
+    def finish(self):
+        self.stream.write("}\n")
+
+
+class JsonLinesRenderer(Renderer):
+    """
+    One JSON object per row, flushed right away, so consumers can read the report while it is written
+    """
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        row = {"section": section.name, "repo": repo}
+        row.update(record)
+        self.stream.write(json.dumps(row, separators=(",", ":"), default=str) + "\n")
+        self.stream.flush()
+
+
+class HtmlRenderer(Renderer):
+    """
+    HTML tables, used by email as well
+    """
+
+    def start_section(self, section: Section):
+        self.stream.write(f"<b>{html.escape(section.title)}</b><br><br><table><tr>")
+        self.stream.write("".join(f"<th>{html.escape(column)}</th>" for column in section.columns))
+        self.stream.write("</tr>")
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        self.stream.write("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in values) + "</tr>")
+
+    def end_section(self, section: Section):
+        self.stream.write("</table><br><br>")
+
+
+class MarkdownRenderer(Renderer):
+    def start(self, title: str):
+        self.stream.write(f"# {title}\n")
+
+    def start_section(self, section: Section):
+        self.stream.write(f"\n## {section.title}\n\n")
+        self.stream.write("| " + " | ".join(section.columns) + " |\n")
+        self.stream.write("|" + "---|" * len(section.columns) + "\n")
+
+    def add_row(self, section: Section, repo: str, values: tuple, record: dict):
+        cells = (str(value).replace("|", "\\|").replace("\n", " ") for value in values)
+        self.stream.write("| " + " | ".join(cells) + " |\n")
+
+
+RENDERERS = {
+    "json": JsonRenderer,
+    "jsonl": JsonLinesRenderer,
+    "html": HtmlRenderer,
+    "markdown": MarkdownRenderer,
+}
+
+
+class Report:
+    """
+    One report pipeline feeding all renderers: console, output files and email
+    """
+
+    def __init__(self, renderers: list[Renderer], email_stream: io.StringIO | None = None):
+        self.renderers = renderers
+        self.email_stream = email_stream
+        self.finished = False
+
+    def get_email_body(self) -> str:
+        return self.email_stream.getvalue() if self.email_stream else ""
+
+    def start(self, title: str):
+        for renderer in self.renderers:
+            renderer.start(title)
+
+    @contextmanager
+    def section(self, section: Section):
+        """
+        Yields function adding rows (repo, values, record) to the section
+        """
+        started = False
+
+        def add_row(repo: str, values: tuple, record: dict):
+            nonlocal started
+            for renderer in self.renderers:
+                if not started:
+                    renderer.start_section(section)
+                renderer.add_row(section, repo, values, record)
+            started = True
+
+        yield add_row
+        if started:
+            for renderer in self.renderers:
+                renderer.end_section(section)
+
+    def finish(self):
+        for renderer in self.renderers:
+            renderer.finish()
+        self.finished = True
+
+
+@contextmanager
+def open_output(path: str) -> Iterator[TextIO]:
+    """
+    Opens report output. The file is written next to the target and replaces it only when the report is complete,
+    '-' streams the report to the standard output.
+    """
+    if path == "-":
+        yield sys.stdout
+        return
+    full_path = Path(os.path.abspath(path))
+    tmp_path = full_path.with_name(f".{full_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w") as stream:
+            yield stream
+        tmp_path.replace(full_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    logger.warning(f"The auto-merge results were stored to {full_path}")
+
+
+@contextmanager
+def open_report(outputs: list[tuple[str, str]] = (), email: bool = False) -> Iterator[Report]:
+    """
+    Function creates report rendered to the console, to all outputs and to the email body.
+    Output files are replaced only by a finished report, a check failing before it finishes keeps them.
+    :param outputs: list of (path, format) tuples, format is guessed from the suffix when empty
+    :param email: bool, render the report to HTML for email as well, see Report.get_email_body
+    :return: Report
+    """
+    try:
+        with ExitStack() as stack:
+            renderers: list[Renderer] = [LogRenderer()]
+            for path, output_format in outputs:
+                renderers.append(RENDERERS[get_format(path, output_format)](stack.enter_context(open_output(path))))
+            email_stream = io.StringIO() if email else None
+            if email_stream:
+                renderers.append(HtmlRenderer(email_stream))
+            report = Report(renderers, email_stream=email_stream)
+            yield report
+            if not report.finished:
+                raise AutoMergerReportIncomplete()
+    except AutoMergerReportIncomplete:
+        logger.info("The report was not finished, outputs are kept unchanged.")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import logging
+
+from typing import Iterator
+
+from auto_merger.named_tuples import PullRequestRecord
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_record(repo: str, pull_request: dict) -> PullRequestRecord:
+    """
+    Function converts pull request dictionary, as stored in results or JSON output, to a record
+    """
+    return PullRequestRecord(
+        repo=repo,
+        number=int(pull_request["number"]),
+        title=pull_request.get("title", ""),
+        labels=pull_request.get("labels"),
+        approvals=pull_request.get("approvals"),
+        target_url=pull_request.get("target_url"),
+    )
+
+
+def record_to_dict(record: PullRequestRecord) -> dict:
+    """
+    Function returns the record as pull request dictionary of the JSON output, without unset fields
+    """
+    return {key: value for key, value in record._asdict().items() if key != "repo" and value is not None}
+
+
+def load_results(results: dict, blocked: "ResultStore", mergeable: "ResultStore") -> list[dict]:
+    """
+    Function loads JSON output of a checker into the result stores
+    :param results: dictionary with 'blocked' pull requests per repository, 'mergeable', 'changes_since_last_run'
+                    and 'merge_results' of 'auto-merger run', which are skipped
+    :return: changes since the last run
+    """
+    for repo, pull_requests in results.get("blocked", {}).items():
+        blocked.replace_repo(repo, [get_record(repo, pull_request) for pull_request in pull_requests])
+    for pull_request in results.get("mergeable", []):
+        mergeable.upsert(get_record(pull_request["repo"], pull_request))
+    return list(results.get("changes_since_last_run", []))
+
+
+class ResultStore:
+    """
+    Pull requests of one kind (blocked, mergeable) keyed by (repo, number).
+    Insert, update and removal are O(1). Repositories keep the order they were added in,
+    pull requests of a repository keep the order they were first inserted in.
+    """
+
+    def __init__(self, repos: list[str] | tuple = ()):
+        self.repos: dict[str, dict[int, PullRequestRecord]] = {repo: {} for repo in repos}
+
+    def __contains__(self, key: tuple) -> bool:
+        repo, number = key
+        return int(number) in self.repos.get(repo, {})
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self.repos.values())
+
+    def add_repo(self, repo: str):
+        self.repos.setdefault(repo, {})
+
+    def upsert(self, record: PullRequestRecord) -> bool:
+        """
+        Function inserts the record or replaces the stored one with the same (repo, number)
+        :return: True when the pull request was not stored yet
+        """
+        records = self.repos.setdefault(record.repo, {})
+        is_new = record.number not in records
+        records[record.number] = record
+        return is_new
+
+    def remove(self, repo: str, number: int) -> PullRequestRecord | None:
+        return self.repos.get(repo, {}).pop(int(number), None)
+
+    def get(self, repo: str, number: int) -> PullRequestRecord | None:
+        return self.repos.get(repo, {}).get(int(number))
+
+    def replace_repo(self, repo: str, records: list[PullRequestRecord]):
+        self.repos[repo] = {record.number: record for record in records}
+
+    def get_records(self, repo: str) -> list[PullRequestRecord]:
+        return list(self.repos.get(repo, {}).values())
+
+    def items(self) -> Iterator[tuple[str, list[PullRequestRecord]]]:
+        """
+        Yields repositories with at least one pull request, together with their records
+        """
+        for repo, records in self.repos.items():
+            if records:
+                yield repo, list(records.values())
+
+    def to_dict(self) -> dict:
+        """
+        Function returns all repositories with lists of pull request dictionaries, used by the JSON output
+        """
+        return {repo: [record_to_dict(record) for record in records.values()] for repo, records in self.repos.items()}
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.gitlab_checker import GitLabStatusChecker
+from auto_merger.metrics import Metrics
+from auto_merger.timing import Timings
+
+
+logger = logging.getLogger(__name__)
+
+GITHUB_EVENTS = ("pull_request", "pull_request_review", "label")
+GITLAB_EVENTS = ("Merge Request Hook",)
+# Task re-evaluating all repositories, queued by the timer and on start
+RECONCILE = ("reconcile",)
+
+
+class WebhookServer(ThreadingHTTPServer):
+    """
+    Long-running service keeping configuration, clients and results in memory.
+    Webhooks only queue re-evaluation of the affected pull request,
+    all evaluations are done by one worker thread in the order they arrived.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        config: Config,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        reconcile_interval: int = 3600,
+        jobs: int = 1,
+    ):
+        self.config = config
+        self.reconcile_interval = reconcile_interval
+        self.github_secret = os.getenv("GITHUB_WEBHOOK_SECRET", "")
+        self.gitlab_token = os.getenv("GITLAB_WEBHOOK_TOKEN", "")
+        # Both checkers feed the same metrics, exported on /metrics
+        self.metrics = Metrics()
+        self.github_checker = None
+        if self.config.github and "repos" in self.config.github:
+            self.github_checker = GitHubStatusChecker(
+                config=config, json_output_file=None, jobs=jobs, metrics=self.metrics
+            )
+        self.gitlab_checker = None
+        if self.config.gitlab and "repos" in self.config.gitlab:
+            self.gitlab_checker = GitLabStatusChecker(
+                config=config, json_output_file=None, jobs=jobs, metrics=self.metrics
+            )
+        self.tasks: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.threads: list[threading.Thread] = []
+        super().__init__((host, port), WebhookHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    def get_gitlab_projects(self) -> list[str]:
+        namespace = self.gitlab_checker.namespace
+        return [
+            project if not namespace else f"{namespace}/{project}" for project in self.config.gitlab.get("repos", [])
+        ]
+
+    def queue_github_event(self, event: str, payload: dict) -> bool:
+        """
+        Function queues re-evaluation of the pull request the GitHub event is about
+        :return: True in case the event concerns a configured repository
+        """
+        if not self.github_checker or event not in GITHUB_EVENTS:
+            return False
+        repository = payload.get("repository") or {}
+        pull_request = payload.get("pull_request") or {}
+        owner = (repository.get("owner") or {}).get("login")
+        repo = repository.get("name")
+        if owner != self.github_checker.namespace or repo not in self.config.github["repos"]:
+            logger.debug(f"Ignoring {event} event of {owner}/{repo}")
+            return False
+        if "number" not in pull_request:
+            # Changes of a label definition do not say which pull requests are affected
+            self.tasks.put(("github-repo", repo))
+        else:
+            self.tasks.put(("github", repo, int(pull_request["number"])))
+        return True
+
+    def queue_gitlab_event(self, event: str, payload: dict) -> bool:
+        """
+        Function queues re-evaluation of the project the GitLab event is about
+        :return: True in case the event concerns a configured project
+        """
+        if not self.gitlab_checker or event not in GITLAB_EVENTS:
+            return False
+        project = (payload.get("project") or {}).get("path_with_namespace")
+        if project not in self.get_gitlab_projects():
+            logger.debug(f"Ignoring {event} event of {project}")
+            return False
+        self.tasks.put(("gitlab", project))
+        return True
+
+    def verify_github_signature(self, signature: str, body: bytes) -> bool:
+        if not self.github_secret:
+            return True
+        expected = "sha256=" + hmac.new(self.github_secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    def verify_gitlab_token(self, token: str) -> bool:
+        if not self.gitlab_token:
+            return True
+        return hmac.compare_digest(self.gitlab_token, token or "")
+
+    def reconcile(self):
+        """
+        Full check of all repositories, the safety net for lost webhooks
+        """
+        timings = Timings()
+        success = True
+        if self.github_checker:
+            logger.info("Reconciling all GitHub repositories")
+            success = self.github_checker.check_all_containers() and success
+            # The state store is closed by the full check, single pull requests are evaluated without it
+            self.github_checker.state_store = None
+        if self.gitlab_checker:
+            logger.info("Reconciling all GitLab projects")
+            success = self.gitlab_checker.check_all_containers() and success
+        self.metrics.set_run("serve", success, timings.get_wall_time())
+
+    def process(self, task: tuple):
+        kind = task[0]
+        if kind == RECONCILE[0]:
+            self.reconcile()
+        elif kind == "github":
+            self.github_checker.check_pull_request(task[1], task[2])
+        elif kind == "github-repo":
+            result = self.github_checker.check_container(task[1])
+            if result is not None:
+                self.github_checker.set_container_results(task[1], *result)
+        elif kind == "gitlab":
+            merge_requests = self.gitlab_checker.check_container(task[1])
+            if merge_requests is not None:
+                self.gitlab_checker.update_container(task[1], merge_requests)
+
+    def run_worker(self):
+        while not self.stopped.is_set():
+            try:
+                task = self.tasks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                with self.lock:
+                    self.process(task)
+            except Exception as ex:
+                # One failing evaluation must not stop the service
+                logger.exception(f"Processing of {task} failed. {ex}")
+            finally:
+                self.tasks.task_done()
+
+    def run_timer(self):
+        while not self.stopped.wait(self.reconcile_interval):
+            self.tasks.put(RECONCILE)
+
+    def get_status(self) -> dict:
+        with self.lock:
+            status: dict = {"queued": self.tasks.qsize()}
+            if self.github_checker:
+                status["github"] = {
+                    "blocked": self.github_checker.blocked.to_dict(),
+                    "to_merge": self.github_checker.mergeable.to_dict(),
+                }
+            if self.gitlab_checker:
+                status["gitlab"] = {"blocked": self.gitlab_checker.blocked.to_dict()}
+            return json.loads(json.dumps(status, default=str))
+
+    def start(self, reconcile: bool = True):
+        """
+        Starts the worker and the reconcile timer. The initial reconcile fills results of all repositories.
+        """
+        if reconcile:
+            self.tasks.put(RECONCILE)
+        for target in (self.run_worker, self.run_timer):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stopped.set()
+        for thread in self.threads:
+            thread.join()
+        if self.github_checker:
+            self.github_checker.clean_temporary_dir()
+        self.server_close()
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    server: WebhookServer
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # noqa: N802
+        if self.path == "/healthz":
+            self.send_json(200, {"status": "ok"})
+        elif self.path == "/status":
+            self.send_json(200, self.server.get_status())
+        elif self.path == "/metrics":
+            body = self.server.metrics.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_json(404, {"message": "Not found"})
+
+    def do_POST(self):  # noqa: N802
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/webhook/github":
+            if not self.server.verify_github_signature(self.headers.get("X-Hub-Signature-256"), body):
+                self.send_json(401, {"message": "Invalid signature"})
+                return
+            event = self.headers.get("X-GitHub-Event", "")
+            queue_event = self.server.queue_github_event
+        elif self.path == "/webhook/gitlab":
+            if not self.server.verify_gitlab_token(self.headers.get("X-Gitlab-Token")):
+                self.send_json(401, {"message": "Invalid token"})
+                return
+            event = self.headers.get("X-Gitlab-Event", "")
+            queue_event = self.server.queue_gitlab_event
+        else:
+            self.send_json(404, {"message": "Not found"})
+            return
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self.send_json(400, {"message": "Invalid JSON"})
+            return
+        # Webhooks are answered right away, the evaluation runs in the worker
+        self.send_json(202, {"queued": queue_event(event, payload)})
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
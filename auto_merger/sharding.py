@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import copy
+import hashlib
+import json
+import logging
+
+from pathlib import Path
+
+import click
+
+from auto_merger.config import Config
+from auto_merger.named_tuples import Shard
+from auto_merger.results import ResultStore, load_results
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    Parses shard 'K/N', K is numbered from 1 to N
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = Shard(int(index), int(count))
+    except ValueError:
+        raise ValueError(f"Shard '{value}' is not in format K/N.")
+    if not 1 <= shard.index <= shard.count:
+        raise ValueError(f"Shard index has to be from 1 to {shard.count}.")
+    return shard
+
+
+class ShardParamType(click.ParamType):
+    name = "K/N"
+
+    def convert(self, value, param, ctx):
+        if isinstance(value, Shard):
+            return value
+        try:
+            return parse_shard(value)
+        except ValueError as ve:
+            self.fail(str(ve), param, ctx)
+
+
+SHARD = ShardParamType()
+
+
+def get_shard_index(repo: str, count: int) -> int:
+    """
+    Returns shard of the repository numbered from 1. The hash does not depend on the Python process,
+    so all workers assign the repository to the same shard.
+    """
+    digest = hashlib.sha256(repo.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def filter_repos(repos: list[str], shard: Shard | None) -> list[str]:
+    if shard is None:
+        return list(repos)
+    return [repo for repo in repos if get_shard_index(repo, shard.count) == shard.index]
+
+
+def apply_shard(config: Config, section: str, shard: Shard | None) -> Config:
+    """
+    Returns copy of the configuration with repositories of the section limited to the shard
+    """
+    if shard is None or not getattr(config, section) or "repos" not in getattr(config, section):
+        return config
+    sharded = copy.copy(config)
+    repos = filter_repos(getattr(config, section)["repos"], shard)
+    setattr(sharded, section, dict(getattr(config, section), repos=repos))
+    logger.info(f"Shard {shard.index}/{shard.count} checks {len(repos)} repositories.")
+    return sharded
+
+
+def combine_results(paths: list[Path | str], blocked: ResultStore, mergeable: ResultStore) -> list[dict] | None:
+    """
+    Function loads JSON outputs of all shards into the result stores
+    :param paths: JSON outputs of the shards
+    :return: changes since the last run of all shards, None in case some output could not be read
+    """
+    changes: list[dict] = []
+    for path in paths:
+        try:
+            results = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as ex:
+            logger.error(f"Cannot read results of shard {path}. {ex}")
+            return None
+        if not isinstance(results, dict):
+            logger.error(f"Results of shard {path} are not a JSON object.")
+            return None
+        changes.extend(load_results(results, blocked, mergeable))
+    return sorted(changes, key=lambda change: (change["repo"], change["number"]))
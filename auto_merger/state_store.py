@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+
+from pathlib import Path
+
+from auto_merger.named_tuples import PullRequestState
+
+
+logger = logging.getLogger(__name__)
+
+VERDICT_BLOCKED = "blocked"
+VERDICT_MERGEABLE = "mergeable"
+VERDICT_WAITING = "waiting"
+# Pull request was closed, merged, converted to draft or has changes requested since the last run
+VERDICT_DROPPED = "dropped"
+
+
+def get_fingerprint(*args) -> str:
+    """
+    Returns hash of the configuration the verdict was computed with.
+    Verdicts computed with a different configuration are never reused.
+    """
+    return hashlib.sha256(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+class StateStore:
+    """
+    SQLite store of the last verdict of every pull request.
+    A pull request with the same 'updatedAt' and configuration fingerprint reuses its verdict,
+    changed verdicts are collected as changes since the last run.
+    """
+
+    def __init__(self, path: Path | str, scope: str, fingerprint: str = ""):
+        self.path = Path(path).expanduser()
+        self.scope = scope
+        self.fingerprint = fingerprint
+        self.changes: list[dict] = []
+        self.seen: set = set()
+        self.lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pull_requests ("
+            "scope TEXT, repo TEXT, number INTEGER, title TEXT, updated_at TEXT, fingerprint TEXT, "
+            "verdict TEXT, result TEXT, PRIMARY KEY (scope, repo, number))"
+        )
+        self.connection.commit()
+
+    def get(self, repo: str, number: int) -> PullRequestState | None:
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT repo, number, title, updated_at, fingerprint, verdict, result FROM pull_requests "
+                "WHERE scope = ? AND repo = ? AND number = ?",
+                (self.scope, repo, int(number)),
+            ).fetchone()
+        if row is None:
+            return None
+        return PullRequestState(*row[:-1], json.loads(row[-1]) if row[-1] else None)
+
+    def get_verdict(self, repo: str, pull_request: dict) -> PullRequestState | None:
+        """
+        Function returns stored state in case the pull request did not change since the last run
+        :param repo: repository name
+        :param pull_request: pull request dictionary with 'number' and 'updatedAt'
+        :return: PullRequestState or None in case the pull request has to be evaluated
+        """
+        self.seen.add((repo, int(pull_request["number"])))
+        updated_at = pull_request.get("updatedAt")
+        if not updated_at:
+            return None
+        state = self.get(repo, pull_request["number"])
+        if state is None or state.updated_at != updated_at or state.fingerprint != self.fingerprint:
+            return None
+        logger.debug(f"Reusing verdict '{state.verdict}' of {repo}#{state.number}")
+        return state
+
+    def record(self, repo: str, pull_request: dict, verdict: str, result: dict | None = None):
+        """
+        Stores freshly computed verdict and remembers a change against the previous one
+        """
+        number = int(pull_request["number"])
+        self.seen.add((repo, number))
+        previous = self.get(repo, number)
+        if previous is None or previous.verdict != verdict:
+            self.add_change(
+                repo, number, pull_request.get("title", ""), previous.verdict if previous else None, verdict
+            )
+        with self.lock:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO pull_requests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.scope,
+                    repo,
+                    number,
+                    pull_request.get("title", ""),
+                    pull_request.get("updatedAt"),
+                    self.fingerprint,
+                    verdict,
+                    json.dumps(result) if result is not None else None,
+                ),
+            )
+            self.connection.commit()
+
+    def add_change(self, repo: str, number: int, title: str, previous: str | None, verdict: str):
+        with self.lock:
+            self.changes.append(
+                {"repo": repo, "number": number, "title": title, "previous": previous, "verdict": verdict}
+            )
+
+    def close_missing(self, repos: list[str]):
+        """
+        Pull requests of the checked repositories that were not seen in this run are dropped from the store
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT repo, number, title, verdict FROM pull_requests WHERE scope = ?", (self.scope,)
+            ).fetchall()
+        for repo, number, title, verdict in rows:
+            if repo not in repos or (repo, number) in self.seen:
+                continue
+            self.add_change(repo, number, title, verdict, VERDICT_DROPPED)
+            with self.lock:
+                self.connection.execute(
+                    "DELETE FROM pull_requests WHERE scope = ? AND repo = ? AND number = ?", (self.scope, repo, number)
+                )
+        with self.lock:
+            self.connection.commit()
+
+    def get_changes(self) -> list[dict]:
+        return sorted(self.changes, key=lambda change: (change["repo"], change["number"]))
+
+    def close(self):
+        self.connection.close()
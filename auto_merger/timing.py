@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import logging
+import threading
+import time
+
+from contextlib import contextmanager
+from pathlib import Path
+
+from auto_merger import utils
+from auto_merger.metrics import Metrics
+
+
+logger = logging.getLogger(__name__)
+
+
+class Timings:
+    """
+    Durations and call counts of run phases, per phase and repository.
+    Spans can be recorded from several threads at once.
+    """
+
+    def __init__(self, metrics: Metrics | None = None):
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        # (phase, repo) -> [calls, total duration, max duration]
+        self.spans: dict[tuple[str, str], list] = {}
+
+    @contextmanager
+    def span(self, phase: str, repo: str = ""):
+        """
+        Measures duration of the block, failed blocks are counted as well
+        :param phase: name of the phase, like 'pr list'
+        :param repo: repository the phase works on, empty for phases of the whole run
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if self.metrics:
+                self.metrics.phase_errors.inc(phase=phase)
+            raise
+        finally:
+            self.add(phase, repo, time.perf_counter() - start)
+
+    def add(self, phase: str, repo: str, duration: float):
+        with self.lock:
+            stats = self.spans.setdefault((phase, repo), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+        if self.metrics:
+            self.metrics.phase_duration.observe(duration, phase=phase)
+
+    def get_wall_time(self) -> float:
+        return time.perf_counter() - self.started
+
+    @staticmethod
+    def get_stats(stats: list) -> dict:
+        return {"calls": stats[0], "total": round(stats[1], 6), "max": round(stats[2], 6)}
+
+    def get_phases(self) -> dict:
+        phases: dict = {}
+        with self.lock:
+            for (phase, _), (calls, total, maximum) in self.spans.items():
+                stats = phases.setdefault(phase, [0, 0.0, 0.0])
+                stats[0] += calls
+                stats[1] += total
+                stats[2] = max(stats[2], maximum)
+        return {phase: self.get_stats(stats) for phase, stats in phases.items()}
+
+    def get_repos(self) -> dict:
+        repos: dict = {}
+        with self.lock:
+            for (phase, repo), stats in self.spans.items():
+                if repo:
+                    repos.setdefault(repo, {})[phase] = self.get_stats(stats)
+        return repos
+
+    def to_dict(self) -> dict:
+        return {
+            "wall_time": round(self.get_wall_time(), 6),
+            "phases": self.get_phases(),
+            "repos": self.get_repos(),
+        }
+
+    def print_summary(self, top: int = 5) -> list[str]:
+        """
+        Function logs table of phases sorted by total duration and the slowest repositories
+        :param top: how many of the slowest repositories are shown
+        :return: lines of the summary
+        """
+        phases = self.get_phases()
+        if not phases:
+            return []
+        lines = [
+            f"TIMING SUMMARY (wall time {self.get_wall_time():.2f}s)",
+            f"{'Phase':<24}{'Calls':>8}{'Total [s]':>12}{'Max [s]':>10}",
+        ]
+        for phase, stats in sorted(phases.items(), key=lambda item: item[1]["total"], reverse=True):
+            lines.append(f"{phase:<24}{stats['calls']:>8}{stats['total']:>12.3f}{stats['max']:>10.3f}")
+        repos = sorted(
+            (
+                (sum(stats["total"] for stats in repo_phases.values()), repo)
+                for repo, repo_phases in self.get_repos().items()
+            ),
+            reverse=True,
+        )
+        if repos:
+            lines.append(f"Slowest repositories (of {len(repos)})")
+            lines.extend(f"  {repo} {total:.3f}s" for total, repo in repos[:top])
+        logger.info("\n".join(lines))
+        return lines
+
+    def save(self, json_file_path: Path | str) -> Path:
+        """
+        Function stores the summary next to the json output, like 'results.timings.json' for 'results.json'
+        """
+        path = utils.return_full_path(json_file_path=str(json_file_path))
+        path = path.with_name(f"{path.stem}.timings.json")
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+        logger.debug(f"Timings saved to {path}")
+        return path
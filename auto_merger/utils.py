@@ -28,8 +28,10 @@ import os
 
 from pathlib import Path
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
 
-from auto_merger.config import Config
+from auto_merger.config import Config, GITHUB_BACKENDS, GITLAB_BACKENDS
 
 
 logger = logging.getLogger(__name__)
@@ -75,6 +77,35 @@ def run_command(
             raise cpe
 
 
+def iter_parallel(function: Callable, items: Iterable, jobs: int = 1) -> Iterator:
+    """
+    Run function for each item in a bounded thread pool.
+    Results are yielded in the same order as items, each as soon as it and all results before it are ready.
+    :param function: callable with one argument
+    :param items: items to process
+    :param jobs: int, maximum number of items processed at once
+    :return: iterator of function results
+    """
+    items = list(items)
+    if jobs <= 1 or len(items) <= 1:
+        yield from map(function, items)
+        return
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as executor:
+        yield from executor.map(function, items)
+
+
+def run_parallel(function: Callable, items: Iterable, jobs: int = 1) -> list:
+    """
+    Run function for each item in a bounded thread pool.
+    Results are returned in the same order as items, so merging them is deterministic.
+    :param function: callable with one argument
+    :param items: items to process
+    :param jobs: int, maximum number of items processed at once
+    :return: list of function results
+    """
+    return list(iter_parallel(function, items, jobs=jobs))
+
+
 def temporary_dir(prefix: str = "automerger") -> str:
     temp_file = tempfile.TemporaryDirectory(prefix=prefix)
     logger.debug(f"Temporary dir name: {temp_file.name}")
@@ -93,6 +124,9 @@ def check_mandatory_config_fields(config: Config) -> bool:
         if "repos" not in config.github:
             logger.error("In github section is missing 'repos'. No repositories are specified.")
             config_correct = False
+        if config.github.get("backend", "gh") not in GITHUB_BACKENDS:
+            logger.error(f"In github section is unknown 'backend'. Use one of {', '.join(GITHUB_BACKENDS)}.")
+            config_correct = False
     if config.gitlab:
         if "blocker_labels" not in config.gitlab:
             logger.error("In gitlab section is missing 'blocker_labels'")
@@ -103,6 +137,9 @@ def check_mandatory_config_fields(config: Config) -> bool:
         if "repos" not in config.gitlab:
             logger.error("In gitlab section is missing 'repos'. No repositories are specified.")
             config_correct = False
+        if config.gitlab.get("backend", "python-gitlab") not in GITLAB_BACKENDS:
+            logger.error(f"In gitlab section is unknown 'backend'. Use one of {', '.join(GITLAB_BACKENDS)}.")
+            config_correct = False
     return config_correct
 
 
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import json
+import re
+import threading
+import time
+
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from benchmarks.synthetic import SyntheticOrg
+
+
+REPOSITORY_RE = re.compile(r'(?:(r\d+): )?repository\(owner: "(?P<owner>[^"]+)", name: "(?P<name>[^"]+)"\)')
+PAGE_RE = re.compile(r'pullRequests\(states: OPEN, first: (?P<first>\d+)(?:, after: "(?P<after>\d+)")?\)')
+PULL_REQUEST_RE = re.compile(r"pullRequest\(number: (?P<number>\d+)\)")
+
+
+def resolve_graphql(org: SyntheticOrg, query: str) -> dict:
+    """
+    Function answers the GraphQL queries sent by auto-merger from the synthetic organization
+    """
+    data: dict = {}
+    matches = list(REPOSITORY_RE.finditer(query))
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(query)
+        start = match.end()
+        part = query[start:end]
+        alias = match.group(1) or "repository"
+        repo = match.group("name")
+        if match.group("owner") != org.namespace or org.get_repo_index(repo) is None:
+            data[alias] = None
+            continue
+        pull_requests = [dict(pr, state="OPEN") for pr in org.get_pull_requests(repo)]
+        single = PULL_REQUEST_RE.search(part)
+        if single:
+            number = int(single.group("number"))
+            nodes = [convert_node(pr) for pr in pull_requests if pr["number"] == number]
+            data[alias] = {"pullRequest": nodes[0] if nodes else None}
+            continue
+        page = PAGE_RE.search(part)
+        first = int(page.group("first"))
+        after = int(page.group("after") or 0)
+        end_cursor = after + first
+        data[alias] = {
+            "name": repo,
+            "pullRequests": {
+                "pageInfo": {"hasNextPage": end_cursor < len(pull_requests), "endCursor": str(end_cursor)},
+                "nodes": [convert_node(pr) for pr in pull_requests[after:end_cursor]],
+            },
+        }
+    return {"data": data}
+
+
+def convert_node(pull_request: dict) -> dict:
+    return dict(
+        pull_request,
+        labels={"nodes": pull_request["labels"]},
+        reviewDecision=None,
+        latestOpinionatedReviews={"nodes": pull_request["reviews"]},
+    )
+
+
+class FakeServer(ThreadingHTTPServer):
+    """
+    Local HTTP server answering from the synthetic organization.
+    Every request waits 'latency' seconds and is counted by its route.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, org: SyntheticOrg, handler):
+        self.org = org
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+        super().__init__(("127.0.0.1", 0), handler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, route: str):
+        with self.lock:
+            self.calls[route] += 1
+
+    def start(self) -> "FakeServer":
+        threading.Thread(target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    not_found_message = "Not Found"
+    server: FakeServer
+
+    def send_json(self, status: int, data, headers: dict | None = None):
+        body = json.dumps(data).encode() if status != 304 else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if self.server.org.latency:
+            time.sleep(self.server.org.latency)
+        url = urlparse(self.path)
+        self.route(self.command, url.path, {key: values[0] for key, values in parse_qs(url.query).items()}, body)
+
+    def route(self, method: str, path: str, query: dict, body: bytes):
+        """
+        Subclasses answer the endpoints they fake and fall back to this 404 response
+        """
+        self.server.count("not-found")
+        return self.send_json(404, {"message": self.not_found_message})
+
+    do_GET = do_POST = do_PUT = handle_request  # noqa: N815
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGitHubHandler(FakeHandler):
+    """
+    GitHub REST and GraphQL endpoints used by the 'api' backend
+    """
+
+    def route(self, method: str, path: str, query: dict, body: bytes):
+        org = self.server.org
+        parts = path.strip("/").split("/")
+        if path == "/user":
+            self.server.count("user")
+            return self.send_json(200, {"login": "bench"})
+        if method == "POST" and path == "/graphql":
+            self.server.count("graphql")
+            return self.send_json(200, resolve_graphql(org, json.loads(body)["query"]))
+        if len(parts) >= 3 and parts[0] == "repos" and org.get_repo_index(parts[2]) is not None:
+            repo = parts[2]
+            if len(parts) == 3:
+                self.server.count("repo")
+                return self.send_json(200, {"name": repo})
+            if method == "GET" and parts[3:] == ["pulls"]:
+                self.server.count("pulls")
+                data = org.get_pull_requests(repo)
+                etag = '"' + hashlib.sha256(json.dumps(data).encode()).hexdigest()[:16] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self.send_json(304, None, {"ETag": etag})
+                return self.send_json(200, data, {"ETag": etag})
+            if method == "PUT" and parts[3] == "pulls" and parts[-1] == "merge":
+                self.server.count("merge")
+                return self.send_json(200, {"merged": True})
+        return super().route(method, path, query, body)
+
+
+class FakeGitLabHandler(FakeHandler):
+    """
+    GitLab REST endpoints used by the GitLab checker, both python-gitlab and async backends
+    """
+
+    not_found_message = "404 Not Found"
+
+    def send_page(self, items: list, query: dict):
+        per_page = int(query.get("per_page", 20))
+        page = int(query.get("page", 1))
+        total_pages = max((len(items) + per_page - 1) // per_page, 1)
+        start = (page - 1) * per_page
+        end = start + per_page
+        headers = {"X-Total-Pages": str(total_pages), "X-Total": str(len(items)), "X-Next-Page": ""}
+        if page < total_pages:
+            headers["X-Next-Page"] = str(page + 1)
+            next_query = "&".join(f"{key}={value}" for key, value in dict(query, page=page + 1).items())
+            headers["Link"] = f'<{self.server.url}{urlparse(self.path).path}?{next_query}>; rel="next"'
+        return self.send_json(200, items[start:end], headers)
+
+    def route(self, method: str, path: str, query: dict, body: bytes):
+        org = self.server.org
+        repos = org.get_repos()
+        parts = [unquote(part) for part in path.strip("/").split("/")]
+        if parts[:2] != ["api", "v4"]:
+            return self.send_json(404, {"message": "404 Not Found"})
+        parts = parts[2:]
+        if parts == ["user"]:
+            self.server.count("user")
+            return self.send_json(200, {"id": 1, "username": "bench"})
+        if len(parts) == 3 and parts[0] == "groups" and parts[2] == "projects" and parts[1] == org.namespace:
+            self.server.count("group-projects")
+            projects = [
+                {"id": index + 1, "path_with_namespace": f"{org.namespace}/{repo}"} for index, repo in enumerate(repos)
+            ]
+            return self.send_page(projects, query)
+        if len(parts) == 2 and parts[0] == "projects":
+            self.server.count("project")
+            namespace, _, repo = parts[1].rpartition("/")
+            if namespace == org.namespace and org.get_repo_index(repo) is not None:
+                return self.send_json(200, {"id": org.get_repo_index(repo) + 1})
+            if parts[1].isdigit() and int(parts[1]) <= len(repos):
+                return self.send_json(200, {"id": int(parts[1])})
+        if len(parts) == 3 and parts[0] == "projects" and parts[2] == "merge_requests" and parts[1].isdigit():
+            self.server.count("merge-requests")
+            if int(parts[1]) <= len(repos):
+                return self.send_page(org.get_merge_requests(repos[int(parts[1]) - 1]), query)
+        return super().route(method, path, query, body)
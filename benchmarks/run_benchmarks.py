@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+"""
+Benchmarks of auto-merger against a synthetic organization, runnable offline.
+
+    python -m benchmarks.run_benchmarks --repos 10,100,1000 --prs 5 --github-backend graphql
+
+Every run is a separate process with its own HOME, so caches of previous runs are not reused.
+Reported are wall time, API calls (gh invocations and HTTP requests) and peak RSS of the process.
+"""
+
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+import click
+
+from benchmarks.fake_servers import FakeGitHubHandler, FakeGitLabHandler, FakeServer
+from benchmarks.synthetic import SyntheticOrg
+
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCHMARKS_DIR.parent
+TARGETS = ("github-checker", "merger", "gitlab-checker")
+
+
+def get_config(target: str, org: SyntheticOrg, home: Path, github_url: str, gitlab_url: str, backends: dict) -> dict:
+    labels = {"blocker_labels": [org.blocker_label], "approval_labels": [org.approval_label]}
+    if target == "gitlab-checker":
+        return {
+            "gitlab": dict(
+                labels,
+                url=gitlab_url,
+                namespace=org.namespace,
+                repos=org.get_repos(),
+                backend=backends["gitlab"],
+                cache_dir=str(home / "cache"),
+            )
+        }
+    return {
+        "github": dict(
+            labels,
+            namespace=org.namespace,
+            repos=org.get_repos(),
+            approvals=2,
+            pr_lifetime=1,
+            backend=backends["github"],
+            api_url=github_url,
+            cache_dir=str(home / "cache"),
+        )
+    }
+
+
+def run_benchmark(
+    target: str,
+    org: SyntheticOrg,
+    jobs: int = 4,
+    mode: str = "api",
+    github_backend: str = "gh",
+    gitlab_backend: str = "python-gitlab",
+    verbose: bool = False,
+) -> dict:
+    """
+    Function runs one target in a separate process against fake servers
+    :param target: one of TARGETS
+    :param org: synthetic organization
+    :param jobs: value of --jobs
+    :param mode: 'api' calls the api.* entry point, 'cli' runs the whole auto-merger script
+    :return: dictionary with the measured values
+    """
+    github_server = FakeServer(org, FakeGitHubHandler).start()
+    gitlab_server = FakeServer(org, FakeGitLabHandler).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="auto-merger-bench") as tmp:
+            home = Path(tmp)
+            config = get_config(
+                target,
+                org,
+                home,
+                github_server.url,
+                gitlab_server.url,
+                {"github": github_backend, "gitlab": gitlab_backend},
+            )
+            # JSON is valid YAML
+            (home / ".auto-merger.yaml").write_text(json.dumps(config))
+            gh_log = home / "gh.log"
+            env = dict(
+                os.environ,
+                HOME=str(home),
+                PATH=f"{BENCHMARKS_DIR / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}",
+                PYTHONPATH=str(ROOT_DIR),
+                FAKE_GH_SPEC=org.to_json(),
+                FAKE_GH_LOG=str(gh_log),
+                GH_TOKEN="bench",
+                GITLAB_TOKEN="bench",
+            )
+            if mode == "cli":
+                cmd = [sys.executable, str(ROOT_DIR / "auto-merger"), target, "--jobs", str(jobs)]
+            else:
+                cmd = [sys.executable, "-m", "benchmarks.run_benchmarks", "entry", target, str(jobs)]
+            output = None if verbose else subprocess.DEVNULL
+            start = time.perf_counter()
+            process = subprocess.Popen(cmd, env=env, cwd=tmp, stdout=output, stderr=output)
+            # wait4 returns resource usage of this process only, not of all children run so far
+            _, status, rusage = os.wait4(process.pid, 0)
+            wall_time = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            gh_calls = gh_log.read_text().splitlines() if gh_log.exists() else []
+    finally:
+        github_server.stop()
+        gitlab_server.stop()
+    calls = {f"gh {command}": gh_calls.count(command) for command in sorted(set(gh_calls))}
+    calls.update({f"github {route}": count for route, count in github_server.calls.items()})
+    calls.update({f"gitlab {route}": count for route, count in gitlab_server.calls.items()})
+    return {
+        "target": target,
+        "mode": mode,
+        "backend": gitlab_backend if target == "gitlab-checker" else github_backend,
+        "repos": org.repos,
+        "prs": org.prs,
+        "jobs": jobs,
+        "latency": org.latency,
+        "exit_code": process.returncode,
+        "wall_time": round(wall_time, 3),
+        "api_calls": sum(calls.values()),
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": round(rusage.ru_maxrss / 1024, 1),
+        "calls": calls,
+    }
+
+
+def print_results(results: list[dict]):
+    header = f"{'target':<16}{'mode':<6}{'backend':<15}{'repos':>7}{'prs':>6}{'jobs':>6}"
+    header += f"{'wall [s]':>10}{'API calls':>11}{'RSS [MB]':>10}{'exit':>6}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['target']:<16}{result['mode']:<6}{result['backend']:<15}{result['repos']:>7}{result['prs']:>6}"
+            f"{result['jobs']:>6}{result['wall_time']:>10.2f}{result['api_calls']:>11}"
+            f"{result['peak_rss_mb']:>10.1f}{result['exit_code']:>6}"
+        )
+
+
+@click.group("benchmarks", invoke_without_command=True)
+@click.option("--target", "targets", multiple=True, type=click.Choice(TARGETS), help="Default is all targets.")
+@click.option("--repos", default="10,100,1000", show_default=True, help="Comma separated numbers of repositories.")
+@click.option("--prs", type=int, default=5, show_default=True, help="Opened pull requests in each repository.")
+@click.option("--latency", type=float, default=0.0, show_default=True, help="Seconds every fake API call takes.")
+@click.option("--jobs", "-j", type=int, default=4, show_default=True, help="Value of --jobs of auto-merger.")
+@click.option("--mode", type=click.Choice(["api", "cli"]), default="api", show_default=True)
+@click.option("--github-backend", type=click.Choice(["gh", "graphql", "api"]), default="gh", show_default=True)
+@click.option("--gitlab-backend", type=click.Choice(["python-gitlab", "async"]), default="python-gitlab")
+@click.option("--output", type=click.Path(dir_okay=False), help="Save results in json format.")
+@click.option("--verbose", is_flag=True, default=False, help="Show output of auto-merger.")
+@click.pass_context
+def benchmarks(ctx, targets, repos, prs, latency, jobs, mode, github_backend, gitlab_backend, output, verbose):
+    if ctx.invoked_subcommand:
+        return
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = []
+    for target in targets or TARGETS:
+        for repo_count in [int(count) for count in repos.split(",")]:
+            org = SyntheticOrg(repos=repo_count, prs=prs, latency=latency)
+            results.append(
+                run_benchmark(
+                    target,
+                    org,
+                    jobs=jobs,
+                    mode=mode,
+                    github_backend=github_backend,
+                    gitlab_backend=gitlab_backend,
+                    verbose=verbose,
+                )
+            )
+            logger.info(f"{target} with {repo_count} repositories took {results[-1]['wall_time']}s")
+    print_results(results)
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2))
+
+
+@benchmarks.command("entry", hidden=True)
+@click.argument("target", type=click.Choice(TARGETS))
+@click.argument("jobs", type=int)
+def entry(target, jobs):
+    """
+    Runs the api.* entry point of the target in this process, used by 'api' mode
+    """
+    from auto_merger import api
+    from auto_merger.config import Config
+
+    config = Config.get_default_config()
+    if target == "github-checker":
+        ret_value = api.pull_request_checker(config=config, send_email=None, json_output=None, jobs=jobs)
+    elif target == "merger":
+        ret_value = api.merger(config=config, send_email=None, jobs=jobs)
+    else:
+        ret_value = api.merge_request_checker(config=config, send_email=None, json_output=None, jobs=jobs)
+    # Some entry points return True/False instead of an exit code
+    if isinstance(ret_value, bool):
+        ret_value = int(not ret_value)
+    sys.exit(ret_value or 0)
+
+
+if __name__ == "__main__":
+    benchmarks()
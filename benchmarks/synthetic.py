@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+# MIT License
+#
+# Copyright (c) 2025 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import random
+
+
+class SyntheticOrg:
+    """
+    Deterministic organization with 'repos' repositories and 'prs' opened pull requests in each.
+    The same specification always generates the same pull requests, so runs are comparable.
+    """
+
+    def __init__(
+        self,
+        namespace: str = "bench",
+        repos: int = 10,
+        prs: int = 5,
+        blocker_label: str = "pr/missing-review",
+        approval_label: str = "READY-to-MERGE",
+        blocked_ratio: float = 0.25,
+        approved_ratio: float = 0.5,
+        draft_ratio: float = 0.1,
+        latency: float = 0.0,
+        seed: int = 0,
+    ):
+        self.namespace = namespace
+        self.repos = repos
+        self.prs = prs
+        self.blocker_label = blocker_label
+        self.approval_label = approval_label
+        self.blocked_ratio = blocked_ratio
+        self.approved_ratio = approved_ratio
+        self.draft_ratio = draft_ratio
+        self.latency = latency
+        self.seed = seed
+
+    def to_json(self) -> str:
+        return json.dumps(self.__dict__)
+
+    @classmethod
+    def from_json(cls, data: str) -> "SyntheticOrg":
+        return cls(**json.loads(data))
+
+    def get_repos(self) -> list[str]:
+        return [f"repo-{index:04d}" for index in range(self.repos)]
+
+    def get_repo_index(self, repo: str) -> int | None:
+        if not repo.startswith("repo-") or not repo[5:].isdigit() or int(repo[5:]) >= self.repos:
+            return None
+        return int(repo[5:])
+
+    def get_pull_requests(self, repo: str) -> list[dict]:
+        """
+        Function returns pull requests of the repository in the 'gh pr list --json' format
+        """
+        rng = random.Random(f"{self.seed}-{repo}")
+        pull_requests = []
+        for number in range(1, self.prs + 1):
+            labels = [{"name": "dependencies"}]
+            reviews = [{"state": "COMMENTED", "author": {"login": "bot"}}]
+            if rng.random() < self.blocked_ratio:
+                labels.append({"name": self.blocker_label})
+            elif rng.random() < self.approved_ratio:
+                labels.append({"name": self.approval_label})
+                reviews.extend({"state": "APPROVED", "author": {"login": f"user{index}"}} for index in range(2))
+            pull_requests.append(
+                {
+                    "number": number,
+                    "title": f"Update dependency {number} of {repo}",
+                    "isDraft": rng.random() < self.draft_ratio,
+                    "createdAt": "2024-12-19T07:30:11Z",
+                    "updatedAt": f"2024-12-20T07:30:{number % 60:02d}Z",
+                    "labels": labels,
+                    "reviews": reviews,
+                }
+            )
+        return pull_requests
+
+    def get_merge_requests(self, repo: str) -> list[dict]:
+        """
+        Function returns merge requests of the project in the GitLab REST format
+        """
+        return [
+            {
+                "id": index * 100000 + pr["number"],
+                "iid": pr["number"],
+                "title": pr["title"],
+                "description": "Synthetic merge request\n" * 20,
+                "state": "opened",
+                "draft": pr["isDraft"],
+                "target_branch": "main",
+                "author": {"username": "bot"},
+                "reviewers": [],
+                "labels": [label["name"] for label in pr["labels"]],
+                "merge_status": "can_be_merged",
+                "detailed_merge_status": "mergeable",
+                "web_url": f"https://gitlab.example.com/{self.namespace}/{repo}/-/merge_requests/{pr['number']}",
+            }
+            for index, pr in [(self.get_repo_index(repo) or 0, pr) for pr in self.get_pull_requests(repo)]
+        ]
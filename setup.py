@@ -47,7 +47,7 @@ setup(
     long_description_content_type="text/markdown",
     version="0.1.0",
     keywords="tool,containers,images,tests",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks"]),
     url="https://github.com/sclorg/auto-merger",
     license="MIT",
     author="Petr Hracek",
@@ -22,6 +22,11 @@
 
 import pytest
 import json
+import threading
+
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import StreamRequestHandler, ThreadingTCPServer
 
 from auto_merger.named_tuples import ProjectMR
 
@@ -145,6 +150,42 @@ def default_config_merger():
     }
 
 
+def get_pull_request(
+    number: int,
+    labels: list | tuple = (),
+    reviews: list | tuple = (),
+    created_at: str = "2024-12-19T07:30:11Z",
+    updated_at: str = "2024-12-19T07:30:11Z",
+) -> dict:
+    """
+    Pull request as listed by 'gh pr list', every review state is given by another reviewer
+    """
+    return {
+        "number": number,
+        "title": f"Pull request {number}",
+        "isDraft": False,
+        "createdAt": created_at,
+        "updatedAt": updated_at,
+        "labels": [{"name": label} for label in labels],
+        "reviews": [{"state": state, "author": {"login": f"user{index}"}} for index, state in enumerate(reviews)],
+    }
+
+
+def graphql_pull_request(number: int, labels: list | tuple = (), reviews: list | tuple = ()) -> dict:
+    """
+    The same pull request as a node of the GitHub GraphQL API
+    """
+    pull_request = get_pull_request(number, labels, reviews)
+    return {
+        "number": number,
+        "title": pull_request["title"],
+        "isDraft": pull_request["isDraft"],
+        "createdAt": pull_request["createdAt"],
+        "labels": {"nodes": pull_request["labels"]},
+        "latestOpinionatedReviews": {"nodes": pull_request["reviews"]},
+    }
+
+
 def no_gitlab_repos_config():
     return {
         "github": {
@@ -181,3 +222,134 @@ def merge_requests_psql_13():
             detailed_merge_status="mergeable",
         )
     ]
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """
+    Local HTTP server answering from 'routes' {(method, path): (status, json_body[, headers])}.
+    The route can be also a callable receiving the handler and request body.
+    Every request is recorded as (method, path, headers, body, client_port).
+    """
+
+    def __init__(self):
+        self.routes: dict = {}
+        self.requests: list = []
+        super().__init__(("127.0.0.1", 0), StubHandler)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def handle_request(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        self.server.requests.append((self.command, self.path, dict(self.headers), body, self.client_address[1]))
+        route = self.server.routes.get((self.command, self.path))
+        if callable(route):
+            route = route(self, body)
+        status, response_body, *headers = route or (404, {"message": "Not Found"})
+        data = json.dumps(response_body).encode() if status != 304 else b""
+        self.send_response(status)
+        for name, value in (headers[0] if headers else {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = handle_request  # noqa: N815
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RoutesByPath(dict):
+    """
+    Routes of the stub server matched by the path without the query
+    """
+
+    def get(self, key, default=None):
+        method, path = key
+        return super().get(path.split("?")[0], default)
+
+
+@pytest.fixture()
+def stub_server():
+    server = StubHTTPServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class StubSMTPServer(ThreadingTCPServer):
+    """
+    Local SMTP sink. Every message is recorded as (client_port, sender, recipients, email.message.Message).
+    With 'greet' False the server accepts connections but never answers.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        self.messages: list = []
+        self.connections = 0
+        self.greet = True
+        super().__init__(("127.0.0.1", 0), StubSMTPHandler)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+
+class StubSMTPHandler(StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        if not self.server.greet:
+            self.rfile.readline()
+            return
+        self.reply("220 localhost ESMTP stub")
+        sender, recipients = "", []
+        for line in self.rfile:
+            command = line.decode().strip()
+            verb = command.split(" ")[0].upper()
+            if verb in ("EHLO", "HELO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip(" <>"), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                recipients.append(command.split(":", 1)[1].strip(" <>"))
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b""
+                for data_line in self.rfile:
+                    if data_line == b".\r\n":
+                        break
+                    data += data_line
+                message = message_from_bytes(data)
+                self.server.messages.append((self.client_address[1], sender, recipients, message))
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+@pytest.fixture()
+def smtp_server():
+    server = StubSMTPServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
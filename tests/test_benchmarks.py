@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from benchmarks.fake_servers import resolve_graphql
+from benchmarks.run_benchmarks import run_benchmark
+from benchmarks.synthetic import SyntheticOrg
+
+from auto_merger.github_graphql import GitHubGraphQL
+
+
+def test_fake_graphql_matches_synthetic_org():
+    org = SyntheticOrg(repos=3, prs=120)
+    graphql = GitHubGraphQL(namespace="bench", executor=lambda query: resolve_graphql(org, query), batch_size=2)
+    results = graphql.get_pull_requests(["repo-0000", "repo-0002", "repo-9999"])
+    assert results["repo-9999"] is None
+    assert [pr["number"] for pr in results["repo-0002"]] == list(range(1, 121))
+    assert results["repo-0000"][5]["labels"] == org.get_pull_requests("repo-0000")[5]["labels"]
+    assert graphql.get_pull_request("repo-0001", 7)["state"] == "OPEN"
+
+
+def test_run_benchmark_api_backend():
+    result = run_benchmark("merger", SyntheticOrg(repos=3, prs=4), jobs=2, github_backend="api")
+    assert result["exit_code"] == 0
+    assert result["calls"]["github graphql"] == 1
+    assert result["calls"]["github merge"] > 0
+    assert result["api_calls"] == sum(result["calls"].values())
+    assert result["peak_rss_mb"] > 0
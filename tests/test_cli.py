@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import subprocess
+import sys
+
+import click
+import pytest
+
+from click.testing import CliRunner
+
+from auto_merger.cli.lazy_group import LazyGroup
+
+from tests.spellbook import TESTS_DIR
+
+ENTRY_SCRIPT = TESTS_DIR.parent / "auto-merger"
+HELP_CODE = f"""
+import runpy
+sys.argv = ["auto-merger", "--help"]
+try:
+    runpy.run_path({str(ENTRY_SCRIPT)!r}, run_name="__main__")
+except SystemExit:
+    pass
+"""
+
+
+def get_imported_modules(code: str) -> set[str]:
+    """
+    Runs the code by a fresh python interpreter and returns names of all modules it imported
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys\n{code}\nprint('\\n'.join(sys.modules), file=sys.stderr)"],
+        cwd=TESTS_DIR.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stderr.splitlines())
+
+
+def test_help_does_not_import_backends():
+    modules = get_imported_modules(HELP_CODE)
+    # Subcommands are listed, their modules import the api module, but none of its backends
+    assert "auto_merger.api" in modules
+    for module in ("gitlab", "requests", "smtplib", "auto_merger.github_checker", "auto_merger.merger"):
+        assert module not in modules
+
+
+@pytest.mark.parametrize(
+    "module,forbidden",
+    (
+        ("auto_merger.github_checker", "gitlab"),
+        ("auto_merger.merger", "gitlab"),
+        ("auto_merger.gitlab_checker", "auto_merger.github_checker"),
+    ),
+)
+def test_backend_imports(module, forbidden):
+    modules = get_imported_modules(f"import {module}")
+    assert module in modules
+    assert forbidden not in modules
+
+
+def test_lazy_group():
+    @click.group("test", cls=LazyGroup, lazy_commands={"serve": "auto_merger.cli.serve:serve"})
+    def group():
+        pass
+
+    runner = CliRunner()
+    result = runner.invoke(group, ["--help"])
+    assert result.exit_code == 0
+    assert "serve" in result.output
+    result = runner.invoke(group, ["serve", "--help"])
+    assert result.exit_code == 0
+    assert "--reconcile-interval" in result.output
+    assert runner.invoke(group, ["unknown"]).exit_code == 2
@@ -34,13 +34,11 @@ def test_get_gh_pr_correct_repo(get_repo_name):
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_repo_name)
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    assert auto_merger.is_correct_repo()
+    assert auto_merger.is_correct_repo("s2i-nodejs-container")
 
 
 def test_get_gh_pr_wrong_repo(get_repo_wrong_name):
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_repo_wrong_name)
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    assert not auto_merger.is_correct_repo()
+    assert not auto_merger.is_correct_repo("s2i-nodejs-container")
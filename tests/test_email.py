@@ -22,7 +22,8 @@
 # SOFTWARE.
 
 
-from auto_merger.email import EmailSender
+from auto_merger.config import Config
+from auto_merger.email import EmailSender, Mailer
 
 
 def test_create_email_no_recepients():
@@ -43,3 +44,41 @@ def test_create_email_with_recipients():
     assert "sclorg@redhat.com" not in es.mime_msg["To"]
     assert "foo@bar.com" in es.mime_msg["To"]
     assert es.mime_msg["Subject"] == "something important"
+
+
+def test_mailer_sends_digest_over_one_connection(smtp_server):
+    with Mailer(port=smtp_server.port, timeout=5) as mailer:
+        EmailSender(recipient_email=["foo@bar.com"]).send_email("Pull requests", ["<p>github</p>"], mailer=mailer)
+        EmailSender(recipient_email=["foo@bar.com"]).send_email("Merge requests", ["<p>gitlab</p>"], mailer=mailer)
+        EmailSender(recipient_email=["bar@foo.com"]).send_email("Merged", ["<p>merged</p>"], mailer=mailer)
+        assert not smtp_server.messages
+    assert mailer.sent == 2
+    assert smtp_server.connections == 1
+    assert [(sender, recipients) for _, sender, recipients, _ in smtp_server.messages] == [
+        ("phracek@redhat.com", ["foo@bar.com"]),
+        ("phracek@redhat.com", ["bar@foo.com"]),
+    ]
+    digest = smtp_server.messages[0][3]
+    assert digest["Subject"] == "auto-merger digest: Pull requests, Merge requests"
+    body = digest.get_payload()[0].get_payload()
+    assert "<h2>Pull requests</h2><p>github</p><h2>Merge requests</h2><p>gitlab</p>" in body
+    assert smtp_server.messages[1][3]["Subject"] == "Merged"
+
+
+def test_mailer_from_config(smtp_server):
+    config = Config.get_from_dict({"email": {"smtp_port": smtp_server.port, "from": "bot@bar.com"}})
+    with Mailer.from_config(config) as mailer:
+        mailer.add(["foo@bar.com", "foo@bar.com"], "Pull requests", "body")
+    assert [(sender, recipients) for _, sender, recipients, _ in smtp_server.messages] == [
+        ("bot@bar.com", ["foo@bar.com"])
+    ]
+
+
+def test_mailer_timeout(smtp_server):
+    smtp_server.greet = False
+    mailer = Mailer(port=smtp_server.port, timeout=0.2)
+    mailer.add(["foo@bar.com"], "Pull requests", "body")
+    assert mailer.flush() == 1
+    assert not mailer.close(timeout=5)
+    assert mailer.failed == 1
+    assert not smtp_server.messages
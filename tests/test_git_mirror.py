@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import os
+import subprocess
+
+import pytest
+
+from auto_merger.git_mirror import GitMirrorCache
+
+
+def git(*args, cwd=None):
+    env = dict(
+        os.environ,
+        GIT_AUTHOR_NAME="auto-merger",
+        GIT_AUTHOR_EMAIL="auto-merger@example.com",
+        GIT_COMMITTER_NAME="auto-merger",
+        GIT_COMMITTER_EMAIL="auto-merger@example.com",
+    )
+    return subprocess.check_output(["git", *args], cwd=cwd, env=env, universal_newlines=True).strip()
+
+
+@pytest.fixture()
+def upstream(tmp_path):
+    path = tmp_path / "upstream"
+    path.mkdir()
+    git("init", "-q", "-b", "master", cwd=path)
+    git("config", "uploadpack.allowFilter", "true", cwd=path)
+    (path / "README.md").write_text("first\n")
+    git("add", "README.md", cwd=path)
+    git("commit", "-q", "-m", "first", cwd=path)
+    return path
+
+
+def test_mirror_fetches_only_new_commits(tmp_path, upstream):
+    cache = GitMirrorCache(directory=tmp_path / "mirrors")
+    url = f"file://{upstream}"
+    worktree = cache.add_worktree(url, tmp_path / "checkout" / "first")
+    assert (worktree / "README.md").read_text() == "first\n"
+    mirror = cache.get_mirror_path(url)
+    assert mirror.parent == tmp_path / "mirrors"
+
+    (upstream / "README.md").write_text("second\n")
+    git("commit", "-q", "-am", "second", cwd=upstream)
+    cache.remove_worktree(url, worktree)
+    assert not worktree.exists()
+    worktree = cache.add_worktree(url, tmp_path / "checkout" / "second")
+    assert (worktree / "README.md").read_text() == "second\n"
+    assert cache.get_mirror_path(url) == mirror
+    assert git("rev-parse", "HEAD", cwd=worktree) == git("rev-parse", "HEAD", cwd=upstream)
+
+
+def test_mirror_eviction(tmp_path, upstream):
+    cache = GitMirrorCache(directory=tmp_path / "mirrors", max_size=0)
+    first = cache.update(f"file://{upstream}")
+    second = cache.update(f"file://{upstream}/.git")
+    os.utime(first / "auto-merger-last-used", (0, 0))
+    cache.evict(keep=[f"file://{upstream}/.git"])
+    assert not first.exists()
+    assert second.exists()
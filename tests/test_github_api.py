@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+import pytest
+import requests
+
+from flexmock import flexmock
+
+from auto_merger import utils
+from auto_merger.config import Config
+from auto_merger.github_api import GitHubClient
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.http_cache import HttpCache
+from auto_merger.merger import AutoMerger
+
+from tests.conftest import default_config_merger
+
+
+def test_client_reuses_connection(stub_server):
+    stub_server.routes[("GET", "/user")] = (200, {"login": "foo"})
+    stub_server.routes[("GET", "/repos/sclorg/valkey-container")] = (200, {"name": "valkey-container"})
+    client = GitHubClient(token="secret", api_url=stub_server.url)
+    assert client.is_authenticated()
+    assert client.get_repository_name("sclorg", "valkey-container") == "valkey-container"
+    assert client.get_repository_name("sclorg", "valkey-container") == "valkey-container"
+    assert len(stub_server.requests) == 3
+    assert len({request[4] for request in stub_server.requests}) == 1
+    assert stub_server.requests[0][2]["Authorization"] == "Bearer secret"
+
+
+def test_correct_repo_api_backend(stub_server):
+    stub_server.routes[("GET", "/repos/foobar/s2i-nodejs-container")] = (200, {"name": "s2i-nodejs-container"})
+    flexmock(utils).should_receive("run_command").never()
+    config = default_config_merger()
+    config["github"]["backend"] = "api"
+    config["github"]["api_url"] = stub_server.url
+    checker = GitHubStatusChecker(config=Config.get_from_dict(config), use_cache=False)
+    assert checker.is_correct_repo("s2i-nodejs-container")
+    with pytest.raises(requests.HTTPError):
+        checker.is_correct_repo("s2i-unknown-container")
+
+
+def test_client_not_authenticated(stub_server):
+    stub_server.routes[("GET", "/user")] = (401, {"message": "Bad credentials"})
+    assert not GitHubClient(token="wrong", api_url=stub_server.url).is_authenticated()
+    assert not GitHubClient(token="", api_url=stub_server.url).is_authenticated()
+
+
+def test_client_graphql(stub_server):
+    stub_server.routes[("POST", "/graphql")] = (200, {"data": {"r0": None}})
+    client = GitHubClient(token="secret", api_url=stub_server.url)
+    assert client.graphql("query { r0: viewer { login } }") == {"data": {"r0": None}}
+    assert json.loads(stub_server.requests[0][3]) == {"query": "query { r0: viewer { login } }"}
+
+
+def test_client_merge_failed(stub_server):
+    stub_server.routes[("PUT", "/repos/sclorg/valkey-container/pulls/2/merge")] = (405, {"message": "Not allowed"})
+    client = GitHubClient(token="secret", api_url=stub_server.url)
+    with pytest.raises(requests.HTTPError):
+        client.merge_pull_request("sclorg", "valkey-container", 2)
+
+
+def test_merger_api_backend(stub_server, tmp_path):
+    stub_server.routes[("GET", "/user")] = (200, {"login": "foo"})
+    stub_server.routes[("POST", "/graphql")] = (
+        200,
+        {
+            "data": {
+                "r0": {
+                    "name": "s2i-nodejs-container",
+                    "pullRequests": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "nodes": [
+                            {
+                                "number": 7,
+                                "title": "Update",
+                                "isDraft": False,
+                                "createdAt": "2024-12-19T07:30:11Z",
+                                "labels": {"nodes": [{"name": "READY-to-MERGE"}]},
+                                "latestOpinionatedReviews": {
+                                    "nodes": [
+                                        {"state": "APPROVED", "author": {"login": "foo"}},
+                                        {"state": "APPROVED", "author": {"login": "bar"}},
+                                    ]
+                                },
+                            }
+                        ],
+                    },
+                }
+            }
+        },
+    )
+    stub_server.routes[("PUT", "/repos/foobar/s2i-nodejs-container/pulls/7/merge")] = (200, {"merged": True})
+    flexmock(utils).should_receive("run_command").never()
+    config = default_config_merger()
+    config["github"]["backend"] = "api"
+    config["github"]["api_url"] = stub_server.url
+    config["github"]["cache_dir"] = str(tmp_path)
+    test_config = Config()
+    auto_merger = AutoMerger(config=test_config.get_from_dict(config))
+    auto_merger.github_client.token = "secret"
+    assert auto_merger.check_all_containers()
+    assert auto_merger.pr_to_merge["s2i-nodejs-container"][0]["number"] == 7
+    auto_merger.merge_pull_requests()
+    assert stub_server.requests[-1][:2] == ("PUT", "/repos/foobar/s2i-nodejs-container/pulls/7/merge")
+
+
+def test_client_cached_pull_requests(stub_server, tmp_path):
+    def pulls(handler, body):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {}
+        return 200, [{"number": 1}], {"ETag": '"v1"'}
+
+    graphql_response = {
+        "data": {
+            "r0": {
+                "name": "valkey-container",
+                "pullRequests": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []},
+            }
+        }
+    }
+    stub_server.routes[("GET", "/repos/sclorg/valkey-container/pulls?state=open&per_page=100")] = pulls
+    stub_server.routes[("POST", "/graphql")] = (200, graphql_response)
+    client = GitHubClient(token="secret", api_url=stub_server.url, cache=HttpCache(directory=tmp_path))
+    assert client.get_open_pull_requests("sclorg", ["valkey-container"]) == {"valkey-container": []}
+    assert [request[0] for request in stub_server.requests] == ["GET", "POST"]
+    assert client.get_open_pull_requests("sclorg", ["valkey-container"]) == {"valkey-container": []}
+    assert [request[0] for request in stub_server.requests] == ["GET", "POST", "GET"]
+    assert stub_server.requests[-1][2]["If-None-Match"] == '"v1"'
+
+
+def test_client_paginated_pull_requests_not_cached(stub_server, tmp_path):
+    next_url = f"{stub_server.url}/repos/sclorg/valkey-container/pulls?state=open&per_page=100&page=2"
+
+    def pulls(handler, body):
+        if handler.headers.get("If-None-Match") == '"v1"':
+            return 304, {}, {"ETag": '"v1"', "Link": f'<{next_url}>; rel="next"'}
+        return 200, [{"number": number} for number in range(100)], {"ETag": '"v1"', "Link": f'<{next_url}>; rel="next"'}
+
+    nodes = [
+        {
+            "number": number,
+            "title": "Update",
+            "isDraft": False,
+            "createdAt": "2024-12-19T07:30:11Z",
+            "labels": {"nodes": []},
+            "latestOpinionatedReviews": {"nodes": []},
+        }
+        for number in range(101)
+    ]
+    graphql_response = {
+        "data": {
+            "r0": {
+                "name": "valkey-container",
+                "pullRequests": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": nodes},
+            }
+        }
+    }
+    stub_server.routes[("GET", "/repos/sclorg/valkey-container/pulls?state=open&per_page=100")] = pulls
+    stub_server.routes[("POST", "/graphql")] = (200, graphql_response)
+    client = GitHubClient(token="secret", api_url=stub_server.url, cache=HttpCache(directory=tmp_path))
+    assert len(client.get_open_pull_requests("sclorg", ["valkey-container"])["valkey-container"]) == 101
+    # Pull requests on the second page may change without changing the first one, GraphQL is asked again
+    assert len(client.get_open_pull_requests("sclorg", ["valkey-container"])["valkey-container"]) == 101
+    assert [request[0] for request in stub_server.requests] == ["GET", "POST", "GET", "POST"]
+    assert "If-None-Match" not in stub_server.requests[2][2]
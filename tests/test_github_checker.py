@@ -21,10 +21,15 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import io
+import json
+
 from flexmock import flexmock
 
+from auto_merger import utils
 from auto_merger.config import Config
 from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.report import JsonLinesRenderer, Report
 
 from tests.conftest import default_config_merger
 
@@ -33,36 +38,97 @@ def test_get_gh_pr_list(get_pr_missing_ci):
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_pr_missing_ci)
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
-    assert auto_merger.repo_data
+    assert auto_merger.get_pull_requests("s2i-nodejs-container")
 
 
 def test_get_gh_two_pr_labels_missing(get_two_pr_missing_labels):
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_two_pr_missing_labels)
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
-    assert auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    repo_data = auto_merger.get_pull_requests("s2i-nodejs-container")
+    assert repo_data
+    blocked_prs, pull_requests = auto_merger.evaluate_pull_requests("s2i-nodejs-container", repo_data)
+    assert not pull_requests
 
 
 def test_get_gh_pr_missing_ci(get_pr_missing_ci):
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_pr_missing_ci)
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
-    assert auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    repo_data = auto_merger.get_pull_requests("s2i-nodejs-container")
+    assert repo_data
+    blocked_prs, pull_requests = auto_merger.evaluate_pull_requests("s2i-nodejs-container", repo_data)
+    assert blocked_prs
+    assert not pull_requests
 
 
 def test_get_no_pr_for_merge():
+    flexmock(GitHubStatusChecker).should_receive("is_correct_repo").and_return(True)
     flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return([])
     test_config = Config()
     auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "s2i-nodejs-container"
-    auto_merger.get_gh_pr_list()
-    assert not auto_merger.repo_data
-    assert not auto_merger.check_pr_to_merge()
+    assert auto_merger.check_container("s2i-nodejs-container") == ([], [])
+
+
+def test_get_gh_pr_list_uses_repo_option(get_pr_missing_ci):
+    flexmock(utils).should_receive("run_command").with_args(
+        cmd=[
+            "gh pr list --repo foobar/s2i-nodejs-container -s open "
+            "--json number,title,labels,reviews,reviewDecision,isDraft,createdAt,updatedAt"
+        ],
+        return_output=True,
+    ).and_return(json.dumps(get_pr_missing_ci)).once()
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    assert auto_merger.get_pull_requests("s2i-nodejs-container")
+
+
+def test_check_all_containers_without_clone(get_repo_name, get_pr_missing_ci):
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("clone_repo").never()
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_repo_name).and_return(
+        get_pr_missing_ci
+    )
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(default_config_merger()))
+    assert auto_merger.check_all_containers()
+    assert "s2i-nodejs-container" in auto_merger.blocked_pr
+
+
+def test_check_all_containers_parallel(get_pr_missing_ci):
+    config = default_config_merger()
+    config["github"]["repos"] = ["s2i-nodejs-container", "s2i-python-container", "s2i-ruby-container"]
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("is_correct_repo").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(get_pr_missing_ci)
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(config), jobs=3)
+    assert auto_merger.check_all_containers()
+    assert list(auto_merger.blocked_pr) == config["github"]["repos"]
+    assert auto_merger.blocked_pr["s2i-python-container"] == auto_merger.blocked_pr["s2i-ruby-container"]
+    phases = auto_merger.timings.get_phases()
+    assert phases["repo view"]["calls"] == 3
+    assert phases["pr list"]["calls"] == 3
+    assert phases["authenticate"]["calls"] == 1
+    assert set(auto_merger.timings.get_repos()["s2i-ruby-container"]) == {"repo view", "pr list", "evaluate"}
+
+
+def test_check_all_containers_streams_blocked():
+    config = default_config_merger()
+    config["github"]["repos"] = ["s2i-nodejs-container", "s2i-python-container"]
+    stream = io.StringIO()
+    streamed_before_check = []
+
+    def check_container(container_name):
+        streamed_before_check.append(len(stream.getvalue().splitlines()))
+        return [{"number": 1, "title": container_name, "labels": []}], []
+
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("check_container").replace_with(check_container)
+    checker = GitHubStatusChecker(config=Config.get_from_dict(config), use_cache=False)
+    report = Report([JsonLinesRenderer(stream)])
+    assert checker.check_all_containers(report)
+    assert report.finished
+    # The blocked pull request of the first repository is written before the second one is checked
+    assert streamed_before_check == [0, 1]
+    assert [json.loads(line)["repo"] for line in stream.getvalue().splitlines()] == config["github"]["repos"]
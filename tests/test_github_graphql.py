@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from flexmock import flexmock
+
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.github_graphql import GitHubGraphQL
+from auto_merger.merger import AutoMerger
+
+from tests.conftest import default_config_merger, graphql_pull_request
+
+
+def graphql_repository(name, pull_requests, cursor=None):
+    return {
+        "name": name,
+        "pullRequests": {
+            "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+            "nodes": pull_requests,
+        },
+    }
+
+
+def test_build_query_aliases_and_cursor():
+    graphql = GitHubGraphQL(namespace="sclorg")
+    query = graphql.build_query({"valkey-container": None, "httpd-container": "Y3Vyc29y"})
+    assert 'r0: repository(owner: "sclorg", name: "valkey-container")' in query
+    assert 'r1: repository(owner: "sclorg", name: "httpd-container")' in query
+    assert 'after: "Y3Vyc29y"' in query
+    assert query.count("after:") == 1
+
+
+def test_get_pull_requests_paginated():
+    responses = [
+        {
+            "data": {
+                "r0": graphql_repository("valkey-container", [graphql_pull_request(1, ["pr/failing-ci"])], "c1"),
+                "r1": graphql_repository("httpd-container", []),
+            }
+        },
+        {"data": {"r0": graphql_repository("valkey-container", [graphql_pull_request(2, [], ["APPROVED"])])}},
+    ]
+    queries = []
+
+    def executor(query):
+        queries.append(query)
+        return responses[len(queries) - 1]
+
+    graphql = GitHubGraphQL(namespace="sclorg", executor=executor)
+    results = graphql.get_pull_requests(["valkey-container", "httpd-container"])
+    assert len(queries) == 2
+    assert "httpd-container" not in queries[1]
+    assert [pr["number"] for pr in results["valkey-container"]] == [1, 2]
+    assert results["valkey-container"][0]["labels"] == [{"name": "pr/failing-ci"}]
+    assert results["valkey-container"][1]["reviews"] == [{"state": "APPROVED", "author": {"login": "user0"}}]
+    assert results["httpd-container"] == []
+
+
+def test_get_pull_requests_batches():
+    queries = []
+
+    def executor(query):
+        queries.append(query)
+        return {"data": {}}
+
+    graphql = GitHubGraphQL(namespace="sclorg", executor=executor, batch_size=2)
+    results = graphql.get_pull_requests(["repo1", "repo2", "repo3"])
+    assert len(queries) == 2
+    assert results == {"repo1": None, "repo2": None, "repo3": None}
+
+
+def test_get_pull_requests_renamed_repo():
+    graphql = GitHubGraphQL(
+        namespace="sclorg", executor=lambda query: {"data": {"r0": graphql_repository("new-name", [])}}
+    )
+    assert graphql.get_pull_requests(["old-name"]) == {"old-name": None}
+
+
+def test_get_pull_request():
+    queries = []
+
+    def executor(query):
+        queries.append(query)
+        return {"data": {"repository": {"pullRequest": dict(graphql_pull_request(7, ["pr/failing-ci"]), state="OPEN")}}}
+
+    graphql = GitHubGraphQL(namespace="sclorg", executor=executor)
+    pull_request = graphql.get_pull_request("valkey-container", 7)
+    assert "pullRequest(number: 7)" in queries[0]
+    assert pull_request["state"] == "OPEN"
+    assert pull_request["labels"] == [{"name": "pr/failing-ci"}]
+    assert (
+        GitHubGraphQL(namespace="sclorg", executor=lambda query: {"data": {"repository": None}}).get_pull_request(
+            "valkey-container", 7
+        )
+        is None
+    )
+
+
+def search_node(repo, number, labels, owner="sclorg"):
+    return dict(graphql_pull_request(number, labels), repository={"name": repo, "owner": {"login": owner}})
+
+
+def search_response(nodes, cursor=None, count=None):
+    return {
+        "data": {
+            "search": {
+                "issueCount": len(nodes) if count is None else count,
+                "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+                "nodes": nodes,
+            }
+        }
+    }
+
+
+def test_search_pull_requests_paginated():
+    responses = [
+        search_response([search_node("valkey-container", 1, ["READY-to-MERGE"]), {}], "c1"),
+        search_response([search_node("httpd-container", 2, ["READY"]), search_node("fork", 3, ["READY"], "foo")]),
+    ]
+    queries = []
+
+    def executor(query):
+        queries.append(query)
+        return responses[len(queries) - 1]
+
+    graphql = GitHubGraphQL(namespace="sclorg", executor=executor)
+    results = graphql.search_pull_requests(["READY", "READY-to-MERGE"])
+    assert 'org:sclorg is:pr is:open -is:draft label:\\"READY\\",\\"READY-to-MERGE\\"' in queries[0]
+    assert 'after: "c1"' in queries[1]
+    assert {repo: [pr["number"] for pr in prs] for repo, prs in results.items()} == {
+        "valkey-container": [1],
+        "httpd-container": [2],
+    }
+
+
+def test_search_pull_requests_over_limit():
+    graphql = GitHubGraphQL(namespace="sclorg", executor=lambda query: search_response([], count=1001))
+    assert graphql.search_pull_requests(["READY"]) is None
+    graphql = GitHubGraphQL(namespace="sclorg", executor=lambda query: {"errors": [{"message": "failed"}]})
+    assert graphql.search_pull_requests(["READY"]) is None
+
+
+def test_merger_search_discovery():
+    config = default_config_merger()
+    config["github"].update(
+        repos=["s2i-nodejs-container", "s2i-ruby-container", "s2i-perl-container"], discovery="search", pr_lifetime=0
+    )
+    found = {
+        "s2i-ruby-container": [
+            GitHubGraphQL.convert_pull_request(graphql_pull_request(5, ["READY-to-MERGE"], ["APPROVED"] * 2))
+        ],
+        "s2i-unknown-container": [GitHubGraphQL.convert_pull_request(graphql_pull_request(6, ["READY-to-MERGE"]))],
+    }
+    flexmock(AutoMerger).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubGraphQL).should_receive("search_pull_requests").with_args(["READY-to-MERGE"]).and_return(
+        found
+    ).once()
+    flexmock(GitHubGraphQL).should_receive("get_pull_requests").never()
+    flexmock(AutoMerger).should_receive("get_gh_json_output").never()
+    auto_merger = AutoMerger(config=Config.get_from_dict(config))
+    assert auto_merger.check_all_containers()
+    assert auto_merger.pr_to_merge == {"s2i-ruby-container": [{"number": 5, "approvals": 2, "title": "Pull request 5"}]}
+
+
+def test_merger_search_discovery_state_file(tmp_path):
+    config = default_config_merger()
+    config["github"].update(
+        repos=["s2i-ruby-container"], discovery="search", pr_lifetime=0, state_file=str(tmp_path / "state.db")
+    )
+    ready = [
+        GitHubGraphQL.convert_pull_request(graphql_pull_request(number, ["READY-to-MERGE"], ["APPROVED"] * 2))
+        for number in (5, 6)
+    ]
+    # The label of pull request 5 was removed before the second run, the search does not return it anymore
+    searches = [{"s2i-ruby-container": ready}, {"s2i-ruby-container": ready[1:]}]
+    flexmock(AutoMerger).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubGraphQL).should_receive("search_pull_requests").replace_with(lambda labels: searches.pop(0))
+    flexmock(GitHubGraphQL).should_receive("get_pull_requests").never()
+    auto_merger = AutoMerger(config=Config.get_from_dict(config))
+    assert auto_merger.check_all_containers()
+    assert [change["verdict"] for change in auto_merger.changes] == ["mergeable", "mergeable"]
+    auto_merger = AutoMerger(config=Config.get_from_dict(config))
+    assert auto_merger.check_all_containers()
+    assert [pr["number"] for pr in auto_merger.pr_to_merge["s2i-ruby-container"]] == [6]
+    assert auto_merger.changes == []
+
+
+def test_merger_search_discovery_patterns():
+    config = default_config_merger()
+    config["github"].update(discovery="search", backend="graphql", approval_labels=["ready-*"])
+    flexmock(AutoMerger).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubGraphQL).should_receive("search_pull_requests").never()
+    flexmock(GitHubGraphQL).should_receive("get_pull_requests").and_return({"s2i-nodejs-container": []}).once()
+    auto_merger = AutoMerger(config=Config.get_from_dict(config))
+    assert auto_merger.check_all_containers()
+    assert auto_merger.pr_to_merge == {"s2i-nodejs-container": []}
+
+
+def test_check_all_containers_graphql_backend():
+    config = default_config_merger()
+    config["github"]["backend"] = "graphql"
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").never()
+    flexmock(GitHubGraphQL).should_receive("get_pull_requests").and_return(
+        {
+            "s2i-nodejs-container": [
+                GitHubGraphQL.convert_pull_request(graphql_pull_request(5, ["pr/missing-review"])),
+            ]
+        }
+    ).once()
+    test_config = Config()
+    auto_merger = GitHubStatusChecker(config=test_config.get_from_dict(config))
+    assert auto_merger.check_all_containers()
+    assert auto_merger.blocked_pr["s2i-nodejs-container"][0]["number"] == 5
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+import threading
+
+from flexmock import flexmock
+
+from auto_merger.config import Config
+from auto_merger.gitlab_async import AsyncGitLabChecker
+from auto_merger.gitlab_checker import GitLabStatusChecker
+from auto_merger.gitlab_handler import GitLabHandler
+from auto_merger.named_tuples import MergeRequestRecord
+
+from tests.conftest import RoutesByPath, default_config_merger
+
+
+def get_config(stub_server, tmp_path) -> Config:
+    config = default_config_merger()
+    config["gitlab"]["url"] = stub_server.url
+    config["gitlab"]["cache_dir"] = str(tmp_path)
+    config["gitlab"]["backend"] = "async"
+    return Config.get_from_dict(config)
+
+
+def get_merge_request(iid, labels):
+    return {"iid": iid, "title": f"MR {iid}", "labels": labels, "web_url": f"https://mr/{iid}", "state": "opened"}
+
+
+def test_check_projects_concurrently(stub_server, tmp_path):
+    # First pages of both projects have to be requested at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def merge_requests(project_id, total_pages):
+        def route(handler, body):
+            page = int(handler.path.split("page=")[-1])
+            if page == 1:
+                barrier.wait()
+            return 200, [get_merge_request(project_id * 10 + page, [])], {"X-Total-Pages": str(total_pages)}
+
+        return route
+
+    stub_server.routes = RoutesByPath(
+        {
+            "/api/v4/projects/foo%2Fproject-a": (200, {"id": 1}),
+            "/api/v4/projects/foo%2Fproject-b": (200, {"id": 2}),
+            "/api/v4/projects/1/merge_requests": merge_requests(1, 3),
+            "/api/v4/projects/2/merge_requests": merge_requests(2, 1),
+        }
+    )
+    handler = GitLabHandler(config=get_config(stub_server, tmp_path))
+    checked = []
+    results = AsyncGitLabChecker(handler, concurrency=4).check_projects(
+        ["foo/project-a", "foo/project-b", "foo/gone"], lambda reponame, result: checked.append((reponame, result))
+    )
+    assert [[mr.iid for mr in merge_requests] for merge_requests in results[:2]] == [[11, 12, 13], [21]]
+    assert checked == list(zip(["foo/project-a", "foo/project-b", "foo/gone"], results))
+    assert results[1][0] == MergeRequestRecord(21, "MR 21", [], "https://mr/21")
+    assert results[2] is None
+
+
+def test_check_all_containers_async_backend(stub_server, tmp_path):
+    namespace = "redhat%2Frhel%2Fcontainers"
+    stub_server.routes = RoutesByPath(
+        {
+            f"/api/v4/groups/{namespace}/projects": (
+                200,
+                [
+                    {"id": 16, "path_with_namespace": "redhat/rhel/containers/postgresql-16"},
+                    {"id": 15, "path_with_namespace": "redhat/rhel/containers/postgresql-15"},
+                    {"id": 13, "path_with_namespace": "redhat/rhel/containers/postgresql-13"},
+                ],
+            ),
+            "/api/v4/projects/16/merge_requests": (200, [get_merge_request(1, ["pr/missing-review"])]),
+            "/api/v4/projects/15/merge_requests": (200, [get_merge_request(2, ["READY-to-MERGE"])]),
+            "/api/v4/projects/13/merge_requests": (200, []),
+        }
+    )
+    checker = GitLabStatusChecker(config=get_config(stub_server, tmp_path), jobs=8)
+    assert checker.check_all_containers()
+    assert checker.blocked_mr == {
+        "redhat/rhel/containers/postgresql-16": [
+            {"number": 1, "title": "MR 1", "labels": ["pr/missing-review"], "target_url": "https://mr/1"}
+        ],
+        "redhat/rhel/containers/postgresql-15": [],
+        "redhat/rhel/containers/postgresql-13": [],
+    }
+    assert len(stub_server.requests) == 4
+
+
+def test_check_projects_stale_project_id(stub_server, tmp_path):
+    (tmp_path / "gitlab-projects.json").write_text(json.dumps({f"{stub_server.url}/foo/project-a": 7}))
+    stub_server.routes = RoutesByPath(
+        {
+            "/api/v4/projects/foo%2Fproject-a": (200, {"id": 1}),
+            "/api/v4/projects/1/merge_requests": (200, [get_merge_request(11, [])], {"X-Total-Pages": "1"}),
+        }
+    )
+    handler = GitLabHandler(config=get_config(stub_server, tmp_path))
+    results = AsyncGitLabChecker(handler).check_projects(["foo/project-a"])
+    assert [mr.iid for mr in results[0]] == [11]
+    assert json.loads((tmp_path / "gitlab-projects.json").read_text()) == {f"{stub_server.url}/foo/project-a": 1}
+
+
+def test_check_projects_above_default_executor_limit(stub_server, tmp_path):
+    # More requests than threads of the default executor have to be in flight at the same time
+    reponames = [f"foo/project-{index}" for index in range(40)]
+    barrier = threading.Barrier(len(reponames), timeout=5)
+
+    def get_project_id(reponame):
+        barrier.wait()
+        return 1
+
+    async def get_merge_requests(project_id):
+        return []
+
+    handler = GitLabHandler(config=get_config(stub_server, tmp_path))
+    flexmock(handler).should_receive("get_project_id").replace_with(get_project_id)
+    checker = AsyncGitLabChecker(handler, concurrency=len(reponames))
+    flexmock(checker).should_receive("get_merge_requests").replace_with(get_merge_requests)
+    assert checker.check_projects(reponames) == [[]] * len(reponames)
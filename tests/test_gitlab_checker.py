@@ -45,15 +45,17 @@ def test_gl_not_repos(get_pr_missing_ci):
     assert not auto_merger.check_all_containers()
 
 
-def test_gl_check_all_containers(get_pr_missing_ci, merge_requests_psql_13):
+def test_gl_check_all_containers(get_pr_missing_ci, merge_requests_psql_13, tmp_path):
     flexmock(GitLabHandler).should_receive("check_authentication").and_return(True)
+    flexmock(GitLabHandler).should_receive("get_group_project_ids").and_return({}).once()
     flexmock(GitLabHandler).should_receive("get_project_id_from_url").and_return()
     flexmock(GitLabHandler).should_receive("get_project_merge_requests").and_return(merge_requests_psql_13)
     test_config = Config()
-    auto_merger = GitLabStatusChecker(config=test_config.get_from_dict(default_config_merger()))
-    auto_merger.container_name = "postgresql-15"
+    config = default_config_merger()
+    config["gitlab"]["cache_dir"] = str(tmp_path)
+    auto_merger = GitLabStatusChecker(config=test_config.get_from_dict(config))
     assert auto_merger.check_all_containers()
-    assert len(auto_merger.merge_requests) == 1
+    assert len(auto_merger.merge_requests[auto_merger.config.gitlab["namespace"] + "/postgresql-13"]) == 1
     print(auto_merger.blocked_mr)
     p_mr: ProjectMR = merge_requests_psql_13[0]
     assert auto_merger.blocked_mr[auto_merger.config.gitlab["namespace"] + "/postgresql-13"]
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+import pytest
+import requests
+
+from auto_merger.config import Config
+from auto_merger.gitlab_handler import GitLabHandler, is_not_found
+from auto_merger.named_tuples import MergeRequestRecord
+
+from tests.conftest import RoutesByPath, default_config_merger
+
+
+def get_handler(stub_server, tmp_path) -> GitLabHandler:
+    config = default_config_merger()
+    config["gitlab"]["url"] = stub_server.url
+    config["gitlab"]["cache_dir"] = str(tmp_path)
+    handler = GitLabHandler(config=Config.get_from_dict(config))
+    handler.token = "secret"
+    return handler
+
+
+def test_resolve_project_ids_by_group(stub_server, tmp_path):
+    group_path = "/api/v4/groups/redhat%2Frhel%2Fcontainers/projects?per_page=100&simple=true&page="
+    stub_server.routes[("GET", group_path + "1")] = (
+        200,
+        [{"id": 16, "path_with_namespace": "redhat/rhel/containers/postgresql-16"}],
+        {"X-Next-Page": "2"},
+    )
+    stub_server.routes[("GET", group_path + "2")] = (
+        200,
+        [{"id": 15, "path_with_namespace": "redhat/rhel/containers/postgresql-15"}],
+        {"X-Next-Page": ""},
+    )
+    stub_server.routes[("GET", "/api/v4/projects/foo%2Fpostgresql-13")] = (200, {"id": 13})
+    handler = get_handler(stub_server, tmp_path)
+    repos = ["redhat/rhel/containers/postgresql-16", "redhat/rhel/containers/postgresql-15", "foo/postgresql-13"]
+    assert handler.resolve_project_ids(repos) == {
+        "redhat/rhel/containers/postgresql-16": 16,
+        "redhat/rhel/containers/postgresql-15": 15,
+        "foo/postgresql-13": None,
+    }
+    # Projects outside of the listed groups are requested one by one
+    assert handler.get_project_id("foo/postgresql-13") == 13
+    assert stub_server.requests[0][2]["PRIVATE-TOKEN"] == "secret"
+    assert len({request[4] for request in stub_server.requests}) == 1
+
+    # Another run reads all ids from the cache, without any request
+    stub_server.requests.clear()
+    handler = get_handler(stub_server, tmp_path)
+    assert handler.resolve_project_ids(repos) == {
+        "redhat/rhel/containers/postgresql-16": 16,
+        "redhat/rhel/containers/postgresql-15": 15,
+        "foo/postgresql-13": 13,
+    }
+    assert handler.get_project_id("foo/postgresql-13") == 13
+    assert stub_server.requests == []
+    assert json.loads((tmp_path / "gitlab-projects.json").read_text())[f"{stub_server.url}/foo/postgresql-13"] == 13
+
+
+def test_get_project_merge_requests_paginated(stub_server, tmp_path):
+    def merge_requests(handler, body):
+        page = 2 if "&page=2" in handler.path else 1
+        mrs = [
+            {
+                "iid": page * 10 + index,
+                "title": f"MR {page * 10 + index}",
+                "labels": ["pr/missing-review"],
+                "web_url": f"https://gitlab.com/foo/-/merge_requests/{page * 10 + index}",
+                "state": "opened",
+                "description": "x" * 1000,
+            }
+            for index in range(2)
+        ]
+        if page == 1:
+            next_url = f"{stub_server.url}/api/v4/projects/13/merge_requests?state=opened&per_page=2&page=2"
+            return 200, mrs, {"Link": f'<{next_url}>; rel="next"', "X-Next-Page": "2"}
+        return 200, mrs
+
+    handler = get_handler(stub_server, tmp_path)
+    stub_server.routes = RoutesByPath({"/api/v4/projects/13/merge_requests": merge_requests})
+    records = handler.get_project_merge_requests(13, per_page=2)
+    assert stub_server.requests == []
+    records = list(records)
+    assert [record.iid for record in records] == [10, 11, 20, 21]
+    assert records[0] == MergeRequestRecord(
+        10, "MR 10", ["pr/missing-review"], "https://gitlab.com/foo/-/merge_requests/10"
+    )
+    assert len(stub_server.requests) == 2
+    assert "per_page=2" in stub_server.requests[0][1]
+
+
+def test_get_merge_requests_stale_project_id(stub_server, tmp_path):
+    # The project was recreated, its cached id is not found anymore
+    (tmp_path / "gitlab-projects.json").write_text(json.dumps({f"{stub_server.url}/foo/postgresql-13": 7}))
+    mr = {"iid": 1, "title": "MR 1", "labels": [], "web_url": "https://mr/1", "state": "opened"}
+    stub_server.routes = RoutesByPath(
+        {
+            "/api/v4/projects/foo%2Fpostgresql-13": (200, {"id": 13}),
+            "/api/v4/projects/13/merge_requests": (200, [mr]),
+        }
+    )
+    handler = get_handler(stub_server, tmp_path)
+    assert handler.get_merge_requests("foo/postgresql-13") == [MergeRequestRecord(1, "MR 1", [], "https://mr/1")]
+    assert [request[1].partition("?")[0] for request in stub_server.requests] == [
+        "/api/v4/projects/7/merge_requests",
+        "/api/v4/projects/foo%2Fpostgresql-13",
+        "/api/v4/projects/13/merge_requests",
+    ]
+    assert json.loads((tmp_path / "gitlab-projects.json").read_text()) == {f"{stub_server.url}/foo/postgresql-13": 13}
+
+    # Projects that do not exist anymore are not retried over and over
+    stub_server.requests.clear()
+    stub_server.routes = RoutesByPath({})
+    with pytest.raises(requests.HTTPError) as error:
+        handler.get_merge_requests("foo/postgresql-13")
+    assert is_not_found(error.value)
+    assert len(stub_server.requests) == 2
+    assert json.loads((tmp_path / "gitlab-projects.json").read_text()) == {}
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import os
+import time
+
+from auto_merger.http_cache import HttpCache
+
+
+def test_cache_set_get(tmp_path):
+    cache = HttpCache(directory=tmp_path)
+    assert cache.get("sclorg/valkey-container") is None
+    cache.set("sclorg/valkey-container", '"abc"', None, [{"number": 1}])
+    entry = cache.get("sclorg/valkey-container")
+    assert entry.etag == '"abc"'
+    assert entry.data == [{"number": 1}]
+
+
+def test_cache_expired(tmp_path):
+    cache = HttpCache(directory=tmp_path, max_age=10)
+    cache.set("sclorg/valkey-container", '"abc"', None, [])
+    assert cache.get("sclorg/valkey-container")
+    cache.max_age = -1
+    assert cache.get("sclorg/valkey-container") is None
+
+
+def test_cache_evict_least_recently_used(tmp_path):
+    cache = HttpCache(directory=tmp_path, max_size=0)
+    cache.set("old", None, None, [])
+    cache.set("new", None, None, [])
+    old_time = time.time() - 100
+    os.utime(cache.get_path("old"), (old_time, old_time))
+    cache.max_size = cache.get_path("new").stat().st_size
+    cache.evict()
+    assert not cache.get_path("old").exists()
+    assert cache.get_path("new").exists()
+
+
+def test_cache_directory_expands_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    cache = HttpCache(directory="~/.cache/auto-merger")
+    assert cache.directory == tmp_path / ".cache" / "auto-merger"
@@ -21,15 +21,19 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import json
+import subprocess
+import threading
+
 import pytest
 
-from datetime import datetime
 from flexmock import flexmock
 
 from auto_merger.config import Config
 from auto_merger.merger import AutoMerger
 from auto_merger import utils
 from auto_merger.pull_request_handler import PullRequestHandler
+from auto_merger.report import open_report
 
 
 yaml_merger = {
@@ -43,27 +47,6 @@ yaml_merger = {
 }
 
 
-@pytest.mark.parametrize(
-    "pr_created_date,pr_lifetime,return_code",
-    (
-        ("2024-12-20T09:30:11Z", 1, False),
-        ("2024-12-19T07:30:11Z", 1, True),
-        ("2024-12-21T09:30:11Z", 1, False),
-        ("2024-12-21T09:30:11Z", 0, True),
-    ),
-)
-def test_get_gh_pr_list(pr_created_date, pr_lifetime, return_code):
-    set_time = datetime.strptime("2024-12-20T10:35:20Z", "%Y-%m-%dT%H:%M:%SZ")
-    flexmock(utils).should_receive("get_realtime").and_return(set_time)
-    test_config = Config()
-    auto_merger = AutoMerger(config=test_config.get_from_dict(yaml_merger))
-    auto_merger.pr_lifetime = pr_lifetime
-    pr = {
-        "createdAt": pr_created_date,
-    }
-    assert PullRequestHandler.check_pr_lifetime(pull_request=pr, pr_lifetime=pr_lifetime) == return_code
-
-
 @pytest.mark.parametrize(
     "review_data,return_code",
     (
@@ -77,27 +60,62 @@ def test_get_approvals(review_data, return_code):
     assert PullRequestHandler.check_pr_approvals(reviews_to_check=review_data) == return_code
 
 
-@pytest.mark.parametrize(
-    "pr_to_merge,return_code,approval_body",
-    (
-        ({}, False, []),
-        ({"valkey-container": []}, False, []),
-    ),
-)
-def test_print_pull_request_to_merge_failed(pr_to_merge, return_code, approval_body):
+def test_write_report(tmp_path):
     test_config = Config()
     auto_merger = AutoMerger(config=test_config.get_from_dict(yaml_merger))
-    auto_merger.pr_to_merge = pr_to_merge
-    assert auto_merger.print_pull_request_to_merge() == return_code
-    assert auto_merger.approval_body == approval_body
+    auto_merger.pr_to_merge = {
+        "valkey-container": [{"number": 2, "title": "valkey_title"}],
+        "httpd-container": [],
+    }
+    auto_merger.changes = [
+        {"repo": "valkey-container", "number": 2, "title": "valkey_title", "previous": None, "verdict": "mergeable"}
+    ]
+    path = tmp_path / "results.json"
+    with open_report([(str(path), None)], email=True) as report:
+        auto_merger.write_report(report)
+    results = json.loads(path.read_text())
+    assert results["to_merge"] == [{"repo": "valkey-container", "number": 2, "title": "valkey_title"}]
+    assert results["changes_since_last_run"] == auto_merger.changes
+    assert "merge_results" not in results
+    assert "https://github.com/sclorg/valkey-container/pull/2" in report.get_email_body()
 
 
-def test_print_pull_request_to_merge_success():
-    test_config = Config()
-    auto_merger = AutoMerger(config=test_config.get_from_dict(yaml_merger))
+def test_merge_pull_requests_parallel():
+    config = dict(yaml_merger)
+    config["github"] = dict(yaml_merger["github"], repos=["valkey-container", "httpd-container", "nginx-container"])
+    auto_merger = AutoMerger(config=Config.get_from_dict(config), jobs=3)
     auto_merger.pr_to_merge = {
-        "valkey-container": [{"number": 2, "title": "valkey_title"}],
+        "valkey-container": [
+            {"number": 1, "title": "first", "approvals": 2},
+            {"number": 2, "title": "second", "approvals": 2},
+            {"number": 3, "title": "third", "approvals": 0},
+        ],
         "httpd-container": [],
+        "nginx-container": [{"number": 5, "title": "failing", "approvals": 2}],
     }
-    assert auto_merger.print_pull_request_to_merge() is True
-    assert auto_merger.approval_body != []
+    calls: dict = {}
+    # Both repositories have to be merged at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run_command(cmd, return_output):
+        repo, number = cmd.split()[4], cmd.split()[-1]
+        calls.setdefault(repo, []).append(number)
+        if number in ("1", "5"):
+            barrier.wait()
+        if repo == "sclorg/nginx-container":
+            raise subprocess.CalledProcessError(1, cmd, output="conflict")
+        return ""
+
+    flexmock(utils).should_receive("run_command").replace_with(run_command)
+    results = auto_merger.merge_pull_requests()
+    assert calls == {"sclorg/valkey-container": ["1", "2"], "sclorg/nginx-container": ["5"]}
+    assert [(result.repo, result.number, result.outcome) for result in results] == [
+        ("valkey-container", 1, "merged"),
+        ("valkey-container", 2, "merged"),
+        ("valkey-container", 3, "skipped"),
+        ("nginx-container", 5, "failed"),
+    ]
+    assert all(result.duration >= 0 for result in results)
+    with open_report(email=True) as report:
+        auto_merger.write_report(report)
+    assert "FAILED" in report.get_email_body()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from auto_merger.github_api import GitHubClient
+from auto_merger.metrics import Metrics
+from auto_merger.timing import Timings
+
+
+def test_render_counters_and_gauges():
+    metrics = Metrics()
+    metrics.merges.inc(repo="s2i-python-container", outcome="merged")
+    metrics.merges.inc(repo="s2i-python-container", outcome="merged")
+    metrics.set_repo_counts("github", 's2i-"quoted"', blocked=3, mergeable=1)
+    metrics.set_run("merger", success=True, duration=1.5)
+    text = metrics.render()
+    assert "# TYPE auto_merger_merges_total counter" in text
+    assert 'auto_merger_merges_total{repo="s2i-python-container",outcome="merged"} 2' in text
+    assert 'auto_merger_blocked_pull_requests{service="github",repo="s2i-\\"quoted\\""} 3' in text
+    assert 'auto_merger_last_run_success{command="merger"} 1' in text
+    assert 'auto_merger_run_duration_seconds{command="merger"} 1.5' in text
+    assert text.endswith("\n")
+
+
+def test_histogram_from_timings():
+    metrics = Metrics()
+    timings = Timings(metrics=metrics)
+    timings.add("pr list", "", 0.02)
+    timings.add("pr list", "", 7.0)
+    try:
+        with timings.span("merge", repo="s2i-ruby-container"):
+            raise RuntimeError("merge failed")
+    except RuntimeError:
+        pass
+    text = metrics.render()
+    assert 'auto_merger_phase_duration_seconds_bucket{phase="pr list",le="0.01"} 0' in text
+    assert 'auto_merger_phase_duration_seconds_bucket{phase="pr list",le="0.05"} 1' in text
+    assert 'auto_merger_phase_duration_seconds_bucket{phase="pr list",le="10"} 2' in text
+    assert 'auto_merger_phase_duration_seconds_bucket{phase="pr list",le="+Inf"} 2' in text
+    assert 'auto_merger_phase_duration_seconds_sum{phase="pr list"} 7.02' in text
+    assert 'auto_merger_phase_duration_seconds_count{phase="pr list"} 2' in text
+    assert metrics.phase_errors.get(phase="merge") == 1
+
+
+def test_write_textfile(tmp_path):
+    metrics = Metrics()
+    metrics.set_run("github-checker", success=False, duration=2)
+    path = metrics.write_textfile(tmp_path / "auto_merger.prom")
+    assert 'auto_merger_last_run_success{command="github-checker"} 0' in path.read_text()
+    assert [item.name for item in tmp_path.iterdir()] == ["auto_merger.prom"]
+
+
+def test_rate_limit_hook(stub_server):
+    stub_server.routes[("GET", "/repos/sclorg/s2i-base-container")] = (
+        200,
+        {"name": "s2i-base-container"},
+        {"X-RateLimit-Remaining": "4990"},
+    )
+    metrics = Metrics()
+    client = GitHubClient(token="token", api_url=stub_server.url, metrics=metrics)
+    assert client.get_repository_name("sclorg", "s2i-base-container") == "s2i-base-container"
+    assert metrics.rate_limit_remaining.get(service="github") == 4990
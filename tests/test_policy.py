@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import pytest
+
+from datetime import datetime
+
+from auto_merger.policy import LabelMatcher, Policy
+from auto_merger.state_store import VERDICT_BLOCKED, VERDICT_MERGEABLE, VERDICT_WAITING
+
+from tests.conftest import get_pull_request
+
+
+NOW = datetime.strptime("2024-12-20T10:35:20Z", "%Y-%m-%dT%H:%M:%SZ")
+APPROVED_TWICE = ("APPROVED", "APPROVED", "COMMENTED")
+
+
+@pytest.mark.parametrize(
+    "label,matches",
+    (
+        ("pr/failing-ci", True),
+        ("pr/missing-review", True),
+        ("pr/missing-tests", True),
+        ("ci-fedora-failed", True),
+        ("ci-fedora-passed", False),
+        ("pr/failing", False),
+    ),
+)
+def test_label_matcher(label, matches):
+    matcher = LabelMatcher(["pr/failing-ci", "pr/missing-*", "/^ci-.*-failed$/"])
+    assert matcher.match(label) is matches
+    assert matcher.names == frozenset(["pr/failing-ci"])
+
+
+@pytest.mark.parametrize(
+    "pull_request,verdict,reasons",
+    (
+        (
+            get_pull_request(1, ["pr/missing-review"], APPROVED_TWICE),
+            VERDICT_BLOCKED,
+            ("blocked by pr/missing-review",),
+        ),
+        (get_pull_request(1, ["READY-to-MERGE"], APPROVED_TWICE), VERDICT_MERGEABLE, ()),
+        (get_pull_request(1, ["READY-to-MERGE"], ("APPROVED", "COMMENTED")), VERDICT_WAITING, ("1 of 2 approvals",)),
+        ({"number": 1, "title": "No labels"}, VERDICT_WAITING, ("no labels",)),
+    ),
+)
+def test_checker_policy(pull_request, verdict, reasons):
+    policy = Policy.from_config({"blocker_labels": ["pr/missing-*"], "approvals": 2})
+    result = policy.evaluate(pull_request, now=NOW)
+    assert result.verdict == verdict
+    assert result.reasons == reasons
+
+
+@pytest.mark.parametrize(
+    "created,lifetime,old_enough",
+    (
+        ("2024-12-20T09:30:11Z", 1, False),
+        ("2024-12-19T07:30:11Z", 1, True),
+        ("2024-12-21T09:30:11Z", 1, False),
+        ("2024-12-21T09:30:11Z", 0, True),
+    ),
+)
+def test_is_old_enough(created, lifetime, old_enough):
+    policy = Policy.from_config({"approval_labels": ["READY-to-MERGE"], "pr_lifetime": lifetime}, merging=True)
+    assert policy.is_old_enough({"createdAt": created}, now=NOW) is old_enough
+
+
+def test_merger_policy():
+    policy = Policy.from_config(
+        {"blocker_labels": ["pr/missing-review"], "approval_labels": ["READY-to-MERGE"], "pr_lifetime": 1},
+        merging=True,
+    )
+    results = [
+        policy.evaluate(pull_request, now=NOW)
+        for pull_request in (
+            get_pull_request(1, ["READY-to-MERGE"], APPROVED_TWICE),
+            get_pull_request(2, ["pr/missing-review"], APPROVED_TWICE),
+            get_pull_request(3, ["READY-to-MERGE"], APPROVED_TWICE, created_at="2024-12-20T09:30:11Z"),
+        )
+    ]
+    assert [(result.number, result.verdict, result.approvals) for result in results] == [
+        (1, VERDICT_MERGEABLE, 2),
+        (2, VERDICT_WAITING, 2),
+        (3, VERDICT_WAITING, 2),
+    ]
+    assert results[1].reasons == ("missing approval label",)
+    assert results[2].reasons == ("opened for less than 1 days",)
+
+
+def test_is_skipped():
+    assert Policy.is_skipped({"isDraft": True, "labels": []})
+    assert Policy.is_skipped({"isDraft": False, "labels": [{"name": "pr/changes-requested"}]})
+    assert not Policy.is_skipped(get_pull_request(1))
+
+
+def review(login, state):
+    return {"state": state, "author": {"login": login}}
+
+
+@pytest.mark.parametrize(
+    "reviews,approvals",
+    (
+        ([review("foo", "APPROVED"), review("foo", "APPROVED")], 1),
+        ([review("foo", "APPROVED"), review("bar", "APPROVED"), review("foo", "COMMENTED")], 2),
+        ([review("foo", "APPROVED"), review("bar", "APPROVED"), review("foo", "CHANGES_REQUESTED")], 1),
+        ([review("foo", "CHANGES_REQUESTED"), review("foo", "APPROVED")], 1),
+        ([review("foo", "APPROVED"), review("foo", "DISMISSED")], 0),
+        ([{"state": "APPROVED", "author": None}, {"state": "APPROVED", "author": None}], 2),
+        (None, 0),
+    ),
+)
+def test_count_approvals_latest_per_reviewer(reviews, approvals):
+    assert Policy.count_approvals(reviews) == approvals
+
+
+def test_review_decision_changes_requested():
+    policy = Policy.from_config({"approval_labels": ["READY-to-MERGE"], "pr_lifetime": 0}, merging=True)
+    pull_request = dict(get_pull_request(1, ["READY-to-MERGE"], APPROVED_TWICE), reviewDecision="CHANGES_REQUESTED")
+    result = policy.evaluate(pull_request)
+    assert result.verdict == VERDICT_WAITING
+    assert result.reasons == ("changes requested",)
+    assert policy.evaluate(dict(pull_request, reviewDecision="APPROVED")).verdict == VERDICT_MERGEABLE
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import subprocess
+import threading
+import time
+
+import pytest
+
+from flexmock import flexmock
+
+from auto_merger import utils
+from auto_merger.github_api import GitHubClient
+from auto_merger.rate_limit import PRIORITY_MERGE, PRIORITY_READ, RateLimitScheduler, get_key, get_resource
+
+KEY = ("api.github.com", "token", "core")
+
+
+def test_secondary_rate_limit_retried(stub_server):
+    responses = [
+        (403, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": "0"}),
+        (429, {"message": "Too Many Requests"}),
+        (200, {"name": "valkey-container"}, {"X-RateLimit-Remaining": "4999"}),
+    ]
+    stub_server.routes[("GET", "/repos/sclorg/valkey-container")] = lambda handler, body: responses.pop(0)
+    scheduler = RateLimitScheduler(max_concurrency=4, base_delay=0.01)
+    client = GitHubClient(token="token", api_url=stub_server.url, scheduler=scheduler)
+    assert client.get_repository_name("sclorg", "valkey-container") == "valkey-container"
+    assert len(stub_server.requests) == 3
+    budget = scheduler.get_budget(get_key(stub_server.url, "token"))
+    assert budget.remaining == 4999
+    # Concurrency was halved twice to 1 and grows back by one per round of successful requests
+    assert budget.limit == 2
+
+
+def test_graphql_and_rest_budgets(stub_server):
+    reset = str(int(time.time()) + 3600)
+    stub_server.routes[("POST", "/graphql")] = (
+        200,
+        {"data": {}},
+        {"X-RateLimit-Resource": "graphql", "X-RateLimit-Remaining": "10", "X-RateLimit-Reset": reset},
+    )
+    stub_server.routes[("GET", "/repos/sclorg/valkey-container")] = (
+        200,
+        {"name": "valkey-container"},
+        {"X-RateLimit-Resource": "core", "X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": reset},
+    )
+    scheduler = RateLimitScheduler()
+    client = GitHubClient(token="token", api_url=stub_server.url, scheduler=scheduler)
+    client.graphql("query { viewer { login } }")
+    # Spent GraphQL budget does not hold back REST requests, like merges
+    assert client.get_repository_name("sclorg", "valkey-container") == "valkey-container"
+    assert scheduler.get_budget(get_key(stub_server.url, "token", "graphql")).remaining == 10
+    assert scheduler.get_budget(get_key(stub_server.url, "token", "core")).remaining == 4999
+    assert get_resource(f"{stub_server.url}/graphql") == "graphql"
+
+
+def test_reserve_kept_for_merges():
+    scheduler = RateLimitScheduler(reserve=50)
+    scheduler.update(KEY, {"X-RateLimit-Remaining": "10", "X-RateLimit-Reset": str(int(time.time()) + 3600)})
+    budget = scheduler.get_budget(KEY)
+    assert scheduler.get_wait_time(budget, PRIORITY_MERGE) == 0
+    assert scheduler.get_wait_time(budget, PRIORITY_READ) == scheduler.max_delay
+    scheduler.update(KEY, {"RateLimit-Remaining": "0", "RateLimit-Reset": str(int(time.time()) - 1)})
+    assert scheduler.get_wait_time(budget, PRIORITY_READ) == 0
+    assert budget.remaining is None
+
+
+def test_merges_go_first():
+    scheduler = RateLimitScheduler(max_concurrency=1)
+    order = []
+
+    def request(priority):
+        with scheduler.slot(KEY, priority):
+            order.append(priority)
+
+    with scheduler.slot(KEY):
+        threads = [threading.Thread(target=request, args=(PRIORITY_READ,))]
+        threads[0].start()
+        time.sleep(0.05)
+        threads.append(threading.Thread(target=request, args=(PRIORITY_MERGE,)))
+        threads[1].start()
+        time.sleep(0.05)
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == [PRIORITY_MERGE, PRIORITY_READ]
+
+
+@pytest.mark.parametrize(
+    "output,calls",
+    (
+        ("API rate limit exceeded for user", 2),
+        ("could not resolve to a Repository", 1),
+    ),
+)
+def test_gh_command_retried_on_rate_limit(output, calls):
+    scheduler = RateLimitScheduler(base_delay=0.01)
+    flexmock(utils).should_receive("run_command").and_raise(
+        subprocess.CalledProcessError(1, "gh pr list", output=output)
+    ).and_return("[]").times(calls)
+    if calls == 1:
+        with pytest.raises(subprocess.CalledProcessError):
+            scheduler.run_command(KEY, "gh pr list")
+    else:
+        assert scheduler.run_command(KEY, "gh pr list") == "[]"
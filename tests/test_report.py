@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+
+import pytest
+
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.named_tuples import Section
+from auto_merger.report import get_format, open_report
+
+from tests.conftest import default_config_merger
+
+BLOCKED = Section("blocked", "Blocked pull requests", ("URL", "Title"), True)
+MERGEABLE = Section("mergeable", "Mergeable pull requests", ("URL", "Title"), False)
+
+
+def write_report(report):
+    report.start("Pull request statuses")
+    with report.section(BLOCKED) as add_row:
+        add_row("valkey-container", ("https://github.com/sclorg/valkey-container/pull/1", "a|b"), {"number": 1})
+        add_row("valkey-container", ("https://github.com/sclorg/valkey-container/pull/2", "<b>"), {"number": 2})
+        add_row("httpd-container", ("https://github.com/sclorg/httpd-container/pull/3", "c"), {"number": 3})
+    with report.section(MERGEABLE):
+        pass
+    report.finish()
+
+
+@pytest.mark.parametrize(
+    "path,output_format",
+    (
+        ("report.json", None),
+        ("report.jsonl", None),
+        ("report.html", None),
+        ("report.md", None),
+        ("report.txt", "markdown"),
+        ("report", None),
+    ),
+)
+def test_get_format(path, output_format):
+    expected = {
+        "report.json": "json",
+        "report.jsonl": "jsonl",
+        "report.html": "html",
+        "report.md": "markdown",
+        "report.txt": "markdown",
+        "report": "json",
+    }
+    assert get_format(path, output_format) == expected[path]
+
+
+def test_report_formats(tmp_path):
+    outputs = [(str(tmp_path / f"report.{suffix}"), None) for suffix in ("json", "jsonl", "html", "md")]
+    with open_report(outputs, email=True) as report:
+        write_report(report)
+    assert json.loads((tmp_path / "report.json").read_text()) == {
+        "blocked": {"valkey-container": [{"number": 1}, {"number": 2}], "httpd-container": [{"number": 3}]},
+    }
+    lines = [json.loads(line) for line in (tmp_path / "report.jsonl").read_text().splitlines()]
+    assert lines[2] == {"section": "blocked", "repo": "httpd-container", "number": 3}
+    html_report = (tmp_path / "report.html").read_text()
+    assert html_report == report.get_email_body()
+    assert "<td>&lt;b&gt;</td>" in html_report
+    assert "Mergeable" not in html_report
+    markdown = (tmp_path / "report.md").read_text().splitlines()
+    assert markdown[0] == "# Pull request statuses"
+    assert "| https://github.com/sclorg/valkey-container/pull/1 | a\\|b |" in markdown
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "report.html",
+        "report.json",
+        "report.jsonl",
+        "report.md",
+    ]
+
+
+def test_report_replaced_atomically(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text("previous")
+    with pytest.raises(RuntimeError):
+        with open_report([(str(path), None)]) as report:
+            report.start("Pull request statuses")
+            raise RuntimeError("check failed")
+    assert path.read_text() == "previous"
+    assert [item.name for item in tmp_path.iterdir()] == ["report.json"]
+
+
+def test_report_not_finished(tmp_path):
+    path = tmp_path / "report.json"
+    path.write_text("previous")
+    with open_report([(str(path), None)]) as report:
+        report.start("Pull request statuses")
+    assert path.read_text() == "previous"
+    assert [item.name for item in tmp_path.iterdir()] == ["report.json"]
+
+
+def test_checker_json_output(tmp_path):
+    checker = GitHubStatusChecker(config=Config.get_from_dict(default_config_merger()))
+    checker.set_container_results(
+        "s2i-nodejs-container",
+        [{"number": 12, "title": "Blocked", "labels": [{"name": "pr/missing-review"}]}],
+        [{"number": 13, "title": "Ready", "approvals": 2}],
+    )
+    checker.set_container_results("s2i-ruby-container", [], [])
+    path = tmp_path / "results.json"
+    with open_report([(str(path), None)]) as report:
+        checker.write_report(report)
+    assert json.loads(path.read_text()) == {
+        "blocked": {
+            "s2i-nodejs-container": [{"number": 12, "title": "Blocked", "labels": [{"name": "pr/missing-review"}]}]
+        },
+        "mergeable": [{"number": 13, "title": "Ready", "approvals": 2, "repo": "s2i-nodejs-container"}],
+    }
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+from auto_merger.results import ResultStore, get_record
+
+
+def test_result_store_upsert_and_order():
+    results = ResultStore(repos=["valkey-container", "httpd-container"])
+    assert results.upsert(get_record("httpd-container", {"number": "5", "title": "five", "labels": []}))
+    assert results.upsert(get_record("httpd-container", {"number": 3, "title": "three", "labels": []}))
+    assert not results.upsert(get_record("httpd-container", {"number": 5, "title": "renamed", "labels": []}))
+    assert ("httpd-container", "5") in results
+    assert len(results) == 2
+    assert results.get("httpd-container", 5).title == "renamed"
+    assert results.to_dict() == {
+        "valkey-container": [],
+        "httpd-container": [
+            {"number": 5, "title": "renamed", "labels": []},
+            {"number": 3, "title": "three", "labels": []},
+        ],
+    }
+    assert [repo for repo, _ in results.items()] == ["httpd-container"]
+
+
+def test_result_store_remove_and_replace():
+    results = ResultStore()
+    results.replace_repo("valkey-container", [get_record("valkey-container", {"number": 1, "approvals": 2})])
+    assert results.remove("valkey-container", 1).approvals == 2
+    assert results.remove("valkey-container", 1) is None
+    assert results.remove("unknown-container", 1) is None
+    assert not results
+    assert results.to_dict() == {"valkey-container": []}
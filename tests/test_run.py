@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+
+from flexmock import flexmock
+
+from auto_merger import api
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.gitlab_checker import GitLabStatusChecker
+from auto_merger.gitlab_handler import GitLabHandler
+from auto_merger.merger import AutoMerger
+from auto_merger.named_tuples import MergeResult, Shard
+from auto_merger.sharding import filter_repos
+
+from tests.conftest import default_config_merger, get_pull_request
+
+
+PULL_REQUESTS = {
+    "s2i-nodejs-container": [
+        get_pull_request(1, ["READY-to-MERGE"], ["APPROVED"] * 2),
+        get_pull_request(2, ["pr/missing-review"]),
+    ],
+    "s2i-ruby-container": [get_pull_request(3, ["READY-to-MERGE"], ["APPROVED"])],
+}
+
+
+def gh_json_output(cmd):
+    repo = next(arg for arg in cmd[0].split() if arg.startswith("sclorg/")).split("/")[1]
+    if cmd[0].startswith("gh repo view"):
+        return {"name": repo}
+    return PULL_REQUESTS[repo]
+
+
+def test_run_fetches_once(tmp_path):
+    config = Config.get_from_dict(
+        {
+            "github": {
+                "namespace": "sclorg",
+                "repos": list(PULL_REQUESTS),
+                "blocker_labels": ["pr/missing-review"],
+                "approval_labels": ["READY-to-MERGE"],
+                "pr_lifetime": 0,
+            }
+        }
+    )
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True).once()
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").replace_with(gh_json_output).times(4)
+    flexmock(AutoMerger).should_receive("is_authenticated").never()
+    flexmock(AutoMerger).should_receive("get_gh_json_output").never()
+    flexmock(AutoMerger).should_receive("merge_pull_request").replace_with(
+        lambda repo, pr: MergeResult(repo, pr["number"], pr["title"], "merged", 0.5)
+    ).once()
+    json_output = tmp_path / "results.json"
+    assert api.run(config=config, send_email=None, json_output=str(json_output)) == 0
+    results = json.loads(json_output.read_text())
+    assert [pr["number"] for pr in results["blocked"]["s2i-nodejs-container"]] == [2]
+    assert [(pr["repo"], pr["number"]) for pr in results["mergeable"]] == [("s2i-nodejs-container", 1)]
+    assert results["merge_results"] == [
+        {"repo": "s2i-nodejs-container", "number": 1, "title": "Pull request 1", "outcome": "merged", "duration": 0.5}
+    ]
+
+
+def test_run_not_authenticated():
+    config = Config.get_from_dict(
+        {
+            "github": {
+                "namespace": "sclorg",
+                "repos": ["s2i-nodejs-container"],
+                "blocker_labels": [],
+                "approval_labels": [],
+            }
+        }
+    )
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(False)
+    flexmock(AutoMerger).should_receive("check_all_containers").never()
+    assert api.run(config=config, send_email=None) == 1
+
+
+def test_run_shards_gitlab_projects():
+    config_dict = default_config_merger()
+    config_dict["github"]["repos"] = []
+    config = Config.get_from_dict(config_dict)
+    shard = Shard(2, 2)
+    checked = []
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitLabHandler).should_receive("check_authentication").and_return(True)
+    flexmock(GitLabHandler).should_receive("resolve_project_ids")
+    flexmock(GitLabStatusChecker).should_receive("check_container").replace_with(
+        lambda container_name: checked.append(container_name) or []
+    )
+    assert api.run(config=config, send_email=None, shard=shard) == 0
+    assert checked == [f"redhat/rhel/containers/{repo}" for repo in filter_repos(config_dict["gitlab"]["repos"], shard)]
+    assert len(checked) < len(config_dict["gitlab"]["repos"])
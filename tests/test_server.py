@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import hashlib
+import hmac
+import json
+import threading
+
+import pytest
+import requests
+
+from flexmock import flexmock
+
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.server import WebhookServer
+
+from tests.conftest import default_config_merger
+
+
+def get_payload(repo="s2i-nodejs-container", number=12):
+    return {
+        "action": "labeled",
+        "repository": {"name": repo, "owner": {"login": "foobar"}},
+        "pull_request": {"number": number},
+    }
+
+
+@pytest.fixture()
+def webhook_server(tmp_path):
+    config_dict = default_config_merger()
+    del config_dict["gitlab"]
+    server = WebhookServer(config=Config.get_from_dict(config_dict), port=0, reconcile_interval=3600)
+    server.start(reconcile=False)
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.stop()
+
+
+def test_webhook_reevaluates_pull_request(webhook_server):
+    flexmock(GitHubStatusChecker).should_receive("get_pull_request").with_args("s2i-nodejs-container", 12).and_return(
+        {
+            "number": 12,
+            "title": "Blocked",
+            "state": "OPEN",
+            "isDraft": False,
+            "labels": [{"name": "pr/missing-review"}],
+            "reviews": [],
+        }
+    ).once()
+    response = requests.post(
+        f"{webhook_server.url}/webhook/github", json=get_payload(), headers={"X-GitHub-Event": "pull_request"}
+    )
+    assert response.status_code == 202
+    assert response.json() == {"queued": True}
+    webhook_server.tasks.join()
+    status = requests.get(f"{webhook_server.url}/status").json()
+    assert status["github"]["blocked"]["s2i-nodejs-container"] == [
+        {"number": 12, "title": "Blocked", "labels": [{"name": "pr/missing-review"}]}
+    ]
+    assert status["github"]["to_merge"]["s2i-nodejs-container"] == []
+
+
+def test_webhook_closed_pull_request_dropped(webhook_server):
+    checker = webhook_server.github_checker
+    checker.set_container_results(
+        "s2i-nodejs-container",
+        [{"number": 12, "title": "Blocked", "labels": []}],
+        [{"number": 13, "title": "Ready", "approvals": 2}],
+    )
+    flexmock(GitHubStatusChecker).should_receive("get_pull_request").and_return(
+        {"number": 12, "title": "Blocked", "state": "MERGED", "isDraft": False, "labels": [], "reviews": []}
+    )
+    requests.post(
+        f"{webhook_server.url}/webhook/github", json=get_payload(), headers={"X-GitHub-Event": "pull_request"}
+    )
+    webhook_server.tasks.join()
+    assert checker.blocked_pr["s2i-nodejs-container"] == []
+    assert [pr.number for pr in checker.mergeable.get_records("s2i-nodejs-container")] == [13]
+
+
+def test_webhook_ignored_events(webhook_server):
+    flexmock(GitHubStatusChecker).should_receive("get_pull_request").never()
+    for event, payload in (
+        ("push", get_payload()),
+        ("pull_request", get_payload(repo="unknown-container")),
+    ):
+        response = requests.post(
+            f"{webhook_server.url}/webhook/github", json=payload, headers={"X-GitHub-Event": event}
+        )
+        assert response.json() == {"queued": False}
+    assert requests.post(f"{webhook_server.url}/webhook/github", data="{").status_code == 400
+    assert requests.post(f"{webhook_server.url}/webhook/unknown", json={}).status_code == 404
+    webhook_server.tasks.join()
+
+
+def test_webhook_signature(webhook_server):
+    webhook_server.github_secret = "secret"
+    flexmock(webhook_server).should_receive("queue_github_event").and_return(True).once()
+    body = json.dumps(get_payload()).encode()
+    signature = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+    url = f"{webhook_server.url}/webhook/github"
+    assert requests.post(url, data=body, headers={"X-Hub-Signature-256": "sha256=wrong"}).status_code == 401
+    assert requests.post(url, data=body, headers={"X-Hub-Signature-256": signature}).status_code == 202
+
+
+def test_reconcile_task(webhook_server):
+    flexmock(GitHubStatusChecker).should_receive("check_all_containers").and_return(True).once()
+    webhook_server.tasks.put(("reconcile",))
+    webhook_server.tasks.join()
+    assert requests.get(f"{webhook_server.url}/healthz").json() == {"status": "ok"}
+
+
+def test_metrics_endpoint(webhook_server):
+    flexmock(GitHubStatusChecker).should_receive("check_all_containers").and_return(True).once()
+    webhook_server.tasks.put(("reconcile",))
+    webhook_server.tasks.join()
+    response = requests.get(f"{webhook_server.url}/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert 'auto_merger_last_run_success{command="serve"} 1' in response.text
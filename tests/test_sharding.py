@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+
+import json
+
+import pytest
+
+from click.testing import CliRunner
+
+from auto_merger import api
+from auto_merger.cli.github_checker import github_checker
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.named_tuples import Shard
+from auto_merger.report import open_report
+from auto_merger.sharding import apply_shard, filter_repos, parse_shard
+
+from tests.conftest import default_config_merger
+
+REPOS = [f"s2i-{name}-container" for name in ("nodejs", "ruby", "python", "perl", "php", "base", "core", "nginx")]
+
+
+@pytest.mark.parametrize("value,expected", (("1/1", Shard(1, 1)), ("2/4", Shard(2, 4)), ("4/4", Shard(4, 4))))
+def test_parse_shard(value, expected):
+    assert parse_shard(value) == expected
+
+
+@pytest.mark.parametrize("value", ("0/4", "5/4", "1", "a/b", "1/0"))
+def test_parse_shard_invalid(value):
+    with pytest.raises(ValueError):
+        parse_shard(value)
+
+
+def test_shard_option_invalid():
+    result = CliRunner().invoke(github_checker, ["--shard", "3/2"], obj=Config.get_from_dict(default_config_merger()))
+    assert result.exit_code == 2
+    assert "Shard index has to be from 1 to 2" in result.output
+
+
+def test_filter_repos():
+    shards = [filter_repos(REPOS, Shard(index, 3)) for index in range(1, 4)]
+    assert sorted(repo for shard in shards for repo in shard) == sorted(REPOS)
+    assert all(shards)
+    assert filter_repos(list(reversed(REPOS)), Shard(2, 3)) == list(reversed(shards[1]))
+    assert filter_repos(REPOS, None) == REPOS
+
+
+def test_apply_shard():
+    config = Config.get_from_dict(dict(default_config_merger(), gitlab=None))
+    config.github["repos"] = REPOS
+    sharded = apply_shard(config, "github", Shard(1, 2))
+    assert sharded.github["repos"] == filter_repos(REPOS, Shard(1, 2))
+    assert config.github["repos"] == REPOS
+    assert apply_shard(config, "gitlab", Shard(1, 2)) is config
+    assert apply_shard(config, "github", None) is config
+
+
+def write_shard(config, path, blocked, mergeable, changes):
+    checker = GitHubStatusChecker(config=config)
+    for repo in blocked:
+        checker.set_container_results(repo, [{"number": 1, "title": f"Blocked {repo}", "labels": []}], [])
+    for repo in mergeable:
+        checker.set_container_results(repo, [], [{"number": 2, "title": f"Ready {repo}", "approvals": 2}])
+    checker.changes = changes
+    with open_report([(str(path), None)]) as report:
+        checker.write_report(report)
+
+
+def test_combine(tmp_path):
+    config = Config.get_from_dict(default_config_merger())
+    change = {"repo": "s2i-ruby-container", "number": 2, "title": "Ready", "previous": None, "verdict": "mergeable"}
+    write_shard(config, tmp_path / "shard1.json", ["s2i-nodejs-container"], ["s2i-python-container"], [])
+    write_shard(config, tmp_path / "shard2.json", ["s2i-perl-container"], ["s2i-ruby-container"], [change])
+    combined = tmp_path / "combined.json"
+    paths = [str(tmp_path / "shard1.json"), str(tmp_path / "shard2.json")]
+    assert api.combine(config=config, paths=paths, json_output=str(combined)) == 0
+    results = json.loads(combined.read_text())
+    assert results["blocked"]["s2i-nodejs-container"] == [
+        {"number": 1, "title": "Blocked s2i-nodejs-container", "labels": []}
+    ]
+    assert list(results["blocked"]["s2i-perl-container"][0]) == ["number", "title", "labels"]
+    assert [pr["repo"] for pr in results["mergeable"]] == ["s2i-python-container", "s2i-ruby-container"]
+    assert results["changes_since_last_run"] == [change]
+
+
+def test_combine_missing_shard(tmp_path):
+    config = Config.get_from_dict(default_config_merger())
+    (tmp_path / "shard1.json").write_text("[]")
+    assert api.combine(config=config, paths=[str(tmp_path / "shard1.json")]) == 1
+    assert api.combine(config=config, paths=[str(tmp_path / "shard2.json")]) == 1
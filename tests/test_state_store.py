@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+from flexmock import flexmock
+
+from auto_merger.config import Config
+from auto_merger.github_checker import GitHubStatusChecker
+from auto_merger.state_store import StateStore, VERDICT_BLOCKED, VERDICT_DROPPED, VERDICT_WAITING
+
+from tests.conftest import default_config_merger, get_pull_request
+
+
+def test_state_store_reuses_unchanged_verdict(tmp_path):
+    store = StateStore(path=tmp_path / "state.db", scope="github-checker", fingerprint="abc")
+    pr = get_pull_request(1, updated_at="2025-01-01T10:00:00Z")
+    assert store.get_verdict("valkey-container", pr) is None
+    store.record("valkey-container", pr, VERDICT_WAITING)
+    assert store.get_verdict("valkey-container", pr).verdict == VERDICT_WAITING
+    assert store.get_verdict("valkey-container", get_pull_request(1, updated_at="2025-01-02T10:00:00Z")) is None
+    store.close()
+    store = StateStore(path=tmp_path / "state.db", scope="github-checker", fingerprint="changed-config")
+    assert store.get_verdict("valkey-container", pr) is None
+
+
+def test_state_store_changes(tmp_path):
+    store = StateStore(path=tmp_path / "state.db", scope="github-checker")
+    store.record("valkey-container", get_pull_request(1, updated_at="1"), VERDICT_WAITING)
+    store.record("valkey-container", get_pull_request(2, updated_at="1"), VERDICT_WAITING)
+    store.close()
+    store = StateStore(path=tmp_path / "state.db", scope="github-checker")
+    store.record("valkey-container", get_pull_request(1, updated_at="2"), VERDICT_BLOCKED)
+    store.close_missing(["valkey-container"])
+    assert [(change["number"], change["previous"], change["verdict"]) for change in store.get_changes()] == [
+        (1, VERDICT_WAITING, VERDICT_BLOCKED),
+        (2, VERDICT_WAITING, VERDICT_DROPPED),
+    ]
+    assert store.get("valkey-container", 2) is None
+
+
+def test_checker_evaluates_only_changed_pull_requests(tmp_path):
+    config = default_config_merger()
+    config["github"]["state_file"] = str(tmp_path / "state.db")
+    flexmock(GitHubStatusChecker).should_receive("is_authenticated").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("is_correct_repo").and_return(True)
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(
+        [get_pull_request(1, ["pr/missing-review"], updated_at="1"), get_pull_request(2, updated_at="1")]
+    )
+    checker = GitHubStatusChecker(config=Config.get_from_dict(config))
+    assert checker.check_all_containers()
+    assert [change["number"] for change in checker.changes] == [1, 2]
+
+    flexmock(GitHubStatusChecker).should_receive("get_gh_json_output").and_return(
+        [
+            get_pull_request(1, ["pr/missing-review"], updated_at="1"),
+            get_pull_request(2, ["pr/failing-ci"], updated_at="2"),
+        ]
+    )
+    flexmock(GitHubStatusChecker).should_call("evaluate_pull_request").once()
+    checker = GitHubStatusChecker(config=Config.get_from_dict(config))
+    assert checker.check_all_containers()
+    assert [pr["number"] for pr in checker.blocked_pr["s2i-nodejs-container"]] == [1, 2]
+    assert [(change["number"], change["verdict"]) for change in checker.changes] == [(2, VERDICT_BLOCKED)]
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# MIT License
+#
+# Copyright (c) 2018-2019 Red Hat, Inc.
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+import json
+
+import pytest
+
+from auto_merger.timing import Timings
+
+
+def test_span_records_calls_and_failures():
+    timings = Timings()
+    with timings.span("pr list", "valkey-container"):
+        pass
+    with pytest.raises(ValueError):
+        with timings.span("pr list", "valkey-container"):
+            raise ValueError
+    with timings.span("authenticate"):
+        pass
+    timings.add("pr list", "httpd-container", 2.5)
+    phases = timings.get_phases()
+    assert phases["pr list"]["calls"] == 3
+    assert phases["pr list"]["max"] == 2.5
+    assert phases["authenticate"]["calls"] == 1
+    assert timings.get_repos() == {
+        "valkey-container": {"pr list": timings.get_stats(timings.spans[("pr list", "valkey-container")])},
+        "httpd-container": {"pr list": {"calls": 1, "total": 2.5, "max": 2.5}},
+    }
+
+
+def test_print_summary_and_save(tmp_path):
+    timings = Timings()
+    assert timings.print_summary() == []
+    timings.add("repo view", "valkey-container", 0.5)
+    timings.add("pr list", "valkey-container", 1.5)
+    timings.add("pr list", "httpd-container", 0.25)
+    lines = timings.print_summary(top=1)
+    assert lines[2].startswith("pr list")
+    assert lines[-2] == "Slowest repositories (of 2)"
+    assert lines[-1] == "  valkey-container 2.000s"
+    path = timings.save(tmp_path / "results.json")
+    assert path == tmp_path / "results.timings.json"
+    assert json.loads(path.read_text())["phases"]["pr list"]["calls"] == 2
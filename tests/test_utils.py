@@ -21,9 +21,11 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 # SOFTWARE.
 
+import time
+
 import pytest
 
-from auto_merger.utils import check_mandatory_config_fields
+from auto_merger.utils import check_mandatory_config_fields, run_parallel
 from auto_merger.config import Config
 from tests.conftest import (
     get_config_dict_simple,
@@ -46,3 +48,13 @@ def test_check_mandatory_fields_simple_config(config_dict, expected_bool):
     test_config = Config()
     ret_val = check_mandatory_config_fields(config=test_config.get_from_dict(config_dict()))
     assert ret_val == expected_bool
+
+
+@pytest.mark.parametrize("jobs", (1, 4))
+def test_run_parallel_keeps_order(jobs):
+    def slow_square(item):
+        # Items at the beginning finish last
+        time.sleep((5 - item) * 0.01)
+        return item * item
+
+    assert run_parallel(slow_square, range(5), jobs=jobs) == [0, 1, 4, 9, 16]